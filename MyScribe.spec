@@ -10,6 +10,9 @@ a = Analysis(
     hiddenimports=[
         'pynput.keyboard._win32',
         'pynput.mouse._win32',
+        # Imported lazily by name (src/utils/startup.py), so analysis cannot see them
+        'numpy',
+        'soundfile',
         'sounddevice',
         'pygame',
         'PySide6.QtCore',
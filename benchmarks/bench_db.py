@@ -0,0 +1,76 @@
+"""Insert, recent-N fetch and search latency of the storage layer as history grows.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_db --rows 200000 --json bench_db.json
+"""
+import argparse
+import os
+from datetime import datetime, timedelta
+
+from benchmarks.common import summarize, time_calls, use_temp_appdata, write_results
+
+use_temp_appdata()
+from src.utils import db  # noqa: E402
+
+TEXT = ("This is a synthetic dictation used to benchmark the history database. "
+        "It is about as long as a typical short note. ")
+
+
+def fill(count, start_index, base_time):
+    rows = []
+    for i in range(start_index, start_index + count):
+        timestamp = (base_time + timedelta(seconds=i)).isoformat()
+        rows.append((f"audio_{i}.flac", f"{TEXT}Topic{i % 997} item {i}", timestamp))
+        if len(rows) == 5000:
+            db.insert_transcriptions(rows)
+            rows = []
+    if rows:
+        db.insert_transcriptions(rows)
+
+
+def measure(size, repeat):
+    last = db.fetch_recent(50)[-1]
+    # A page from deep in the history, continuing from an arbitrary keyset position
+    deep_key = (datetime(2000, 1, 1) + timedelta(seconds=size // 2)).isoformat()
+    return {
+        'rows': size,
+        'insert_one': summarize(time_calls(lambda: db.insert_transcription("bench.flac", TEXT), repeat)),
+        'insert_batch_1000': summarize(time_calls(
+            lambda: db.insert_transcriptions([("bench.flac", TEXT)] * 1000), max(3, repeat // 20))),
+        'fetch_recent_50': summarize(time_calls(lambda: db.fetch_recent(50), repeat)),
+        'fetch_page_50_deep': summarize(time_calls(lambda: db.fetch_recent(50, before=(deep_key, 0)), repeat)),
+        'fetch_next_page_50': summarize(time_calls(
+            lambda: db.fetch_recent(50, before=(last[2], last[0])), repeat)),
+        'search_prefix': summarize(time_calls(lambda: db.search_transcriptions("topic12 dict"), repeat)),
+        'search_phrase': summarize(time_calls(lambda: db.search_transcriptions('"typical short note" topic5'), repeat)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=200000)
+    parser.add_argument('--repeat', type=int, default=200)
+    parser.add_argument('--json', help="write results to this file")
+    args = parser.parse_args()
+
+    db.configure(os.path.join(os.environ['APPDATA'], 'bench.db'))
+    db.init_db()
+    base_time = datetime(2000, 1, 1)
+    checkpoints = [c for c in (1000, 10000, 100000) if c < args.rows] + [args.rows]
+    results = []
+    filled = 0
+    for size in checkpoints:
+        fill(size - filled, filled, base_time)
+        filled = size
+        result = measure(db.count_transcriptions(), args.repeat)
+        results.append(result)
+        print(f"{result['rows']:>8} rows: insert {result['insert_one']['p50_ms']:.3f} ms, "
+              f"recent-50 {result['fetch_recent_50']['p50_ms']:.3f} ms, "
+              f"deep page {result['fetch_page_50_deep']['p50_ms']:.3f} ms, "
+              f"search {result['search_prefix']['p50_ms']:.3f} ms")
+    write_results('db', results, args.json)
+
+
+if __name__ == '__main__':
+    main()
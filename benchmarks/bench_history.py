@@ -0,0 +1,88 @@
+"""History window cost as the database grows: opening, reloading, paging and refreshing.
+
+Runs headless on the offscreen Qt platform unless QT_QPA_PLATFORM is already set.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_history --sizes 1000,10000,100000 --json bench_history.json
+"""
+import argparse
+import os
+from datetime import datetime
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+from benchmarks.bench_db import TEXT, fill  # noqa: E402  (points APPDATA at a temp dir)
+from benchmarks.common import summarize, time_calls, write_results  # noqa: E402
+from src.utils import db  # noqa: E402
+from PySide6.QtWidgets import QApplication  # noqa: E402
+from src.ui.history_window import HistoryWindow  # noqa: E402
+
+
+def render(app, window):
+    """Populates and lets the view lay out and paint the visible rows."""
+    window.populate_history()
+    app.processEvents()
+
+
+def measure(app, repeat):
+    window = None
+
+    def open_window():
+        nonlocal window
+        if window is not None:
+            window.deleteLater()
+        window = HistoryWindow()
+        window.show()
+        app.processEvents()
+
+    result = {
+        'rows': db.count_transcriptions(),
+        'open_window': summarize(time_calls(open_window, max(3, repeat // 10))),
+        'populate_history': summarize(time_calls(window.populate_history, repeat)),
+        'populate_and_paint': summarize(time_calls(lambda: render(app, window), repeat)),
+    }
+
+    def next_page():
+        model = window.model
+        if model.canFetchMore():
+            model.fetchMore()
+    window.populate_history()
+    result['fetch_next_page'] = summarize(time_calls(next_page, 5))
+
+    def add_and_refresh():
+        db.insert_transcription("bench.flac", TEXT)
+        window.refresh_latest()
+    result['insert_and_refresh_latest'] = summarize(time_calls(add_and_refresh, repeat))
+    window.deleteLater()
+    app.processEvents()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='1000,10000,100000')
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--json', help="write results to this file")
+    args = parser.parse_args()
+
+    db.configure(os.path.join(os.environ['APPDATA'], 'bench.db'))
+    db.init_db()
+    app = QApplication([])
+    base_time = datetime(2000, 1, 1)
+    results = []
+    filled = 0
+    for size in sorted(int(s) for s in args.sizes.split(',')):
+        fill(size - filled, filled, base_time)
+        filled = size
+        result = measure(app, args.repeat)
+        results.append(result)
+        print(f"{result['rows']:>8} rows: open {result['open_window']['p50_ms']:.2f} ms, "
+              f"populate {result['populate_history']['p50_ms']:.2f} ms, "
+              f"populate+paint {result['populate_and_paint']['p50_ms']:.2f} ms, "
+              f"next page {result['fetch_next_page']['p50_ms']:.2f} ms, "
+              f"refresh {result['insert_and_refresh_latest']['p50_ms']:.2f} ms")
+    write_results('history', results, args.json)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,158 @@
+"""Idle wakeups and resident memory of the app once it has settled, with regression limits.
+
+Starts the tray app (or --cli) offline with fake providers and short idle timeouts,
+waits for the microphone and mixer to be released, then counts the process's
+context switches over a window. Voluntary switches are wakeups from blocking waits,
+so a polling loop anywhere shows up as a steady rate. Exits with status 1 when a
+limit is exceeded.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_idle --window 30 --max-wakeups 5 --max-rss-mb 300 --json bench_idle.json
+
+Counts come from /proc on Linux, or psutil elsewhere when it is installed.
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.common import write_results
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# Printed by both the tray app and --cli once the hotkeys are live
+READY_LINE = "[MyScribe] Hotkeys"
+
+
+def _proc_status(path):
+    with open(path, encoding='utf-8') as f:
+        return dict(line.split(':', 1) for line in f if ':' in line)
+
+
+def sample(pid):
+    """Voluntary and involuntary context switches (all threads), CPU seconds and RSS bytes."""
+    task_dir = f'/proc/{pid}/task'
+    if os.path.isdir(task_dir):
+        voluntary = involuntary = 0
+        for tid in os.listdir(task_dir):
+            try:
+                status = _proc_status(os.path.join(task_dir, tid, 'status'))
+            except OSError:
+                continue  # thread exited
+            voluntary += int(status['voluntary_ctxt_switches'])
+            involuntary += int(status['nonvoluntary_ctxt_switches'])
+        with open(f'/proc/{pid}/stat', encoding='utf-8') as f:
+            fields = f.read().rsplit(')', 1)[1].split()
+        cpu = (int(fields[11]) + int(fields[12])) / os.sysconf('SC_CLK_TCK')
+        rss = int(_proc_status(f'/proc/{pid}/status')['VmRSS'].split()[0]) * 1024
+        return voluntary, involuntary, cpu, rss
+    if psutil is None:
+        sys.exit("Needs /proc (Linux) or the psutil package.")
+    process = psutil.Process(pid)
+    switches, times = process.num_ctx_switches(), process.cpu_times()
+    return switches.voluntary, switches.involuntary, times.user + times.system, process.memory_info().rss
+
+
+def thread_wakeups(pid):
+    """Voluntary switches per thread (Linux only), keyed by 'name/tid'."""
+    task_dir = f'/proc/{pid}/task'
+    counts = {}
+    if os.path.isdir(task_dir):
+        for tid in os.listdir(task_dir):
+            try:
+                status = _proc_status(os.path.join(task_dir, tid, 'status'))
+            except OSError:
+                continue
+            counts[f"{status['Name'].strip()}/{tid}"] = int(status['voluntary_ctxt_switches'])
+    return counts
+
+
+def launch(cli, idle_seconds, log_path):
+    appdata = tempfile.mkdtemp(prefix='myscribe-bench-')
+    env = dict(os.environ, APPDATA=appdata, STT_PROVIDER='fake', LLM_PROVIDER='fake',
+               AUDIO_STORAGE_PATH=os.path.join(appdata, 'audio'),
+               RECORDER_IDLE_SECONDS=str(idle_seconds), CUE_IDLE_SECONDS=str(idle_seconds),
+               PYTHONUNBUFFERED='1')
+    env.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    args = [sys.executable, '-m', 'src.main'] + (['--cli'] if cli else [])
+    log = open(log_path, 'w', encoding='utf-8')
+    return subprocess.Popen(args, env=env, stdout=log, stderr=subprocess.STDOUT), log
+
+
+def wait_ready(process, log_path, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            return False
+        with open(log_path, encoding='utf-8', errors='replace') as f:
+            if READY_LINE in f.read():
+                return True
+        time.sleep(0.2)
+    return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--cli', action='store_true', help="measure --cli mode instead of the tray app")
+    parser.add_argument('--idle-seconds', type=float, default=3, help="microphone and mixer idle timeout")
+    parser.add_argument('--settle', type=float, default=10, help="seconds to wait after startup")
+    parser.add_argument('--window', type=float, default=30, help="seconds to count wakeups over")
+    parser.add_argument('--max-wakeups', type=float, help="fail above this many wakeups per second")
+    parser.add_argument('--max-rss-mb', type=float, help="fail above this resident memory")
+    parser.add_argument('--json', help="write results to this file")
+    args = parser.parse_args()
+
+    log_path = os.path.join(tempfile.mkdtemp(prefix='myscribe-bench-'), 'app.log')
+    process, log = launch(args.cli, args.idle_seconds, log_path)
+    try:
+        if not wait_ready(process, log_path):
+            with open(log_path, encoding='utf-8', errors='replace') as f:
+                print(f.read())
+            sys.exit("[MyScribe] The app did not start.")
+        time.sleep(max(args.settle, args.idle_seconds + 2))
+        threads_before = thread_wakeups(process.pid)
+        voluntary, involuntary, cpu, _rss = sample(process.pid)
+        time.sleep(args.window)
+        voluntary_end, involuntary_end, cpu_end, rss = sample(process.pid)
+        threads_after = thread_wakeups(process.pid)
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+        log.close()
+
+    busiest = sorted(((name, (count - threads_before.get(name, 0)) / args.window)
+                      for name, count in threads_after.items()), key=lambda item: item[1], reverse=True)
+    result = {
+        'mode': 'cli' if args.cli else 'tray',
+        'window_seconds': args.window,
+        'wakeups_per_second': round((voluntary_end - voluntary) / args.window, 3),
+        'preemptions_per_second': round((involuntary_end - involuntary) / args.window, 3),
+        'cpu_percent': round((cpu_end - cpu) / args.window * 100, 3),
+        'rss_mb': round(rss / 1024 / 1024, 1),
+        'busiest_threads': {name: round(rate, 3) for name, rate in busiest[:5] if rate > 0},
+    }
+    print(f"[MyScribe] Idle {result['mode']}: {result['wakeups_per_second']:.2f} wakeups/s, "
+          f"{result['cpu_percent']:.2f}% CPU, {result['rss_mb']:.0f} MB resident.")
+    write_results('idle', result, args.json)
+
+    failures = []
+    if args.max_wakeups is not None and result['wakeups_per_second'] > args.max_wakeups:
+        failures.append(f"{result['wakeups_per_second']:.2f} wakeups/s exceeds {args.max_wakeups:g}")
+    if args.max_rss_mb is not None and result['rss_mb'] > args.max_rss_mb:
+        failures.append(f"{result['rss_mb']:.0f} MB resident exceeds {args.max_rss_mb:g} MB")
+    for failure in failures:
+        print(f"[MyScribe] Idle regression: {failure}.")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
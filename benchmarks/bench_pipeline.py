@@ -0,0 +1,122 @@
+"""End-to-end latency and throughput of process_audio_file with offline fake providers.
+
+Every job gets its own synthetic recording, so the result cache never hits. STT and
+LLM calls are replaced by fakes that sleep for a configurable latency +/- jitter;
+everything else (hashing, VAD, cache, chunked cleaning, database) is the real code.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_pipeline --jobs 40 --concurrency 1,2,4,8 --json bench_pipeline.json
+"""
+import argparse
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.common import summarize, use_temp_appdata, write_results, write_speech_like_audio
+
+use_temp_appdata()
+AUDIO_DIR = tempfile.mkdtemp(prefix='myscribe-bench-audio-')
+# Must be set before src.main reads its configuration
+os.environ.update({
+    'STT_PROVIDER': 'fake',
+    'LLM_PROVIDER': 'fake',
+    'HEDGE_STT': '0',
+    'HEDGE_LLM': '0',
+    'AUDIO_STORAGE_PATH': AUDIO_DIR,
+})
+from src import main as app  # noqa: E402
+from src.utils.providers import FakeLLMProvider, FakeSTTProvider  # noqa: E402
+
+SENTENCE = "So the next thing we need to do is, um, check the numbers again before the meeting. "
+# Roughly how fast people dictate
+WORDS_PER_SECOND = 2.5
+
+
+class DictationSTT(FakeSTTProvider):
+    """Returns a transcript as long as the audio would produce, unique per file."""
+
+    def __init__(self, audio_seconds, **kwargs):
+        super().__init__(**kwargs)
+        sentences = max(1, int(audio_seconds * WORDS_PER_SECOND / len(SENTENCE.split())))
+        self.body = SENTENCE * sentences
+
+    async def transcribe(self, audio_path):
+        name = await super().transcribe(audio_path)
+        return f"{name}. {self.body}"
+
+
+def make_audio(count, seconds):
+    paths = []
+    for i in range(count):
+        path = os.path.join(AUDIO_DIR, f"bench_{i:04d}.flac")
+        paths.append(write_speech_like_audio(path, seconds, seed=i))
+    return paths
+
+
+def run(paths, concurrency):
+    latencies = []
+
+    def one(path):
+        start = time.perf_counter()
+        text = app.process_audio_file(path)
+        latencies.append((time.perf_counter() - start) * 1000)
+        return text is not None
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        ok = sum(pool.map(one, paths))
+    return time.perf_counter() - start, latencies, ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--jobs', type=int, default=40, help="jobs per concurrency level")
+    parser.add_argument('--concurrency', default='1,2,4,8')
+    parser.add_argument('--audio-seconds', type=float, default=20)
+    parser.add_argument('--stt-latency', type=float, default=0.8)
+    parser.add_argument('--stt-jitter', type=float, default=0.2)
+    parser.add_argument('--llm-latency', type=float, default=1.0)
+    parser.add_argument('--llm-jitter', type=float, default=0.3)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--json', help="write results to this file")
+    args = parser.parse_args()
+
+    levels = [int(c) for c in args.concurrency.split(',')]
+    paths = make_audio(args.jobs * len(levels), args.audio_seconds)
+    app.stt_provider = DictationSTT(args.audio_seconds, latency=args.stt_latency, jitter=args.stt_jitter,
+                                    seed=args.seed)
+    app.llm_provider = FakeLLMProvider(latency=args.llm_latency, jitter=args.llm_jitter, seed=args.seed)
+
+    results = []
+    for n, concurrency in enumerate(levels):
+        batch = paths[n * args.jobs:(n + 1) * args.jobs]
+        elapsed, latencies, ok = run(batch, concurrency)
+        latency = summarize(latencies)
+        result = {
+            'concurrency': concurrency,
+            'jobs': len(batch),
+            'succeeded': ok,
+            'audio_seconds_per_job': args.audio_seconds,
+            'latency': latency,
+            'jobs_per_s': round(len(batch) / elapsed, 4),
+            'audio_minutes_per_s': round(len(batch) * args.audio_seconds / 60 / elapsed, 4),
+            # Time not spent waiting on the fake providers
+            'overhead_p50_ms': round(latency['p50_ms'] - (args.stt_latency + args.llm_latency) * 1000, 4),
+        }
+        results.append(result)
+        print(f"concurrency {concurrency:>2}: p50 {result['latency']['p50_ms']:.0f} ms, "
+              f"p95 {result['latency']['p95_ms']:.0f} ms, {result['jobs_per_s']:.2f} jobs/s, "
+              f"{result['audio_minutes_per_s']:.2f} audio min/s, {ok}/{len(batch)} ok")
+    app.providers.stop()
+    app.metrics.close()
+    write_results('pipeline', {
+        'stt_latency_s': args.stt_latency, 'stt_jitter_s': args.stt_jitter,
+        'llm_latency_s': args.llm_latency, 'llm_jitter_s': args.llm_jitter,
+        'levels': results,
+    }, args.json)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+"""CPU cost of the recorder per second of captured audio, for each capture profile.
+
+A synthetic input stream stands in for the sound device and calls the recorder's
+callback with speech-like blocks as fast as the writer thread keeps up, so the
+numbers cover the callback, the ring buffer and encoding to disk, not waiting.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_recorder --seconds 120 --json bench_recorder.json
+"""
+import argparse
+import os
+import tempfile
+import time
+from types import SimpleNamespace
+
+import numpy as np
+
+from benchmarks.common import speech_like_audio, summarize, write_results
+from src.utils.audio import CAPTURE_PROFILES, opus_available
+from src.utils.recorder import Recorder
+
+STATUS_OK = SimpleNamespace(input_overflow=False)
+
+
+class SyntheticInputStream:
+    """Just enough of sounddevice.InputStream for Recorder; the benchmark calls ``callback`` itself."""
+
+    def __init__(self, samplerate, channels, dtype, blocksize, callback):
+        self.samplerate = samplerate
+        self.channels = channels
+        self.dtype = dtype
+        self.blocksize = blocksize
+        self.callback = callback
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+    def close(self):
+        pass
+
+    def blocks(self, seconds, seed=0):
+        signal = speech_like_audio(seconds, self.samplerate, seed)
+        if np.dtype(self.dtype) == np.int16:
+            signal = (signal * 32767).astype(np.int16)
+        signal = np.repeat(signal[:, None], self.channels, axis=1)
+        usable = len(signal) - len(signal) % self.blocksize
+        return [signal[i:i + self.blocksize] for i in range(0, usable, self.blocksize)]
+
+
+def measure(profile_name, seconds):
+    profile = CAPTURE_PROFILES[profile_name]
+    streams = []
+
+    def factory(**kwargs):
+        streams.append(SyntheticInputStream(**kwargs))
+        return streams[-1]
+
+    recorder = Recorder(profile, stream_factory=factory)
+    recorder.open()
+    stream = streams[0]
+    blocks = stream.blocks(seconds)
+    # Never let the writer fall more than half the ring behind, or frames would be dropped
+    max_lag = recorder._ring.shape[0] // 2
+    path = os.path.join(tempfile.mkdtemp(prefix='myscribe-bench-rec-'), f"bench.{profile.extension}")
+
+    callback_ms = []
+    cpu_start, wall_start = time.process_time(), time.perf_counter()
+    capture = recorder.start(path)
+    for block in blocks:
+        while recorder._write_pos - capture._read_pos > max_lag:
+            time.sleep(0.001)
+        start = time.perf_counter()
+        stream.callback(block, len(block), None, STATUS_OK)
+        callback_ms.append((time.perf_counter() - start) * 1000)
+    capture.stop()
+    capture.wait()
+    cpu = time.process_time() - cpu_start
+    wall = time.perf_counter() - wall_start
+    recorder.close()
+    audio_seconds = len(blocks) * stream.blocksize / stream.samplerate
+    size = os.path.getsize(path)
+    os.remove(path)
+    return {
+        'profile': profile_name,
+        'audio_seconds': round(audio_seconds, 3),
+        'cpu_ms_per_audio_second': round(cpu * 1000 / audio_seconds, 4),
+        'wall_ms_per_audio_second': round(wall * 1000 / audio_seconds, 4),
+        'callback': summarize(callback_ms),
+        'bytes_per_audio_second': round(size / audio_seconds, 1),
+        'dropped_frames': capture.dropped_frames,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--seconds', type=float, default=120)
+    available = [name for name, profile in CAPTURE_PROFILES.items() if profile.subtype != 'OPUS' or opus_available()]
+    parser.add_argument('--profiles', default=','.join(available))
+    parser.add_argument('--json', help="write results to this file")
+    args = parser.parse_args()
+
+    results = []
+    for name in args.profiles.split(','):
+        result = measure(name, args.seconds)
+        results.append(result)
+        print(f"{name:>8}: {result['cpu_ms_per_audio_second']:.2f} ms CPU per audio second, "
+              f"callback p95 {result['callback']['p95_ms'] * 1000:.0f} us, "
+              f"{result['bytes_per_audio_second'] / 1024:.1f} KB/s, {result['dropped_frames']} dropped")
+    write_results('recorder', results, args.json)
+
+
+if __name__ == '__main__':
+    main()
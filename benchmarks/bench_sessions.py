@@ -0,0 +1,139 @@
+"""Stop-to-ready latency for back-to-back dictations, with a regression limit.
+
+Records a series of short dictations where each one starts as soon as the previous
+one is stopped, through the same session manager the hotkeys use. A synthetic input
+stream feeds the recorder in real time (or faster with --speed) and ``on_finished``
+sleeps to stand in for the pipeline hand-off, so earlier sessions are still being
+finalised while the next is recording. Exits with status 1 when the stop-to-ready
+p95 exceeds the limit or a session loses its file.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_sessions --dictations 50 --max-ms 50 --json bench_sessions.json
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from benchmarks.bench_recorder import STATUS_OK, SyntheticInputStream
+from benchmarks.common import summarize, use_temp_appdata, write_results
+
+use_temp_appdata()
+from src.utils import db  # noqa: E402
+from src.utils.audio import CAPTURE_PROFILES, DEFAULT_CAPTURE_PROFILE  # noqa: E402
+from src.utils.metrics import metrics  # noqa: E402
+from src.utils.recorder import Recorder  # noqa: E402
+from src.utils.sessions import STOP_READY_TARGET_MS, SessionManager  # noqa: E402
+
+
+def feed(stream, blocks, speed, stop_event):
+    """Calls the stream callback with ``blocks`` (looped) at ``speed`` times real time until ``stop_event`` is set."""
+    interval = stream.blocksize / stream.samplerate / speed
+    next_at = time.perf_counter()
+    i = 0
+    while not stop_event.is_set():
+        stream.callback(blocks[i % len(blocks)], stream.blocksize, None, STATUS_OK)
+        i += 1
+        next_at += interval
+        delay = next_at - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--dictations', type=int, default=50)
+    parser.add_argument('--seconds', type=float, default=0.5, help="length of each dictation")
+    parser.add_argument('--speed', type=float, default=1.0, help="input stream speed relative to real time")
+    parser.add_argument('--handoff-ms', type=float, default=200, help="simulated work after each file is complete")
+    parser.add_argument('--profile', default=DEFAULT_CAPTURE_PROFILE)
+    parser.add_argument('--max-ms', type=float, default=STOP_READY_TARGET_MS,
+                        help="fail above this stop-to-ready p95")
+    parser.add_argument('--json', help="write results to this file")
+    args = parser.parse_args()
+
+    db.init_db()
+    profile = CAPTURE_PROFILES[args.profile]
+    out_dir = tempfile.mkdtemp(prefix='myscribe-bench-sessions-')
+    streams = []
+
+    def factory(**kwargs):
+        streams.append(SyntheticInputStream(**kwargs))
+        return streams[-1]
+
+    recorder = Recorder(profile, stream_factory=factory)
+    recorder.open()
+    finished = []
+
+    def start_capture(session, on_finished):
+        path = os.path.join(out_dir, f"session_{session.id}.{profile.extension}")
+        return recorder.start(path, requested_at=session.requested_at, on_finished=on_finished)
+
+    def on_finished(session):
+        time.sleep(args.handoff_ms / 1000)
+        finished.append(session)
+
+    sessions = SessionManager(start_capture, on_finished)
+    stop_event = threading.Event()
+    blocks = streams[0].blocks(60)
+    feeder = threading.Thread(target=feed, args=(streams[0], blocks, args.speed, stop_event), daemon=True)
+    feeder.start()
+
+    stop_ready_ms, stop_to_start_ms, overlapping = [], [], []
+    sessions.start()
+    try:
+        for _ in range(args.dictations):
+            time.sleep(args.seconds / args.speed)
+            stopped_at = time.perf_counter()
+            session = sessions.stop()
+            sessions.start()
+            stop_to_start_ms.append((time.perf_counter() - stopped_at) * 1000)
+            stop_ready_ms.append(session.stop_ready_ms)
+            overlapping.append(len(sessions.finalizing()))
+        # Record the last session too, so it has audio past the previous one's end
+        time.sleep(args.seconds / args.speed)
+        sessions.stop()
+        complete = sessions.wait_finalized(timeout=30)
+        # on_finished runs after the file is complete; give the last hand-offs time to return
+        deadline = time.monotonic() + 10
+        while len(finished) < args.dictations + 1 and time.monotonic() < deadline:
+            time.sleep(0.05)
+    finally:
+        stop_event.set()
+        feeder.join()
+        recorder.close()
+        metrics.close()
+
+    empty = [s.id for s in finished if s.capture.frames_written == 0 or not os.path.exists(s.capture.filename)]
+    result = {
+        'profile': args.profile,
+        'dictations': args.dictations + 1,
+        'stop_ready': summarize(stop_ready_ms),
+        'stop_to_next_start': summarize(stop_to_start_ms),
+        'max_finalizing_at_start': max(overlapping),
+        'sessions_finished': len(finished),
+        'sessions_empty': len(empty),
+        'dropped_frames': recorder.dropped_frames,
+    }
+    print(f"[MyScribe] Stop-to-ready p50 {result['stop_ready']['p50_ms']:.2f} ms, "
+          f"p95 {result['stop_ready']['p95_ms']:.2f} ms; stop-to-next-start p95 "
+          f"{result['stop_to_next_start']['p95_ms']:.2f} ms; up to {result['max_finalizing_at_start']} "
+          f"session(s) finalizing; {result['sessions_finished']}/{result['dictations']} finished.")
+    write_results('sessions', result, args.json)
+
+    failures = []
+    if result['stop_to_next_start']['p95_ms'] > args.max_ms:
+        failures.append(f"stop-to-next-start p95 {result['stop_to_next_start']['p95_ms']:.1f} ms "
+                        f"exceeds {args.max_ms:g} ms")
+    if not complete or len(finished) != result['dictations'] or empty:
+        failures.append(f"{result['dictations'] - len(finished) + len(empty)} session(s) lost their file")
+    for failure in failures:
+        print(f"[MyScribe] Session regression: {failure}.")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+
+def use_temp_appdata():
+    """Keeps benchmark databases out of the real profile. Call before importing src.utils.db."""
+    tmp = tempfile.mkdtemp(prefix='myscribe-bench-')
+    os.environ['APPDATA'] = tmp
+    return tmp
+
+
+def time_calls(fn, repeat):
+    """Calls ``fn`` ``repeat`` times and returns per-call latencies in milliseconds."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def summarize(samples):
+    ordered = sorted(samples)
+    return {
+        'p50_ms': round(statistics.median(ordered), 4),
+        'p95_ms': round(ordered[int(0.95 * (len(ordered) - 1))], 4),
+        'max_ms': round(ordered[-1], 4),
+    }
+
+
+def speech_like_audio(seconds, samplerate=16000, seed=0):
+    """Synthetic dictation as float32 mono: voiced syllables at ~4 Hz, pauses between phrases.
+
+    Not intelligible, but it has what the pipeline reacts to: a pitched harmonic
+    signal, bursts and gaps the VAD trims and segments split on, and a noise floor.
+    """
+    rng = np.random.default_rng(seed)
+    n = int(seconds * samplerate)
+    t = np.arange(n) / samplerate
+    # Pitch wandering around 140 Hz, five harmonics
+    f0 = 140 + 30 * np.sin(2 * np.pi * 0.3 * t + rng.uniform(0, 2 * np.pi))
+    phase = 2 * np.pi * np.cumsum(f0) / samplerate
+    voiced = sum(np.sin(k * phase) / k for k in range(1, 6))
+    syllables = np.clip(np.sin(2 * np.pi * 4.0 * t + rng.uniform(0, 2 * np.pi)), 0, None) ** 2
+    # Phrases of 1.5-4 s separated by 0.3-1 s pauses, with silence at both ends
+    phrases = np.zeros(n)
+    pos = int(0.5 * samplerate)
+    while pos < n - samplerate // 2:
+        length = int(rng.uniform(1.5, 4.0) * samplerate)
+        phrases[pos:min(pos + length, n - samplerate // 2)] = rng.uniform(0.5, 1.0)
+        pos += length + int(rng.uniform(0.3, 1.0) * samplerate)
+    signal = 0.3 * voiced * syllables * phrases + rng.normal(0, 0.003, n)
+    return signal.astype(np.float32)
+
+
+def write_speech_like_audio(path, seconds, samplerate=16000, seed=0):
+    """Writes ``speech_like_audio`` to ``path``; the format follows the extension."""
+    import soundfile as sf
+    sf.write(path, speech_like_audio(seconds, samplerate, seed), samplerate)
+    return path
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def write_results(name, results, path=None):
+    """Prints results and optionally writes them as JSON for comparison between commits."""
+    payload = {
+        'benchmark': name,
+        'revision': git_revision(),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'results': results,
+    }
+    text = json.dumps(payload, indent=2)
+    if path:
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        print(f"[MyScribe] Benchmark results written to {path}")
+    else:
+        print(text)
+    return payload
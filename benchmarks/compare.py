@@ -0,0 +1,83 @@
+"""Compares two benchmark result files and lists the metrics that moved.
+
+Numbers are matched by their path in the JSON; list entries are matched by their first
+field (profile, concurrency level, ...) when it is a name or number. Keys ending in
+``_ms``, ``_mb``, ``_percent`` or ``per_second`` (CPU per audio second, idle wakeups) are
+lower-is-better, ``per_s`` keys (throughput) higher-is-better;
+the exit status is 1 when any of them regressed by more than ``--threshold``.
+
+    python -m benchmarks.compare baseline.json candidate.json --threshold 10
+"""
+import argparse
+import json
+import sys
+
+
+def flatten(value, prefix=''):
+    if isinstance(value, dict):
+        for key, item in value.items():
+            yield from flatten(item, f"{prefix}.{key}" if prefix else key)
+    elif isinstance(value, list):
+        for i, item in enumerate(value):
+            label = i
+            if isinstance(item, dict) and item:
+                key, first = next(iter(item.items()))
+                if isinstance(first, (str, int)) and not isinstance(first, bool):
+                    label = f"{key}={first}"
+            yield from flatten(item, f"{prefix}[{label}]")
+    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+        yield prefix, value
+
+
+def direction(path):
+    """1 if a larger value is worse, -1 if a smaller value is worse, 0 if neither."""
+    key = path.rsplit('.', 1)[-1]
+    if key.endswith(('_ms', '_mb', '_percent', 'per_second')):
+        return 1
+    if key.endswith('per_s'):
+        return -1
+    return 0
+
+
+def compare(baseline, candidate, threshold):
+    """Returns (path, old, new, change %, regressed) for every comparable metric that changed."""
+    old_values = dict(flatten(baseline['results']))
+    rows = []
+    for path, new in flatten(candidate['results']):
+        old = old_values.get(path)
+        sign = direction(path)
+        if old is None or not sign or old == new:
+            continue
+        change = (new - old) / old * 100 if old else float('inf')
+        rows.append((path, old, new, change, change * sign > threshold))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('baseline')
+    parser.add_argument('candidate')
+    parser.add_argument('--threshold', type=float, default=10, help="percent change that counts as a regression")
+    args = parser.parse_args()
+
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)
+    with open(args.candidate, encoding='utf-8') as f:
+        candidate = json.load(f)
+    if baseline['benchmark'] != candidate['benchmark']:
+        sys.exit(f"Different benchmarks: {baseline['benchmark']} vs {candidate['benchmark']}")
+
+    rows = compare(baseline, candidate, args.threshold)
+    print(f"{candidate['benchmark']}: {baseline['revision']} -> {candidate['revision']}")
+    regressions = 0
+    for path, old, new, change, regressed in rows:
+        if abs(change) < args.threshold:
+            continue
+        regressions += regressed
+        print(f"  {'REGRESSED' if regressed else 'improved ':<10}{path:<50}{old:>12.4g} -> {new:<12.4g}({change:+.1f}%)")
+    print(f"[MyScribe] {regressions} regression(s) over {args.threshold:g}%.")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == '__main__':
+    main()
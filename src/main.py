@@ -1,25 +1,34 @@
 import sys
+import time
+from src.utils.startup import StartupProfiler
+
+# Created before the other imports so --profile-startup can time them
+profiler = StartupProfiler(enabled='--profile-startup' in sys.argv)
+
+import asyncio
+import concurrent.futures
 from dotenv import load_dotenv
 import os
-import time
-import threading
-import queue
-import glob
 from datetime import datetime, timedelta
-from pathlib import Path
 
-from PySide6.QtCore import QObject, Signal
-from PySide6.QtGui import QIcon, QAction, QPainter, QColor, QPixmap
-from PySide6.QtWidgets import QApplication, QSystemTrayIcon, QMenu
-import sounddevice as sd
-import soundfile as sf
 import keyboard
-import pygame
-import assemblyai as aai
-import google.generativeai as genai
 from src.utils import db
-from src.ui.history_window import HistoryWindow
-
+from src.utils.batch import BatchRunner, find_audio_files
+from src.utils.audio import audio_duration, get_capture_profile, is_empty_audio, upload_stats
+from src.utils.chunking import ChunkStitcher, split_transcript
+from src.utils.cues import CuePlayer
+from src.utils.export import FORMATS, export_history
+from src.utils.metrics import metrics
+from src.utils.cache import CLEANED, TRANSCRIPT, ResultCache, hash_file, hash_text
+from src.utils.providers import ProviderRuntime, create_llm_provider, create_stt_provider
+from src.utils.recorder import Recorder, SegmentWriter
+from src.utils.scheduler import Job, JobScheduler, run_stages
+from src.utils.sessions import RECORDING, SessionManager
+from src.utils.streaming import SentenceAssembler, StreamingTranscription, undelivered_text
+from src.utils.retention import RetentionSweeper, catalog_audio, touch_audio
+from src.utils.vad import trim_silence
+
+# Qt (tray mode only), audio libraries and provider SDKs are imported on first use
 def resource_path(relative_path):
     """ Get absolute path to resource, works for dev and for PyInstaller """
     try:
@@ -42,6 +51,67 @@ SPEECH_TO_TEXT_KEY = os.getenv('SPEECH_TO_TEXT_KEY')
 LLM_KEY = os.getenv('LLM_KEY')
 RETENTION_DAYS = int(os.getenv('RETENTION_DAYS', 30))
 AUDIO_DIR = os.getenv('AUDIO_STORAGE_PATH', './audio')
+SEGMENT_DIR = os.path.join(AUDIO_DIR, 'segments')
+# 16 kHz mono FLAC by default; see src/utils/audio.py for the other profiles
+CAPTURE_PROFILE = get_capture_profile()
+# Streaming mode cuts the recording into segments and transcribes them while recording continues
+STREAMING_MODE = os.getenv('STREAMING_MODE', '1') == '1'
+SEGMENT_SECONDS = float(os.getenv('SEGMENT_SECONDS', 30))
+SEGMENT_MAX_SECONDS = float(os.getenv('SEGMENT_MAX_SECONDS', 45))
+SEGMENT_SILENCE_LEVEL = float(os.getenv('SEGMENT_SILENCE_LEVEL', 0.02))
+# Trim silence before upload and skip the API calls entirely when there is no speech
+VAD_ENABLED = os.getenv('VAD_ENABLED', '1') == '1'
+# Stream cleaned text sentence by sentence to paste/clipboard as the LLM produces it
+STREAM_CLEANING = os.getenv('STREAM_CLEANING', '1') == '1'
+# Long transcripts are cleaned in overlapping chunks, CLEAN_CONCURRENCY at a time
+CHUNK_MAX_CHARS = int(os.getenv('CHUNK_MAX_CHARS', 3000))
+CHUNK_OVERLAP_SENTENCES = int(os.getenv('CHUNK_OVERLAP_SENTENCES', 1))
+CLEAN_CONCURRENCY = int(os.getenv('CLEAN_CONCURRENCY', 4))
+# Cache of transcripts by audio hash and cleaned text by (prompt, model, transcript) hash
+CACHE_MEMORY_ENTRIES = int(os.getenv('CACHE_MEMORY_ENTRIES', 256))
+CACHE_MAX_MB = float(os.getenv('CACHE_MAX_MB', 50))
+CACHE_MAX_AGE_DAYS = float(os.getenv('CACHE_MAX_AGE_DAYS', 90))
+# Bounded processing pool; failed stages are retried with exponential backoff
+MAX_WORKERS = int(os.getenv('MAX_WORKERS', 2))
+JOB_MAX_ATTEMPTS = int(os.getenv('JOB_MAX_ATTEMPTS', 4))
+JOB_BACKOFF_SECONDS = float(os.getenv('JOB_BACKOFF_SECONDS', 2))
+# Jobs that ran out of attempts are listed at each launch for this long, then dropped
+FAILED_JOB_DAYS = float(os.getenv('FAILED_JOB_DAYS', 7))
+# Files transcribed at once by --batch
+BATCH_CONCURRENCY = int(os.getenv('BATCH_CONCURRENCY', 4))
+# Audio from before the hotkey press that is added to the start of each recording
+PREROLL_MS = int(os.getenv('PREROLL_MS', 500))
+# Idle mode (off by default): release the microphone and sound mixer after this many quiet
+# seconds to stop their audio threads waking the CPU. The trade-off: the first recording after
+# a release has no pre-roll and starts once the device has reopened, and the first cue after
+# a release waits for the mixer to reopen.
+RECORDER_IDLE_SECONDS = float(os.getenv('RECORDER_IDLE_SECONDS', 0))
+CUE_IDLE_SECONDS = float(os.getenv('CUE_IDLE_SECONDS', 0))
+# Auto-paste puts the text on the clipboard, sends PASTE_CHORD and restores the clipboard;
+# 'type' mode types it instead, for fields that reject pastes
+INJECTION_MODE = os.getenv('INJECTION_MODE', 'paste').lower()
+PASTE_CHORD = os.getenv('PASTE_CHORD', 'ctrl+v')
+CLIPBOARD_RESTORE_MS = int(os.getenv('CLIPBOARD_RESTORE_MS', 500))
+# Stage timings go to the metrics table (see --stats); set a path to also export Prometheus text format
+METRICS_PROM_FILE = os.getenv('METRICS_PROM_FILE')
+# PRD target for hotkey press to recording started; slower starts are logged
+HOTKEY_LATENCY_TARGET_MS = 200
+# Recordings older than ARCHIVE_AFTER_DAYS are re-encoded compactly (0 disables); total audio is
+# capped at AUDIO_MAX_MB by evicting the least recently used files (0 disables)
+ARCHIVE_AFTER_DAYS = float(os.getenv('ARCHIVE_AFTER_DAYS', 0))
+AUDIO_MAX_MB = float(os.getenv('AUDIO_MAX_MB', 1024))
+RETENTION_SWEEP_MINUTES = float(os.getenv('RETENTION_SWEEP_MINUTES', 60))
+
+# Provider backends; 'fake' runs the pipeline offline against local stand-ins
+STT_PROVIDER = os.getenv('STT_PROVIDER', 'assemblyai')
+LLM_PROVIDER = os.getenv('LLM_PROVIDER', 'gemini')
+GEMINI_MODEL = os.getenv('GEMINI_MODEL', 'models/gemini-2.5-flash')
+# Hedging sends a backup request when a call is slower than the HEDGE_PERCENTILE latency for
+# its input size. Off by default: every hedge pays for a second request.
+HEDGE_STT = os.getenv('HEDGE_STT', '0') == '1'
+HEDGE_LLM = os.getenv('HEDGE_LLM', '0') == '1'
+HEDGE_PERCENTILE = float(os.getenv('HEDGE_PERCENTILE', 95))
+HEDGE_FALLBACK_MODEL = os.getenv('HEDGE_FALLBACK_MODEL')
 
 # Warn if API keys are missing
 if not SPEECH_TO_TEXT_KEY or not LLM_KEY:
@@ -49,23 +119,21 @@ if not SPEECH_TO_TEXT_KEY or not LLM_KEY:
 
 # Ensure audio directory exists
 os.makedirs(AUDIO_DIR, exist_ok=True)
+os.makedirs(SEGMENT_DIR, exist_ok=True)
 
 # Initialize the database
 try:
-    db.init_db()
+    with profiler.phase('database'):
+        db.init_db()
 except Exception as e:
     print(f"[MyScribe] Database initialization failed: {e}")
 
-# Audio recording state
-recording = False
-continuous_mode = False
-recording_thread = None
-stop_recording_event = threading.Event()
-
-# For double-press detection
-
-# For thread-safe communication
-audio_queue = queue.Queue()
+recorder = Recorder(CAPTURE_PROFILE, preroll_ms=PREROLL_MS, idle_seconds=RECORDER_IDLE_SECONDS)
+# Decoded once and played on their own mixer channel, never on the hotkey path
+cues = CuePlayer({'pop': BUBBLE_POP_PATH, 'chime': CHIME_PATH, 'double_pop': DOUBLE_POP_PATH},
+                 idle_seconds=CUE_IDLE_SECONDS)
+retention = RetentionSweeper(AUDIO_DIR, RETENTION_DAYS, ARCHIVE_AFTER_DAYS, int(AUDIO_MAX_MB * 1024 * 1024),
+                             RETENTION_SWEEP_MINUTES * 60)
 
 # Gemini prompt from PRD
 GEMINI_PROMPT = (
@@ -74,151 +142,355 @@ GEMINI_PROMPT = (
     "If the user outlines a list, format it with bullet points. Do not add any commentary or text that was not in the original transcript."
 )
 
+# --- Providers (long-lived clients on a shared event loop) ---
+providers = ProviderRuntime()
+stt_provider = create_stt_provider(STT_PROVIDER, SPEECH_TO_TEXT_KEY, hedge=HEDGE_STT,
+                                   hedge_percentile=HEDGE_PERCENTILE)
+llm_provider = create_llm_provider(LLM_PROVIDER, LLM_KEY, GEMINI_MODEL, hedge=HEDGE_LLM,
+                                   fallback_model=HEDGE_FALLBACK_MODEL, hedge_percentile=HEDGE_PERCENTILE)
+
+metrics.export_path = METRICS_PROM_FILE
+
+result_cache = ResultCache(CACHE_MEMORY_ENTRIES, int(CACHE_MAX_MB * 1024 * 1024), CACHE_MAX_AGE_DAYS)
+
 # --- AssemblyAI Integration (SDK) ---
 def transcribe_with_assemblyai(audio_path, timeout=120):
-    aai.settings.api_key = SPEECH_TO_TEXT_KEY
-    config = aai.TranscriptionConfig(speech_model=aai.SpeechModel.best)
     try:
-        print("[MyScribe] Uploading and transcribing audio with AssemblyAI...")
-        transcript = aai.Transcriber(config=config).transcribe(audio_path)
-        if transcript.status == "error":
-            print(f"[MyScribe] AssemblyAI transcription failed: {transcript.error}")
-            return None
-        print("[MyScribe] Transcript received from AssemblyAI.")
-        return transcript.text
+        print(f"[MyScribe] Uploading and transcribing audio with {stt_provider.name}...")
+        text = providers.run(stt_provider.transcribe(audio_path), timeout)
+        print(f"[MyScribe] Transcript received from {stt_provider.name}.")
+        return text
+    except TimeoutError:
+        print(f"[MyScribe] {stt_provider.name} did not respond within {timeout} s.")
+        return None
     except Exception as e:
-        print(f"[MyScribe] AssemblyAI error: {e}")
+        print(f"[MyScribe] {stt_provider.name} error: {e}")
         return None
 
 # --- Gemini Integration (Google Generative AI) ---
-def clean_with_gemini(raw_text, timeout=60):
+async def _stream_clean(prompt, on_text):
+    assembler = SentenceAssembler()
+    start = time.perf_counter()
+    first_text = None
+    async for chunk in llm_provider.stream(prompt):
+        for piece in assembler.feed(chunk):
+            if first_text is None:
+                first_text = time.perf_counter() - start
+            on_text(piece)
+    for piece in assembler.flush():
+        if first_text is None:
+            first_text = time.perf_counter() - start
+        on_text(piece)
+    total = time.perf_counter() - start
+    metrics.record('clean_first_text', first_text or total)
+    print(f"[MyScribe] Streamed cleaning: first text after {first_text or total:.2f} s, complete after {total:.2f} s.")
+    return assembler.text
+
+async def _clean_chunks(chunks, on_text=None, timeout=None):
+    semaphore = asyncio.Semaphore(CLEAN_CONCURRENCY)
+
+    async def clean_chunk(chunk):
+        # The trailing blank line only marks a paragraph end for the stitcher
+        chunk = chunk.strip()
+        # Cached one by one, so a retry after a timeout only cleans the chunks that did not finish
+        cache_key = hash_text(GEMINI_PROMPT, llm_provider.model_name, chunk)
+        cached = result_cache.get(CLEANED, cache_key)
+        if cached is not None:
+            return cached
+        async with semaphore:
+            # The deadline applies to each request, not to every wave of chunks together
+            cleaned = await asyncio.wait_for(llm_provider.generate(GEMINI_PROMPT + "\n\n" + chunk), timeout)
+        if cleaned:
+            result_cache.put(CLEANED, cache_key, cleaned)
+        return cleaned
+
+    start = time.perf_counter()
+    tasks = [asyncio.ensure_future(clean_chunk(chunk)) for chunk in chunks]
+    stitcher = ChunkStitcher(CHUNK_OVERLAP_SENTENCES)
     try:
-        print("[MyScribe] Cleaning transcript with Gemini...")
-        genai.configure(api_key=LLM_KEY)
-        model = genai.GenerativeModel("models/gemini-2.5-flash")
+        # Chunks finish in any order but are stitched (and streamed) in order
+        for chunk, task in zip(chunks, tasks):
+            piece = stitcher.add(await task, chunk)
+            if on_text is not None and piece:
+                on_text(piece)
+    finally:
+        for task in tasks:
+            task.cancel()
+    print(f"[MyScribe] Cleaned {len(chunks)} chunks, {CLEAN_CONCURRENCY} at a time, "
+          f"in {time.perf_counter() - start:.2f} s.")
+    return stitcher.text
+
+def clean_with_gemini(raw_text, timeout=60, on_text=None):
+    """Cleans a transcript. With ``on_text``, completed sentences are passed to it as they arrive.
+
+    ``timeout`` bounds each request, so a long transcript cleaned in chunks gets it per chunk.
+    """
+    cache_key = hash_text(GEMINI_PROMPT, llm_provider.model_name, raw_text)
+    cached = result_cache.get(CLEANED, cache_key)
+    if cached is not None:
+        if on_text is not None:
+            on_text(cached)
+        return cached
+    try:
+        print(f"[MyScribe] Cleaning transcript with {llm_provider.name}...")
         prompt = GEMINI_PROMPT + "\n\n" + raw_text
-        response = model.generate_content(prompt)
-        cleaned_text = response.text.strip()
-        print("[MyScribe] Cleaned text received from Gemini.")
+        chunks = split_transcript(raw_text, CHUNK_MAX_CHARS, CHUNK_OVERLAP_SENTENCES)
+        if len(chunks) > 1:
+            cleaned_text = providers.run(_clean_chunks(chunks, on_text, timeout))
+        elif on_text is not None:
+            cleaned_text = providers.run(_stream_clean(prompt, on_text), timeout)
+        else:
+            cleaned_text = providers.run(llm_provider.generate(prompt), timeout)
+        print(f"[MyScribe] Cleaned text received from {llm_provider.name}.")
+        if cleaned_text:
+            result_cache.put(CLEANED, cache_key, cleaned_text)
         return cleaned_text
+    except TimeoutError:
+        print(f"[MyScribe] {llm_provider.name} did not respond within {timeout} s.")
+        return None
     except Exception as e:
-        print(f"[MyScribe] Gemini API error: {e}")
+        print(f"[MyScribe] {llm_provider.name} API error: {e}")
         return None
 
-def process_audio_file(audio_path):
-    def _process():
-        print(f"[MyScribe] Processing audio: {audio_path}")
-        raw_text = transcribe_with_assemblyai(audio_path)
-        if not raw_text:
-            print("[MyScribe] No transcript returned.")
-            return
-        cleaned_text = clean_with_gemini(raw_text)
+def transcribe_speech(audio_path):
+    """Runs the cache and VAD stages before STT. Returns an empty string when there is no speech."""
+    # Keyed like the cleaning cache, so switching provider or model does not return old transcripts
+    cache_key = hash_text(hash_file(audio_path), stt_provider.name, stt_provider.model_name)
+    cached = result_cache.get(TRANSCRIPT, cache_key)
+    if cached is not None:
+        return cached
+    raw_text = _transcribe_trimmed(audio_path)
+    if raw_text is not None:
+        result_cache.put(TRANSCRIPT, cache_key, raw_text)
+    return raw_text
+
+def _transcribe_trimmed(audio_path):
+    if is_empty_audio(audio_path):
+        # VAD cannot read some empty files, and there is nothing to upload anyway
+        print("[MyScribe] Recording is empty, skipping transcription.")
+        return ""
+    if not VAD_ENABLED:
+        return transcribe_with_assemblyai(audio_path)
+    try:
+        vad = trim_silence(audio_path)
+    except Exception as e:
+        print(f"[MyScribe] VAD failed, uploading untrimmed audio: {e}")
+        return transcribe_with_assemblyai(audio_path)
+    print(vad.describe())
+    if not vad.has_speech:
+        print("[MyScribe] No speech detected, skipping transcription.")
+        return ""
+    try:
+        return transcribe_with_assemblyai(vad.path)
+    finally:
+        if vad.trimmed:
+            os.remove(vad.path)
+
+# --- Pipeline stages (run by the job scheduler) ---
+def _audio_size(path):
+    """(seconds, bytes) of an audio file, or (None, None) if it cannot be read."""
+    try:
+        return audio_duration(path), os.path.getsize(path)
+    except OSError:
+        return None, None
+
+def stage_transcribe(job):
+    audio_seconds, num_bytes = _audio_size(job.audio_path)
+    with metrics.span('transcribe', audio_seconds, num_bytes, job.id):
+        raw_text = None
+        stream = job.context.pop('stream', None)
+        if stream is not None:
+            # Segments were transcribed during recording; only the tail should still be pending
+            raw_text = stream.result(timeout=120)
+            if raw_text is None:
+                print("[MyScribe] Streaming transcription failed, falling back to full file.")
+        if raw_text is None:
+            touch_audio(job.audio_path)
+            raw_text = transcribe_speech(job.audio_path)
+        if raw_text is None:
+            raise RuntimeError("No transcript returned.")
+    if not raw_text:
+        # No speech: nothing to clean or store
+        return False
+    job.data['raw_text'] = raw_text
+
+# Set by the tray app to receive streamed text as (job id, text)
+stream_sink = None
+
+def stage_clean(job):
+    on_text = None
+    # Only the job whose result is delivered next may stream, so output never interleaves.
+    # A retry after a failed stream is not streamed; only the text not yet delivered is pasted.
+    # Jobs resumed from the last session are never pasted, so they are not streamed either.
+    if (STREAM_CLEANING and stream_sink is not None and job.id is not None and job.attempts == 0
+            and not job.context.get('resumed') and job_scheduler.is_next_to_deliver(job.id)):
+        def on_text(text):
+            # Persisted with the job, so a retry knows what was already pasted
+            job.data['delivered_text'] = job.data.get('delivered_text', '') + text
+            stream_sink(job.id, text)
+    raw_text = job.data['raw_text']
+    with metrics.span('clean', num_bytes=len(raw_text.encode('utf-8')), job_id=job.id):
+        cleaned_text = clean_with_gemini(raw_text, on_text=on_text)
         if not cleaned_text:
-            print("[MyScribe] No cleaned text returned.")
-            return
-        db.insert_transcription(audio_path, cleaned_text)
-        print("[MyScribe] Cleaned text:")
-        print(cleaned_text)
-        # Return the cleaned text so it can be used by the caller
-        return cleaned_text
-    # This will be called from the tray app, which will manage the thread
-    return _process()
+            raise RuntimeError("No cleaned text returned.")
+    job.data['cleaned_text'] = cleaned_text
+    job.data['undelivered_text'] = undelivered_text(cleaned_text, job.data.get('delivered_text', ''))
+
+def stage_store(job):
+    cleaned_text = job.data['cleaned_text']
+    with metrics.span('db_insert', num_bytes=len(cleaned_text.encode('utf-8')), job_id=job.id):
+        db.insert_transcription(job.audio_path, cleaned_text)
+    print("[MyScribe] Cleaned text:")
+    print(job.data['cleaned_text'])
+
+PIPELINE_STAGES = [
+    ('transcribe', stage_transcribe),
+    ('clean', stage_clean),
+    ('store', stage_store),
+]
+
+# --batch stores results itself, a group of files per transaction
+BATCH_STAGES = [
+    ('transcribe', stage_transcribe),
+    ('clean', stage_clean),
+]
+
+job_scheduler = JobScheduler(PIPELINE_STAGES, workers=MAX_WORKERS, max_attempts=JOB_MAX_ATTEMPTS,
+                             backoff_seconds=JOB_BACKOFF_SECONDS, failed_retention_days=FAILED_JOB_DAYS)
+
+def process_audio_file(audio_path, stream=None):
+    """Runs the whole pipeline for one file on the calling thread, without retries."""
+    print(f"[MyScribe] Processing audio: {audio_path}")
+    job = Job(None, audio_path, context={'stream': stream})
+    try:
+        if not run_stages(PIPELINE_STAGES, job):
+            return None
+    except Exception as e:
+        print(f"[MyScribe] {e}")
+        return None
+    # Return the cleaned text so it can be used by the caller
+    return job.data['cleaned_text']
 
 # --- Existing CLI logic ---
 def play_chime():
-    try:
-        pygame.mixer.music.load(CHIME_PATH)
-        pygame.mixer.music.play()
-        # Add a small delay to ensure the chime plays fully
-        time.sleep(0.5)
-    except Exception as e:
-        print(f"[MyScribe] Could not play chime: {e}")
+    cues.play('chime')
 
 def play_pop():
-    try:
-        pygame.mixer.music.load(BUBBLE_POP_PATH)
-        pygame.mixer.music.play()
-        # Add a small delay to ensure the chime plays fully
-        time.sleep(0.6)
-    except Exception as e:
-        print(f"[MyScribe] Could not play pop: {e}")        
+    cues.play('pop')
 
-def delete_old_audio_files():
-    now = datetime.now()
-    for file in glob.glob(os.path.join(AUDIO_DIR, '*.wav')):
-        try:
-            mtime = datetime.fromtimestamp(os.path.getmtime(file))
-            if now - mtime > timedelta(days=RETENTION_DAYS):
-                os.remove(file)
-                print(f"Deleted old audio file: {file}")
-        except Exception as e:
-            print(f"Error deleting file {file}: {e}")
-
-def record_audio(filename, stop_event):
-    samplerate = 44100
-    channels = 1
-    print(f"Recording to {filename}...")
-    with sf.SoundFile(filename, mode='w', samplerate=samplerate, channels=channels) as file:
-        with sd.InputStream(samplerate=samplerate, channels=channels) as stream:
-            while not stop_event.is_set():
-                data, _ = stream.read(1024)
-                file.write(data)
-    print(f"Recording saved: {filename}")
-    audio_queue.put(filename)
-    # The audio file will be picked up and processed by the queue monitor
-
-def start_recording():
-    global recording, recording_thread, stop_recording_event
-    if recording:
-        return
+def play_double_pop():
+    cues.play('double_pop')
+
+def _start_capture(session, on_finished):
     timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    filename = os.path.join(AUDIO_DIR, f"myscribe_{timestamp}.wav")
-    stop_recording_event.clear()
-    recording_thread = threading.Thread(target=record_audio, args=(filename, stop_recording_event))
-    recording_thread.start()
-    recording = True
-    print("[MyScribe] Recording started.")
-
-def stop_recording():
-    global recording, recording_thread, stop_recording_event
-    if not recording:
+    # The session id keeps back-to-back recordings within one second apart
+    filename = os.path.join(AUDIO_DIR, f"myscribe_{timestamp}_{session.id}.{CAPTURE_PROFILE.extension}")
+    segments = None
+    if STREAMING_MODE:
+        stream = StreamingTranscription(transcribe_speech)
+        session.context['stream'] = stream
+        segment_base = os.path.join(SEGMENT_DIR, os.path.splitext(os.path.basename(filename))[0])
+        segments = SegmentWriter(segment_base, CAPTURE_PROFILE, stream.add_segment,
+                                 SEGMENT_SECONDS, SEGMENT_MAX_SECONDS, SEGMENT_SILENCE_LEVEL)
+    print(f"Recording to {filename}...")
+    return recorder.start(filename, requested_at=session.requested_at, segments=segments, on_finished=on_finished)
+
+def _finish_session(session):
+    # Runs on the capture's writer thread, after the next recording may already have started
+    capture = session.capture
+    if capture.error is not None or capture.frames_written == 0:
+        if capture.error is None:
+            print(f"[MyScribe] Session {session.id} recorded no audio, nothing to transcribe.")
+        # Nothing to process; let the sessions stopped after this one be delivered
+        job_scheduler.release(session.slot)
         return
-    stop_recording_event.set()
-    if recording_thread:
-        recording_thread.join()
-    recording = False
-    print("[MyScribe] Recording stopped.")
+    audio_seconds = capture.frames_written / CAPTURE_PROFILE.samplerate
+    num_bytes = catalog_audio(capture.filename, audio_seconds)
+    metrics.record('record', capture.stopped_at - capture.requested_at, audio_seconds)
+    metrics.record('finalize', time.perf_counter() - capture.stopped_at, audio_seconds, num_bytes)
+    latency = capture.first_sample_latency
+    latency_text = f"{latency * 1000:.0f} ms" if latency is not None else "n/a"
+    print(f"[MyScribe] Session {session.id} saved. Hotkey-to-first-sample: {latency_text}, "
+          f"pre-roll: {capture.preroll_frames / recorder.stream_rate * 1000:.0f} ms, "
+          f"dropped frames: {capture.dropped_frames} (total {recorder.dropped_frames}, overflows {recorder.overflows}).")
+    # Queued in the job table, so it is processed even if the app exits first. It takes the
+    # delivery slot reserved at stop, so results arrive in the order sessions were stopped.
+    job_scheduler.submit(capture.filename, context={'stream': session.context.get('stream')}, slot=session.slot)
+
+sessions = SessionManager(_start_capture, _finish_session, reserve=job_scheduler.reserve)
+
+def start_recording(requested_at=None, continuous=False):
+    """Starts a session unless one is already recording; returns it, or None."""
+    try:
+        session = sessions.start(continuous, requested_at)
+    except Exception as e:
+        print(f"[MyScribe] Could not start recording: {e}")
+        return None
+    if session is None:
+        return None
+    latency_ms = (time.perf_counter() - session.requested_at) * 1000
+    print(f"[MyScribe] Session {session.id} started {latency_ms:.0f} ms after the hotkey.")
+    if latency_ms > HOTKEY_LATENCY_TARGET_MS:
+        print(f"[MyScribe] Warning: hotkey-to-recording exceeded the {HOTKEY_LATENCY_TARGET_MS} ms target.")
+    return session
+
+def stop_recording(continuous=None):
+    """Stops the current session (only one of that kind when ``continuous`` is given) without
+    waiting for its file; returns it, or None."""
+    session = sessions.stop(continuous)
+    if session is not None:
+        print(f"[MyScribe] Session {session.id} stopped, ready for the next recording in "
+              f"{session.stop_ready_ms:.1f} ms ({len(sessions.finalizing())} finalizing).")
+    return session
+
+def toggle_continuous(requested_at=None):
+    """Starts continuous recording, or stops it; returns the session started or stopped, or None."""
+    with sessions.lock:
+        if not sessions.recording:
+            return start_recording(requested_at, continuous=True)
+        return stop_recording(continuous=True)
+
+def open_recorder():
+    # Keep the input stream warm so recordings can include pre-roll (until it is idle for a while)
+    try:
+        recorder.open()
+    except Exception as e:
+        print(f"[MyScribe] Could not open microphone: {e}")
+
+# Milestones that together mean a hotkey press records straight away (with pre-roll)
+READY_MILESTONES = ('hotkeys registered', 'recorder open')
+
+def warm_up():
+    """Opens the microphone, sound mixer and provider clients. Runs after the hotkeys are live."""
+    with profiler.phase('open recorder'):
+        open_recorder()
+    profiler.mark('recorder open')
+    # Decodes the cues on their own thread
+    cues.load()
+    with profiler.phase('provider clients'):
+        concurrent.futures.wait(providers.warm_up(stt_provider, llm_provider), timeout=30)
+    retention.start()
+    profiler.mark('warm-up done')
 
 def on_ctrl_alt_press(e=None):
-    global continuous_mode
     # This hotkey now ONLY stops continuous recording.
-    if recording and continuous_mode:
-        stop_recording()
-        continuous_mode = False
+    if stop_recording(continuous=True):
         print("[MyScribe] Continuous mode disabled.")
 
 def on_ctrl_shift_press(e=None):
-    global continuous_mode
-    if not recording:
-        continuous_mode = False # Hold-to-record
-        start_recording()
+    # Hold-to-record; ignored while a session is recording
+    start_recording(time.perf_counter())
 
 def on_key_release(e=None):
     # Stops hold-to-record when keys are released
-    if recording and not continuous_mode:
-        stop_recording()
+    stop_recording(continuous=False)
 
 def on_ctrl_alt_space(e=None):
-    global continuous_mode
     # Toggles continuous recording
-    if not recording:
-        continuous_mode = True
-        print("[MyScribe] Continuous mode enabled.")
-        start_recording()
-    elif continuous_mode:
-        stop_recording()
-        continuous_mode = False
-        print("[MyScribe] Continuous mode disabled.")
+    session = toggle_continuous(time.perf_counter())
+    if session is not None:
+        state = "enabled" if session.state == RECORDING else "disabled"
+        print(f"[MyScribe] Continuous mode {state}.")
 
 def setup_hotkeys():
     keyboard.unhook_all()  # Start fresh
@@ -232,199 +504,148 @@ def setup_hotkeys():
 
 def main_cli():
     print("[MyScribe] CLI prototype started. Press Ctrl+Alt+Space to toggle continuous, Ctrl+Shift to hold-to-record, Ctrl+Alt to stop.")
-    pygame.mixer.init()
-    delete_old_audio_files()
+    job_scheduler.start()
     setup_hotkeys()
+    profiler.mark('hotkeys registered')
+    warm_up()
+    if profiler.enabled:
+        profiler.report(READY_MILESTONES)
+        recorder.close()
+        retention.stop()
+        cues.close()
+        job_scheduler.shutdown()
+        metrics.close()
+        return
     try:
+        # Nothing to do until Ctrl+C; a long sleep stays interruptible on Windows, unlike Event.wait
         while True:
-            time.sleep(1)
+            time.sleep(3600)
     except KeyboardInterrupt:
         print("[MyScribe] Exiting...")
-        if recording:
-            stop_recording()
-
-def list_gemini_models():
-    print("[MyScribe] Listing available Gemini models:")
-    genai.configure(api_key=LLM_KEY)
-    for m in genai.list_models():
-        print(f"Model: {m.name}, Supported methods: {m.supported_generation_methods}")
-
-# --- System Tray Application ---
-class WorkerSignals(QObject):
-    started = Signal()
-    finished = Signal(str)
-    processing_finished_sound = Signal()
-
-class SystemTrayApp:
-    def __init__(self, app):
-        self.app = app
-        self.signals = WorkerSignals()
-        self.history_window = None # To hold the history window instance
-
-        self.tray_icon = QSystemTrayIcon(QIcon(ICON_PATH), self.app)
-        self.tray_icon.setToolTip("MyScribe - Idle")
-
-        menu = QMenu()
-        history_action = QAction("History", self.app)
-        history_action.triggered.connect(self.show_history)
-        menu.addAction(history_action)
-
-        self.auto_paste_action = QAction("Auto-paste", self.app)
-        self.auto_paste_action.setCheckable(True)
-        self.auto_paste_action.setChecked(True) # Default to on
-        menu.addAction(self.auto_paste_action)
-
-        menu.addSeparator()
-
-        exit_action = QAction("Exit", self.app)
-        exit_action.triggered.connect(self.on_exit)
-        menu.addAction(exit_action)
-
-        self.tray_icon.setContextMenu(menu)
-        self.tray_icon.show()
-
-        # Initialize and setup logic
-        pygame.mixer.init()
-        delete_old_audio_files()
-        self.setup_hotkeys()
-
-        # Show the history window on startup
-        self.show_history()
-
-        # Setup thread-safe signals
-        self.signals.started.connect(self.on_processing_started)
-        self.signals.finished.connect(self.on_processing_finished)
-        self.signals.processing_finished_sound.connect(self.play_double_pop)
+        stop_recording()
+        # Let stopped sessions finish their files so they are queued before exit
+        sessions.wait_finalized(timeout=5)
+        recorder.close()
+        retention.stop()
+        cues.close()
+        job_scheduler.shutdown()
+        metrics.close()
+
+def print_stats(argv):
+    """--stats [--window-hours N]: per-stage latency percentiles over the window (default 24 h)."""
+    window_hours = 24.0
+    if '--window-hours' in argv:
+        try:
+            window_hours = float(argv[argv.index('--window-hours') + 1])
+        except (IndexError, ValueError):
+            print("[MyScribe] --window-hours needs a number of hours.")
+            return
+    metrics.report(window_hours)
 
-    def set_idle_icon(self):
-        self.tray_icon.setIcon(QIcon(ICON_PATH))
-        self.tray_icon.setToolTip("MyScribe - Idle")
+def _batch_audio_path(path):
+    """The path a recording in AUDIO_DIR is stored under, so reprocessing finds its transcription."""
+    real, audio_dir = os.path.realpath(path), os.path.realpath(AUDIO_DIR)
+    if real.startswith(audio_dir + os.sep):
+        return os.path.join(AUDIO_DIR, os.path.relpath(real, audio_dir))
+    return os.path.abspath(path)
 
-    def set_recording_icon(self):
-        # For now, we'll just change the tooltip. A more advanced implementation
-        # could overlay a red dot on the icon.
-        self.tray_icon.setToolTip("MyScribe - Recording")
+def run_batch(argv):
+    """--batch <dir|glob> [--concurrency N]: transcribes and cleans existing audio files.
 
-    def set_processing_icon(self):
-        # Tooltip change for processing state
-        self.tray_icon.setToolTip("MyScribe - Processing")
+    Files already processed with the current prompt and model are skipped, so an
+    interrupted run resumes where it stopped.
+    """
+    try:
+        target = argv[argv.index('--batch') + 1]
+    except IndexError:
+        print("[MyScribe] --batch needs a directory or glob pattern.")
+        return
+    concurrency = BATCH_CONCURRENCY
+    if '--concurrency' in argv:
+        try:
+            concurrency = int(argv[argv.index('--concurrency') + 1])
+        except (IndexError, ValueError):
+            print("[MyScribe] --concurrency needs a number of files.")
+            return
+    paths = [_batch_audio_path(path) for path in find_audio_files(target, exclude_dirs=[SEGMENT_DIR])]
+    if not paths:
+        print(f"[MyScribe] No audio files found for {target}.")
+        return
+    print(f"[MyScribe] Batch: {len(paths)} audio file(s) found for {target}, {concurrency} at a time.")
+    runner = BatchRunner(BATCH_STAGES, hash_text(GEMINI_PROMPT, llm_provider.model_name), concurrency=concurrency,
+                         max_attempts=JOB_MAX_ATTEMPTS, backoff_seconds=JOB_BACKOFF_SECONDS)
+    try:
+        runner.run(paths)
+    finally:
+        providers.stop()
+        metrics.close()
+
+def _export_date(argv, flag, days=0):
+    """ISO timestamp of the date given after ``flag`` (plus ``days``), or None when absent."""
+    if flag not in argv:
+        return None
+    try:
+        day = datetime.strptime(argv[argv.index(flag) + 1], '%Y-%m-%d')
+    except (IndexError, ValueError):
+        raise ValueError(f"{flag} needs a date as YYYY-MM-DD.")
+    return (day + timedelta(days=days)).isoformat()
 
-    def on_exit(self):
-        print("[MyScribe] Exiting...")
-        if recording:
-            stop_recording()
-        keyboard.unhook_all()
-        self.app.quit()
+def run_export(argv):
+    """--export <file> [--format jsonl|md|csv] [--from YYYY-MM-DD] [--to YYYY-MM-DD] [--since-last]
 
-    def process_audio_queue(self):
-        """Monitors the queue for new audio files and processes them."""
-        while True:
-            try:
-                audio_path = audio_queue.get(timeout=1) # Use timeout to allow periodic checks
-                # Run processing in a background thread to not block the queue monitor
-                threading.Thread(target=self.run_processing, args=(audio_path,), daemon=True).start()
-                audio_queue.task_done()
-            except queue.Empty:
-                continue # This is expected, just continue the loop
-
-    def run_processing(self, audio_path):
-        self.signals.started.emit()
-        cleaned_text = process_audio_file(audio_path)
-        self.signals.finished.emit(cleaned_text or "")
-        self.signals.processing_finished_sound.emit()
-
-    def on_processing_started(self):
-        self.set_processing_icon()
-
-    def on_processing_finished(self, cleaned_text):
-        if cleaned_text:
-            if self.auto_paste_action.isChecked():
-                keyboard.write(cleaned_text)
-                print("[MyScribe] Cleaned text auto-pasted.")
-            else:
-                clipboard = QApplication.clipboard()
-                clipboard.setText(cleaned_text)
-                print("[MyScribe] Cleaned text copied to clipboard.")
-        self.set_idle_icon()
-        if self.history_window:
-            self.history_window.populate_history()
-
-    def show_history(self):
-        if self.history_window is None:
-            self.history_window = HistoryWindow()
-        self.history_window.populate_history()
-        self.history_window.show()
-        self.history_window.activateWindow()
-
-    def play_double_pop(self):
-        try:
-            pygame.mixer.music.load(DOUBLE_POP_PATH)
-            pygame.mixer.music.play()
-        except Exception as e:
-            print(f"[MyScribe] Could not play double pop: {e}")
+    Streams the history to a file; the format defaults to the file extension. ``--to``
+    is inclusive. ``--since-last`` exports only dictations added since the last export.
+    """
+    try:
+        path = argv[argv.index('--export') + 1]
+        fmt = argv[argv.index('--format') + 1] if '--format' in argv else None
+        since = _export_date(argv, '--from')
+        until = _export_date(argv, '--to', days=1)
+    except IndexError:
+        print(f"[MyScribe] Usage: --export <file> [--format {'|'.join(FORMATS)}] "
+              "[--from YYYY-MM-DD] [--to YYYY-MM-DD] [--since-last]")
+        return
+    except ValueError as e:
+        print(f"[MyScribe] {e}")
+        return
+    start = time.perf_counter()
 
-    def start_recording_ui(self):
-        self.set_recording_icon()
-        play_pop()
-        start_recording()
+    def on_progress(done, total):
+        if done % 10000 == 0 and done < total:
+            print(f"[MyScribe] Exported {done}/{total} dictations...")
 
-    def stop_recording_ui(self):
-        stop_recording()
-        play_chime() # Play chime when recording stops
-        # The icon will be set to processing when the file is picked up from the queue
-        # and back to idle when it's done.
-
-    def on_ctrl_alt_press(self, e=None):
-        global continuous_mode
-        # This hotkey now ONLY stops continuous recording.
-        if recording and continuous_mode:
-            self.stop_recording_ui()
-            continuous_mode = False
-
-    def on_ctrl_shift_press(self, e=None):
-        global continuous_mode
-        if not recording:
-            continuous_mode = False # Hold-to-record
-            self.start_recording_ui()
-
-    def on_key_release(self, e=None):
-        # Stops hold-to-record when keys are released
-        if recording and not continuous_mode:
-            self.stop_recording_ui()
-
-    def on_ctrl_alt_space(self, e=None):
-        global continuous_mode
-        # Toggles continuous recording
-        if not recording:
-            continuous_mode = True
-            self.start_recording_ui()
-        elif continuous_mode:
-            self.stop_recording_ui()
-            continuous_mode = False
-
-    def setup_hotkeys(self):
-        keyboard.unhook_all()  # Start fresh
-        keyboard.add_hotkey('ctrl+alt+space', self.on_ctrl_alt_space, suppress=False)
-        keyboard.add_hotkey('ctrl+alt', self.on_ctrl_alt_press, suppress=False)
-        keyboard.add_hotkey('ctrl+shift', self.on_ctrl_shift_press, suppress=False, trigger_on_release=False)
-        keyboard.on_release_key('ctrl', self.on_key_release)
-        keyboard.on_release_key('shift', self.on_key_release)
-        print("[MyScribe] Hotkeys registered and application is running in the system tray.")
+    try:
+        count = export_history(path, fmt, since, until, incremental='--since-last' in argv, on_progress=on_progress)
+    except (OSError, ValueError) as e:
+        print(f"[MyScribe] Export failed: {e}")
+        return
+    print(f"[MyScribe] Exported {count} dictation(s) to {path} in {time.perf_counter() - start:.1f} s.")
 
+def list_gemini_models():
+    import google.generativeai as genai
+    print("[MyScribe] Listing available Gemini models:")
+    genai.configure(api_key=LLM_KEY)
+    for m in genai.list_models():
+        print(f"Model: {m.name}, Supported methods: {m.supported_generation_methods}")
 
 if __name__ == "__main__":
-    if len(sys.argv) > 1 and sys.argv[1] == '--cli':
+    if '--cli' in sys.argv:
         main_cli()
-    elif len(sys.argv) > 1 and sys.argv[1] == '--list-gemini-models':
+    elif '--list-gemini-models' in sys.argv:
         list_gemini_models()
+    elif '--stats' in sys.argv:
+        print_stats(sys.argv)
+    elif '--batch' in sys.argv:
+        run_batch(sys.argv)
+    elif '--export' in sys.argv:
+        run_export(sys.argv)
     else:
-        app = QApplication(sys.argv)
+        with profiler.phase('qt'):
+            from PySide6.QtWidgets import QApplication
+            from src.ui.tray import SystemTrayApp
+            app = QApplication(sys.argv)
         # Prevent app from quitting when last window is closed
         app.setQuitOnLastWindowClosed(False)
-        tray_app = SystemTrayApp(app)
-
-        # Start a thread to monitor the audio queue
-        queue_monitor_thread = threading.Thread(target=tray_app.process_audio_queue, daemon=True)
-        queue_monitor_thread.start()
+        tray_app = SystemTrayApp(app, sys.modules[__name__])
 
         sys.exit(app.exec())
\ No newline at end of file
@@ -0,0 +1,112 @@
+import html
+
+from PySide6.QtCore import Qt, QSize, QEvent
+from PySide6.QtGui import QTextDocument, QAbstractTextDocumentLayout, QPalette, QColor, QPen
+from PySide6.QtWidgets import QStyledItemDelegate, QStyle, QStyleOptionViewItem, QApplication
+from src.utils import db
+
+# Role holding the full transcription text, whatever the column
+TEXT_ROLE = Qt.ItemDataRole.UserRole
+# Role holding a search snippet with db.HIGHLIGHT_START/END markers around matches
+SNIPPET_ROLE = Qt.ItemDataRole.UserRole + 1
+
+
+def snippet_to_html(snippet):
+    text = html.escape(snippet).replace("\n", "<br>")
+    return (text.replace(db.HIGHLIGHT_START, '<span style="background-color:#FFF3A0;font-weight:bold;">')
+                .replace(db.HIGHLIGHT_END, '</span>'))
+
+
+class HighlightDelegate(QStyledItemDelegate):
+    """Draws search snippets with the matched terms highlighted; other cells draw normally."""
+
+    def paint(self, painter, option, index):
+        snippet = index.data(SNIPPET_ROLE)
+        if not snippet:
+            super().paint(painter, option, index)
+            return
+        opt = QStyleOptionViewItem(option)
+        self.initStyleOption(opt, index)
+        opt.text = ""
+        style = opt.widget.style() if opt.widget else QApplication.style()
+        style.drawControl(QStyle.ControlElement.CE_ItemViewItem, opt, painter, opt.widget)
+
+        doc = self._document(snippet, opt)
+        rect = style.subElementRect(QStyle.SubElement.SE_ItemViewItemText, opt, opt.widget)
+        context = QAbstractTextDocumentLayout.PaintContext()
+        if opt.state & QStyle.StateFlag.State_Selected:
+            context.palette.setColor(QPalette.ColorRole.Text, opt.palette.color(QPalette.ColorRole.HighlightedText))
+        painter.save()
+        painter.translate(rect.topLeft())
+        painter.setClipRect(rect.translated(-rect.topLeft()))
+        doc.documentLayout().draw(painter, context)
+        painter.restore()
+
+    def sizeHint(self, option, index):
+        snippet = index.data(SNIPPET_ROLE)
+        if not snippet:
+            return super().sizeHint(option, index)
+        doc = self._document(snippet, option)
+        return QSize(int(doc.idealWidth()), int(doc.size().height()))
+
+    def _document(self, snippet, option):
+        doc = QTextDocument()
+        doc.setDefaultFont(option.font)
+        doc.setHtml(snippet_to_html(snippet))
+        if option.rect.width() > 0:
+            doc.setTextWidth(option.rect.width())
+        return doc
+
+
+class CopyButtonDelegate(QStyledItemDelegate):
+    """Paints a "Copy" button in each cell and copies the row's text on click.
+
+    Drawing the button instead of creating a QPushButton per row keeps the cost of
+    the history view independent of how many rows are loaded.
+    """
+
+    LABEL = "Copy"
+    MARGIN = 3
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._pressed = None
+
+    def _button_rect(self, option):
+        return option.rect.adjusted(self.MARGIN, self.MARGIN, -self.MARGIN, -self.MARGIN)
+
+    def paint(self, painter, option, index):
+        rect = self._button_rect(option)
+        if self._pressed == (index.row(), index.column()):
+            background = QColor("#D0D0D0")
+        elif option.state & QStyle.StateFlag.State_MouseOver:
+            background = QColor("#E0E0E0")
+        else:
+            background = QColor("#F0F0F0")
+        painter.save()
+        painter.setRenderHint(painter.RenderHint.Antialiasing)
+        painter.setPen(QPen(QColor("#D0D0D0")))
+        painter.setBrush(background)
+        painter.drawRoundedRect(rect, 4, 4)
+        painter.setPen(option.palette.color(QPalette.ColorRole.ButtonText))
+        painter.drawText(rect, Qt.AlignmentFlag.AlignCenter, self.LABEL)
+        painter.restore()
+
+    def sizeHint(self, option, index):
+        width = option.fontMetrics.horizontalAdvance(self.LABEL) + 20 + 2 * self.MARGIN
+        return QSize(width, option.fontMetrics.height() + 10 + 2 * self.MARGIN)
+
+    def editorEvent(self, event, model, option, index):
+        kind = event.type()
+        if kind not in (QEvent.Type.MouseButtonPress, QEvent.Type.MouseButtonRelease):
+            return False
+        inside = self._button_rect(option).contains(event.position().toPoint())
+        if kind == QEvent.Type.MouseButtonPress:
+            self._pressed = (index.row(), index.column()) if inside else None
+            return inside
+        was_pressed = self._pressed == (index.row(), index.column())
+        self._pressed = None
+        if inside and was_pressed:
+            text = index.data(TEXT_ROLE) or ""
+            QApplication.clipboard().setText(text)
+        return inside
@@ -0,0 +1,123 @@
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex
+from src.utils import db
+from src.ui.delegates import SNIPPET_ROLE, TEXT_ROLE
+
+PAGE_SIZE = 100
+HEADERS = ["Timestamp", "Transcription", ""]
+
+
+class TranscriptionTableModel(QAbstractTableModel):
+    """History rows loaded a page at a time as the view scrolls.
+
+    Only the first page is read when the model is reset, and new dictations are
+    inserted at the top without touching the rows already loaded, so opening and
+    refreshing cost the same however long the history is. In search mode the model
+    shows a fixed result set instead.
+    """
+
+    def __init__(self, parent=None, page_size=PAGE_SIZE):
+        super().__init__(parent)
+        self.page_size = page_size
+        self._rows = []
+        self._exhausted = False
+        self._searching = False
+        self._max_id = 0
+
+    # --- Loading ---
+    def reset(self):
+        self.beginResetModel()
+        self._searching = False
+        self._rows = db.fetch_recent(self.page_size)
+        self._exhausted = len(self._rows) < self.page_size
+        self._max_id = max((row[0] for row in self._rows), default=0)
+        self.endResetModel()
+
+    def set_search_results(self, rows):
+        self.beginResetModel()
+        self._searching = True
+        self._rows = list(rows)
+        self._exhausted = True
+        self.endResetModel()
+
+    def refresh_latest(self):
+        """Merges rows created since the last load into place; returns how many were added.
+
+        New dictations land at the top, but files imported with --batch keep their own
+        older timestamps, so each row goes where its (timestamp, id) puts it. Rows older
+        than every loaded row are left for ``fetchMore`` to page in.
+        """
+        if self._searching:
+            return 0
+        new_rows = db.fetch_transcriptions_after(self._max_id)
+        if not new_rows:
+            return 0
+        self._max_id = max(self._max_id, max(row[0] for row in new_rows))
+        added = 0
+        for row in new_rows:
+            position = self._position(row)
+            if position == len(self._rows) and not self._exhausted:
+                continue
+            self.beginInsertRows(QModelIndex(), position, position)
+            self._rows.insert(position, row)
+            self.endInsertRows()
+            added += 1
+        return added
+
+    def _position(self, row):
+        # Rows are ordered newest first by (timestamp, id), as fetch_recent pages them
+        key = (row[2], row[0])
+        lo, hi = 0, len(self._rows)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if (self._rows[mid][2], self._rows[mid][0]) > key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self._exhausted
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self._exhausted:
+            return
+        last = self._rows[-1] if self._rows else None
+        rows = db.fetch_recent(self.page_size, before=(last[2], last[0]) if last else None)
+        self._exhausted = len(rows) < self.page_size
+        if not rows:
+            return
+        self.beginInsertRows(QModelIndex(), len(self._rows), len(self._rows) + len(rows) - 1)
+        self._rows.extend(rows)
+        self._max_id = max(self._max_id, max(row[0] for row in rows))
+        self.endInsertRows()
+
+    # --- Model interface ---
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return HEADERS[section]
+        return None
+
+    def flags(self, index):
+        return Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        row = self._rows[index.row()]
+        column = index.column()
+        if role == Qt.ItemDataRole.DisplayRole:
+            if column == 0:
+                return row[2]
+            if column == 1:
+                return row[3]
+        elif role == TEXT_ROLE:
+            return row[3]
+        elif role == SNIPPET_ROLE and column == 1 and len(row) > 4:
+            return row[4]
+        return None
@@ -1,7 +1,76 @@
-from PySide6.QtWidgets import QMainWindow, QVBoxLayout, QWidget, QTableWidget, QTableWidgetItem, QPushButton, QHBoxLayout, QApplication, QHeaderView
-from PySide6.QtCore import Qt, Signal, QObject
-from PySide6.QtGui import QColor, QFont
+import os
+from datetime import date
+
+from PySide6.QtWidgets import (QMainWindow, QVBoxLayout, QHBoxLayout, QWidget, QTableView, QApplication, QHeaderView,
+                               QLineEdit, QAbstractItemView, QPushButton, QMenu, QFileDialog)
+from PySide6.QtCore import Signal, QObject, QRunnable, QThreadPool, QTimer
 from src.utils import db
+from src.ui.delegates import CopyButtonDelegate, HighlightDelegate
+from src.ui.history_model import TranscriptionTableModel
+from src.utils.export import ExportCancelled, export_history, format_for_path
+
+# Wait this long after the last keystroke before searching
+SEARCH_DEBOUNCE_MS = 150
+
+
+class SearchSignals(QObject):
+    results = Signal(int, list)
+
+
+class SearchTask(QRunnable):
+    """Runs one FTS query on the thread pool so typing never waits on the database."""
+
+    def __init__(self, generation, text):
+        super().__init__()
+        self.generation = generation
+        self.text = text
+        self.signals = SearchSignals()
+
+    def run(self):
+        try:
+            rows = db.search_transcriptions(self.text)
+        except Exception as e:
+            print(f"[MyScribe] Search failed: {e}")
+            rows = []
+        self.signals.results.emit(self.generation, rows)
+
+
+class ExportSignals(QObject):
+    progress = Signal(int, int)
+    finished = Signal(str)  # status message
+
+
+class ExportTask(QRunnable):
+    """Streams the history to a file on the thread pool so the window stays responsive."""
+
+    def __init__(self, path, incremental):
+        super().__init__()
+        self.path = path
+        self.incremental = incremental
+        self.cancelled = False
+        self.signals = ExportSignals()
+
+    def run(self):
+        try:
+            count = export_history(self.path, incremental=self.incremental, on_progress=self.signals.progress.emit,
+                                   is_cancelled=lambda: self.cancelled)
+        except ExportCancelled:
+            self.signals.finished.emit("Export cancelled.")
+            return
+        except Exception as e:
+            print(f"[MyScribe] Export failed: {e}")
+            self.signals.finished.emit(f"Export failed: {e}")
+            return
+        print(f"[MyScribe] Exported {count} dictation(s) to {self.path}.")
+        self.signals.finished.emit(f"Exported {count} dictation(s) to {os.path.basename(self.path)}.")
+
+
+EXPORT_FILTERS = {
+    "JSON Lines (*.jsonl)": '.jsonl',
+    "Markdown (*.md)": '.md',
+    "CSV (*.csv)": '.csv',
+}
+
 
 class HistoryWindow(QMainWindow):
     def __init__(self):
@@ -12,7 +81,7 @@ class HistoryWindow(QMainWindow):
             QMainWindow {
                 background-color: #FFFFFF;
             }
-            QTableWidget {
+            QTableView {
                 background-color: #FFFFFF;
                 border: 1px solid #E0E0E0;
                 gridline-color: #F0F0F0;
@@ -25,21 +94,15 @@ class HistoryWindow(QMainWindow):
                 border: 1px solid #E0E0E0;
                 font-weight: bold;
             }
-            QTableWidgetItem {
+            QTableView::item {
                 padding: 5px;
             }
-            QPushButton {
-                background-color: #F0F0F0;
+            QLineEdit {
                 border: 1px solid #D0D0D0;
                 border-radius: 4px;
-                padding: 5px 10px;
+                padding: 5px;
                 font-family: 'Segoe UI', Arial, sans-serif;
-            }
-            QPushButton:hover {
-                background-color: #E0E0E0;
-            }
-            QPushButton:pressed {
-                background-color: #D0D0D0;
+                font-size: 10pt;
             }
         """)
 
@@ -50,39 +113,110 @@ class HistoryWindow(QMainWindow):
         layout.setContentsMargins(10, 10, 10, 10)
         layout.setSpacing(10)
 
-        # Table for transcriptions
-        self.table = QTableWidget()
-        self.table.setColumnCount(3)
-        self.table.setHorizontalHeaderLabels(["Timestamp", "Transcription", ""])
+        # Search-as-you-type box; queries are debounced and run off the UI thread
+        self.search_box = QLineEdit()
+        self.search_box.setPlaceholderText('Search history (use "quotes" for phrases)')
+        self.search_box.setClearButtonEnabled(True)
+        self.search_box.textChanged.connect(self.on_search_text_changed)
+        top_row = QHBoxLayout()
+        top_row.addWidget(self.search_box)
+
+        # Export runs in the background; progress shows in the status bar
+        self.export_button = QPushButton("Export")
+        export_menu = QMenu(self.export_button)
+        export_menu.addAction("Export all...", lambda: self.start_export(incremental=False))
+        export_menu.addAction("Export new since last export...", lambda: self.start_export(incremental=True))
+        self.export_button.setMenu(export_menu)
+        top_row.addWidget(self.export_button)
+        layout.addLayout(top_row)
+        self.export_task = None
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(SEARCH_DEBOUNCE_MS)
+        self.search_timer.timeout.connect(self.run_search)
+        self.search_generation = 0
+
+        # Table for transcriptions, paged in from the database as it scrolls
+        self.model = TranscriptionTableModel(self)
+        self.table = QTableView()
+        self.table.setModel(self.model)
         self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.ResizeToContents)
         self.table.horizontalHeader().setSectionResizeMode(1, QHeaderView.ResizeMode.Stretch)
-        self.table.horizontalHeader().setSectionResizeMode(2, QHeaderView.ResizeMode.ResizeToContents)
+        self.table.horizontalHeader().setSectionResizeMode(2, QHeaderView.ResizeMode.Fixed)
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.table.verticalHeader().setDefaultSectionSize(34)
+        self.table.verticalHeader().hide()
         self.table.setShowGrid(True)
         self.table.setAlternatingRowColors(True)
+        self.table.setWordWrap(False)
+        self.table.setMouseTracking(True)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table.setItemDelegateForColumn(1, HighlightDelegate(self.table))
+        self.table.setItemDelegateForColumn(2, CopyButtonDelegate(self.table))
+        self.table.setColumnWidth(2, 70)
         layout.addWidget(self.table)
 
         self.populate_history()
 
+    def on_search_text_changed(self, text):
+        self.search_timer.start()
+
+    def run_search(self):
+        self.search_generation += 1
+        text = self.search_box.text().strip()
+        if not text:
+            self.populate_history()
+            return
+        task = SearchTask(self.search_generation, text)
+        task.signals.results.connect(self.on_search_results)
+        QThreadPool.globalInstance().start(task)
+
+    def on_search_results(self, generation, rows):
+        # Drop results of queries superseded by later keystrokes
+        if generation != self.search_generation:
+            return
+        self.model.set_search_results(rows)
+
     def populate_history(self):
-        self.table.setRowCount(0) # Clear existing rows
-        transcriptions = db.fetch_all_transcriptions()
-        for row_num, row_data in enumerate(transcriptions):
-            self.table.insertRow(row_num)
-            
-            # Timestamp
-            timestamp_item = QTableWidgetItem(row_data[2])
-            timestamp_item.setFlags(timestamp_item.flags() & ~Qt.ItemFlag.ItemIsEditable)
-            self.table.setItem(row_num, 0, timestamp_item)
-
-            # Transcription
-            transcription_item = QTableWidgetItem(row_data[3])
-            transcription_item.setFlags(transcription_item.flags() & ~Qt.ItemFlag.ItemIsEditable)
-            self.table.setItem(row_num, 1, transcription_item)
-
-            # Copy button
-            copy_button = QPushButton("Copy")
-            copy_button.clicked.connect(lambda checked, text=row_data[3]: self.copy_to_clipboard(text))
-            self.table.setCellWidget(row_num, 2, copy_button)
+        """Reloads the first page of history (or re-runs the current search)."""
+        if self.search_box.text().strip():
+            self.search_timer.start()
+            return
+        self.model.reset()
+
+    def refresh_latest(self):
+        """Adds dictations created since the last load without reloading the rest."""
+        if self.search_box.text().strip():
+            self.search_timer.start()
+            return
+        self.model.refresh_latest()
+
+    def start_export(self, incremental):
+        default_name = f"myscribe-history-{date.today().isoformat()}.jsonl"
+        path, selected_filter = QFileDialog.getSaveFileName(self, "Export history", default_name,
+                                                            ";;".join(EXPORT_FILTERS))
+        if not path:
+            return
+        if format_for_path(path) is None:
+            path += EXPORT_FILTERS.get(selected_filter, '.jsonl')
+        self.export_task = ExportTask(path, incremental)
+        self.export_task.signals.progress.connect(self.on_export_progress)
+        self.export_task.signals.finished.connect(self.on_export_finished)
+        self.export_button.setEnabled(False)
+        self.statusBar().showMessage("Exporting...")
+        QThreadPool.globalInstance().start(self.export_task)
+
+    def on_export_progress(self, done, total):
+        self.statusBar().showMessage(f"Exporting... {done}/{total}")
+
+    def on_export_finished(self, message):
+        self.export_task = None
+        self.export_button.setEnabled(True)
+        self.statusBar().showMessage(message, 10000)
+
+    def cancel_export(self):
+        if self.export_task is not None:
+            self.export_task.cancelled = True
 
     def copy_to_clipboard(self, text):
         clipboard = QApplication.clipboard()
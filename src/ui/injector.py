@@ -0,0 +1,134 @@
+import queue
+import threading
+import time
+
+from PySide6.QtCore import QMimeData, QTimer
+from PySide6.QtWidgets import QApplication
+import keyboard
+from src.utils.metrics import metrics
+
+PASTE = 'paste'
+TYPE = 'type'
+# Characters per keyboard.write call when typing, so progress can be measured and logged
+TYPE_CHUNK_CHARS = 200
+# Minimum gap between pastes so the target has read the clipboard before it changes again;
+# text arriving within the gap is joined into the next paste
+PASTE_GAP_MS = 80
+
+
+def snapshot_clipboard(clipboard):
+    """Copies every format currently on the clipboard so it can be put back later."""
+    source = clipboard.mimeData()
+    copy = QMimeData()
+    if source is not None:
+        for fmt in source.formats():
+            copy.setData(fmt, source.data(fmt))
+    return copy
+
+
+class TextInjector:
+    """Delivers text into the focused field.
+
+    The default ``paste`` mode puts the text on the clipboard, sends one paste chord
+    and restores the previous clipboard contents shortly afterwards; bursts of
+    injections (streamed sentences) share one snapshot. ``type`` mode is the
+    fallback for fields that reject pastes: it types in chunks on a background
+    thread so the UI stays responsive. Call ``inject`` from the GUI thread.
+    """
+
+    def __init__(self, mode=PASTE, paste_chord='ctrl+v', restore_delay_ms=500):
+        self.mode = mode
+        self.paste_chord = paste_chord
+        self.restore_delay_ms = restore_delay_ms
+        self._saved = None
+        self._injected = None
+        self._pending = []
+        self._last_paste = 0.0
+        self._paste_timer = QTimer()
+        self._paste_timer.setSingleShot(True)
+        self._paste_timer.timeout.connect(self._flush_paste)
+        self._restore_timer = QTimer()
+        self._restore_timer.setSingleShot(True)
+        self._restore_timer.timeout.connect(self._restore_clipboard)
+        self._typing = queue.Queue()
+        self._typer = None
+        self._typer_lock = threading.Lock()
+
+    def inject(self, text):
+        if not text:
+            return
+        if self.mode == TYPE:
+            self._start_typer()
+            self._typing.put(text)
+        else:
+            self._pending.append(text)
+            if not self._paste_timer.isActive():
+                since_last = (time.perf_counter() - self._last_paste) * 1000
+                self._paste_timer.start(int(max(0, PASTE_GAP_MS - since_last)))
+
+    def close(self):
+        if self._paste_timer.isActive():
+            self._paste_timer.stop()
+            self._flush_paste()
+        if self._restore_timer.isActive():
+            self._restore_timer.stop()
+            self._restore_clipboard()
+        if self._typer is not None:
+            self._typing.put(None)
+            self._typer.join(timeout=1)
+            self._typer = None
+
+    # --- Paste ---
+    def _flush_paste(self):
+        text = "".join(self._pending)
+        self._pending.clear()
+        if text:
+            self._paste(text)
+        self._last_paste = time.perf_counter()
+
+    def _paste(self, text):
+        start = time.perf_counter()
+        clipboard = QApplication.clipboard()
+        if not self._restore_timer.isActive():
+            self._saved = snapshot_clipboard(clipboard)
+        clipboard.setText(text)
+        self._injected = text
+        keyboard.send(self.paste_chord)
+        # The target reads the clipboard when it handles the chord, so restore a little later
+        self._restore_timer.start(self.restore_delay_ms)
+        elapsed = time.perf_counter() - start
+        metrics.record('paste', elapsed, num_bytes=len(text.encode('utf-8')))
+        print(f"[MyScribe] Pasted {len(text)} chars in {elapsed * 1000:.0f} ms "
+              f"({len(text) / max(elapsed, 1e-6):,.0f} chars/s).")
+
+    def _restore_clipboard(self):
+        clipboard = QApplication.clipboard()
+        # Leave the clipboard alone if something else was copied in the meantime
+        if self._saved is not None and clipboard.text() == self._injected:
+            clipboard.setMimeData(self._saved)
+        self._saved = None
+        self._injected = None
+
+    # --- Typing fallback ---
+    def _start_typer(self):
+        with self._typer_lock:
+            if self._typer is None:
+                self._typer = threading.Thread(target=self._type_loop, name="myscribe-typer", daemon=True)
+                self._typer.start()
+
+    def _type_loop(self):
+        while True:
+            text = self._typing.get()
+            if text is None:
+                return
+            start = time.perf_counter()
+            try:
+                for i in range(0, len(text), TYPE_CHUNK_CHARS):
+                    keyboard.write(text[i:i + TYPE_CHUNK_CHARS])
+            except Exception as e:
+                print(f"[MyScribe] Typing failed: {e}")
+                continue
+            elapsed = time.perf_counter() - start
+            metrics.record('type', elapsed, num_bytes=len(text.encode('utf-8')))
+            print(f"[MyScribe] Typed {len(text)} chars in {elapsed:.2f} s "
+                  f"({len(text) / max(elapsed, 1e-6):,.0f} chars/s).")
@@ -0,0 +1,240 @@
+import threading
+import time
+
+from PySide6.QtCore import QObject, Signal
+from PySide6.QtGui import QIcon, QAction
+from PySide6.QtWidgets import QApplication, QSystemTrayIcon, QMenu
+import keyboard
+from src.ui.injector import PASTE, TYPE, TextInjector
+
+
+class WorkerSignals(QObject):
+    started = Signal()
+    partial = Signal(int, str)
+    finished = Signal(str, str, bool)
+    processing_finished_sound = Signal()
+    warmed_up = Signal()
+
+
+class SystemTrayApp:
+    """Tray icon, hotkeys and delivery of results for the GUI mode of main.py.
+
+    ``core`` is the main module; recording state and the pipeline live there so the
+    CLI mode can share them without importing Qt.
+    """
+
+    def __init__(self, app, core):
+        self.app = app
+        self.core = core
+        self.signals = WorkerSignals()
+        self.history_window = None # To hold the history window instance
+        self.streaming_job_id = None
+        self.streamed_text = ""
+        self.injector = TextInjector(core.INJECTION_MODE, core.PASTE_CHORD, core.CLIPBOARD_RESTORE_MS)
+
+        self.tray_icon = QSystemTrayIcon(QIcon(core.ICON_PATH), self.app)
+        self.tray_icon.setToolTip("MyScribe - Idle")
+
+        menu = QMenu()
+        history_action = QAction("History", self.app)
+        history_action.triggered.connect(self.show_history)
+        menu.addAction(history_action)
+
+        self.auto_paste_action = QAction("Auto-paste", self.app)
+        self.auto_paste_action.setCheckable(True)
+        self.auto_paste_action.setChecked(True) # Default to on
+        menu.addAction(self.auto_paste_action)
+
+        # For fields that reject pastes: type the text instead (slower, but off the UI thread)
+        self.type_action = QAction("Type instead of paste", self.app)
+        self.type_action.setCheckable(True)
+        self.type_action.setChecked(self.injector.mode == TYPE)
+        self.type_action.toggled.connect(self.on_type_toggled)
+        menu.addAction(self.type_action)
+
+        menu.addSeparator()
+
+        exit_action = QAction("Exit", self.app)
+        exit_action.triggered.connect(self.on_exit)
+        menu.addAction(exit_action)
+
+        self.tray_icon.setContextMenu(menu)
+        self.tray_icon.show()
+        core.profiler.mark('tray visible')
+
+        # Setup thread-safe signals
+        self.signals.started.connect(self.on_processing_started)
+        self.signals.partial.connect(self.on_partial_text)
+        self.signals.finished.connect(self.on_processing_finished)
+        self.signals.processing_finished_sound.connect(self.play_double_pop)
+        self.signals.warmed_up.connect(self.on_warmed_up)
+
+        # Initialize and setup logic
+        core.stream_sink = self.signals.partial.emit
+        core.job_scheduler.start(on_result=self.deliver_result, on_job_started=self.on_job_started)
+        self.setup_hotkeys()
+        core.profiler.mark('hotkeys registered')
+
+        # Audio devices and provider clients are opened once the tray is already usable
+        threading.Thread(target=self.warm_up, name="myscribe-warm-up", daemon=True).start()
+
+    def warm_up(self):
+        self.core.warm_up()
+        self.signals.warmed_up.emit()
+
+    def on_warmed_up(self):
+        if self.core.profiler.enabled:
+            self.core.profiler.report(self.core.READY_MILESTONES)
+            self.on_exit()
+
+    def on_type_toggled(self, checked):
+        self.injector.mode = TYPE if checked else PASTE
+
+    def set_idle_icon(self):
+        self.tray_icon.setIcon(QIcon(self.core.ICON_PATH))
+        self.tray_icon.setToolTip("MyScribe - Idle")
+
+    def set_recording_icon(self):
+        # For now, we'll just change the tooltip. A more advanced implementation
+        # could overlay a red dot on the icon.
+        self.tray_icon.setToolTip("MyScribe - Recording")
+
+    def set_processing_icon(self):
+        # Tooltip change for processing state
+        self.tray_icon.setToolTip("MyScribe - Processing")
+
+    def on_exit(self):
+        core = self.core
+        print("[MyScribe] Exiting...")
+        print(core.upload_stats.summary())
+        print(core.result_cache.summary())
+        core.stop_recording()
+        # Let stopped sessions finish their files so they are queued before exit
+        core.sessions.wait_finalized(timeout=5)
+        core.recorder.close()
+        core.retention.stop()
+        core.cues.close()
+        self.injector.close()
+        if self.history_window:
+            self.history_window.cancel_export()
+        core.job_scheduler.shutdown()
+        core.metrics.close()
+        keyboard.unhook_all()
+        self.app.quit()
+
+    def on_job_started(self, job):
+        # Called on a worker thread; signals marshal it onto the GUI thread
+        self.signals.started.emit()
+
+    def deliver_result(self, job):
+        # Called in submission order, whichever worker finished first
+        cleaned_text = job.data.get('cleaned_text') or ""
+        self.signals.finished.emit(cleaned_text, job.data.get('undelivered_text', cleaned_text),
+                                   bool(job.context.get('resumed')))
+        self.signals.processing_finished_sound.emit()
+
+    def on_processing_started(self):
+        self.set_processing_icon()
+
+    def on_partial_text(self, job_id, text):
+        if job_id != self.streaming_job_id:
+            self.streaming_job_id = job_id
+            self.streamed_text = ""
+        self.streamed_text += text
+        if self.auto_paste_action.isChecked():
+            self.injector.inject(text)
+        else:
+            QApplication.clipboard().setText(self.streamed_text)
+
+    def on_processing_finished(self, cleaned_text, undelivered_text=None, resumed=False):
+        if undelivered_text is None:
+            undelivered_text = cleaned_text
+        with self.core.metrics.span('deliver', num_bytes=len(cleaned_text.encode('utf-8'))):
+            if resumed:
+                # Recorded before the last exit; pasting it into whatever has focus now would be wrong
+                if cleaned_text:
+                    QApplication.clipboard().setText(cleaned_text)
+                    print("[MyScribe] Cleaned text from the last session copied to clipboard.")
+            elif undelivered_text != cleaned_text:
+                # Partly or fully delivered sentence by sentence; paste only the rest
+                # and leave the complete text on the clipboard
+                if not self.auto_paste_action.isChecked():
+                    QApplication.clipboard().setText(cleaned_text)
+                elif undelivered_text:
+                    self.injector.inject(undelivered_text)
+                print("[MyScribe] Cleaned text streamed.")
+            elif cleaned_text:
+                if self.auto_paste_action.isChecked():
+                    self.injector.inject(cleaned_text)
+                    print("[MyScribe] Cleaned text auto-pasted.")
+                else:
+                    clipboard = QApplication.clipboard()
+                    clipboard.setText(cleaned_text)
+                    print("[MyScribe] Cleaned text copied to clipboard.")
+        pending = self.core.job_scheduler.stats()['awaiting_delivery']
+        if pending:
+            print(f"[MyScribe] {pending} more job(s) in progress.")
+        else:
+            self.set_idle_icon()
+        if self.history_window:
+            self.history_window.refresh_latest()
+
+    def show_history(self):
+        # Built on first use: most sessions never open the history
+        if self.history_window is None:
+            from src.ui.history_window import HistoryWindow
+            self.history_window = HistoryWindow()
+        else:
+            self.history_window.refresh_latest()
+        self.history_window.show()
+        self.history_window.activateWindow()
+
+    def play_double_pop(self):
+        self.core.play_double_pop()
+
+    def start_recording_ui(self, continuous=False):
+        # Pre-roll is measured from the hotkey press, not from when the pop has finished
+        requested_at = time.perf_counter()
+        if self.core.start_recording(requested_at, continuous) is None:
+            return
+        # Cues are queued to their own thread and never delay recording
+        self.core.play_pop()
+        self.set_recording_icon()
+
+    def stop_recording_ui(self, continuous=None):
+        # Returns as soon as the session is stopped; its file is finished in the background
+        if self.core.stop_recording(continuous) is None:
+            return
+        self.core.play_chime() # Play chime when recording stops
+        # The icon will be set to processing when the file is picked up from the queue
+        # and back to idle when it's done.
+
+    def on_ctrl_alt_press(self, e=None):
+        # This hotkey now ONLY stops continuous recording.
+        self.stop_recording_ui(continuous=True)
+
+    def on_ctrl_shift_press(self, e=None):
+        # Hold-to-record; ignored while a session is recording
+        self.start_recording_ui()
+
+    def on_key_release(self, e=None):
+        # Stops hold-to-record when keys are released
+        self.stop_recording_ui(continuous=False)
+
+    def on_ctrl_alt_space(self, e=None):
+        # Toggles continuous recording; the lock keeps the check and the start/stop together
+        sessions = self.core.sessions
+        with sessions.lock:
+            if not sessions.recording:
+                self.start_recording_ui(continuous=True)
+            else:
+                self.stop_recording_ui(continuous=True)
+
+    def setup_hotkeys(self):
+        keyboard.unhook_all()  # Start fresh
+        keyboard.add_hotkey('ctrl+alt+space', self.on_ctrl_alt_space, suppress=False)
+        keyboard.add_hotkey('ctrl+alt', self.on_ctrl_alt_press, suppress=False)
+        keyboard.add_hotkey('ctrl+shift', self.on_ctrl_shift_press, suppress=False, trigger_on_release=False)
+        keyboard.on_release_key('ctrl', self.on_key_release)
+        keyboard.on_release_key('shift', self.on_key_release)
+        print("[MyScribe] Hotkeys registered and application is running in the system tray.")
@@ -0,0 +1,165 @@
+import os
+import threading
+from dataclasses import dataclass
+
+from src.utils.startup import lazy_module
+
+# Imported on first use to keep them off the startup path
+np = lazy_module('numpy')
+sf = lazy_module('soundfile')
+
+# Extensions produced by any capture profile, used when scanning the audio directory
+AUDIO_EXTENSIONS = ('wav', 'flac', 'ogg')
+
+
+@dataclass(frozen=True)
+class CaptureProfile:
+    name: str
+    samplerate: int
+    channels: int
+    dtype: str  # sample type requested from the input stream
+    format: str  # soundfile container
+    subtype: str
+    extension: str
+
+    def open_file(self, path, samplerate=None):
+        return sf.SoundFile(path, mode='w', samplerate=samplerate or self.samplerate,
+                            channels=self.channels, format=self.format, subtype=self.subtype)
+
+
+CAPTURE_PROFILES = {
+    # 16 kHz mono is all a speech model needs; FLAC is lossless and roughly halves PCM size
+    'speech': CaptureProfile('speech', 16000, 1, 'int16', 'FLAC', 'PCM_16', 'flac'),
+    'opus': CaptureProfile('opus', 16000, 1, 'float32', 'OGG', 'OPUS', 'ogg'),
+    'wav16': CaptureProfile('wav16', 16000, 1, 'int16', 'WAV', 'PCM_16', 'wav'),
+    # The original capture settings, kept for comparison
+    'legacy': CaptureProfile('legacy', 44100, 1, 'float32', 'WAV', 'PCM_16', 'wav'),
+}
+
+DEFAULT_CAPTURE_PROFILE = 'speech'
+
+
+def opus_available():
+    try:
+        return 'OPUS' in sf.available_subtypes('OGG')
+    except Exception:
+        return False
+
+
+def get_capture_profile(name=None):
+    name = (name or os.getenv('CAPTURE_PROFILE', DEFAULT_CAPTURE_PROFILE)).lower()
+    profile = CAPTURE_PROFILES.get(name)
+    if profile is None:
+        print(f"[MyScribe] Unknown capture profile '{name}', using '{DEFAULT_CAPTURE_PROFILE}'.")
+        profile = CAPTURE_PROFILES[DEFAULT_CAPTURE_PROFILE]
+    if profile.subtype == 'OPUS' and not opus_available():
+        print("[MyScribe] Opus is not supported by this libsndfile build, using FLAC.")
+        profile = CAPTURE_PROFILES['speech']
+    return profile
+
+
+def to_float32(block):
+    """Returns a block as float32 in [-1, 1] whatever the stream dtype."""
+    if block.dtype == np.int16:
+        return block.astype(np.float32) / 32768.0
+    return block.astype(np.float32, copy=False)
+
+
+def peak_level(block):
+    """Peak absolute level of a block, normalised to [0, 1]."""
+    if len(block) == 0:
+        return 0.0
+    return float(np.abs(to_float32(block)).max())
+
+
+class LinearResampler:
+    """Streaming linear-interpolation resampler for devices that refuse the profile rate.
+
+    State is carried between blocks so block boundaries do not click. There is no
+    anti-alias filter; speech energy above 8 kHz is small enough for STT not to care.
+    """
+
+    def __init__(self, src_rate, dst_rate):
+        self.src_rate = src_rate
+        self.dst_rate = dst_rate
+        self._step = src_rate / dst_rate
+        self._pos = 0.0
+        self._tail = None
+
+    def process(self, block):
+        block = to_float32(block)
+        x = block if self._tail is None else np.concatenate((self._tail, block))
+        n = len(x)
+        if n < 2 or self._pos > n - 1:
+            self._tail = x
+            return x[:0]
+        count = int((n - 1 - self._pos) // self._step) + 1
+        positions = self._pos + np.arange(count) * self._step
+        left = positions.astype(np.int64)
+        right = np.minimum(left + 1, n - 1)
+        frac = (positions - left)[:, None].astype(np.float32)
+        out = x[left] * (1.0 - frac) + x[right] * frac
+        # Keep the last input sample so the next block can interpolate across the boundary
+        self._pos = self._pos + count * self._step - (n - 1)
+        self._tail = x[-1:]
+        return out
+
+
+class UploadStats:
+    """Running totals of upload bytes and time, normalised per minute of audio."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.uploads = 0
+        self.bytes = 0
+        self.seconds = 0.0
+        self.audio_seconds = 0.0
+
+    def record(self, num_bytes, upload_seconds, audio_seconds):
+        with self._lock:
+            self.uploads += 1
+            self.bytes += num_bytes
+            self.seconds += upload_seconds
+            self.audio_seconds += audio_seconds
+        minutes = audio_seconds / 60 if audio_seconds else 0
+        per_minute = f", {num_bytes / 1024 / minutes:.0f} KB and {upload_seconds / minutes:.2f} s per audio minute" if minutes else ""
+        print(f"[MyScribe] Uploaded {num_bytes / 1024:.1f} KB in {upload_seconds:.2f} s{per_minute}.")
+
+    def summary(self):
+        with self._lock:
+            minutes = self.audio_seconds / 60
+            if not minutes:
+                return "[MyScribe] No uploads recorded yet."
+            return (f"[MyScribe] {self.uploads} uploads: {self.bytes / 1024 / minutes:.0f} KB and "
+                    f"{self.seconds / minutes:.2f} s upload per minute of audio.")
+
+
+upload_stats = UploadStats()
+
+
+def audio_duration(path):
+    try:
+        return sf.info(path).duration
+    except Exception:
+        return 0.0
+
+
+def is_empty_audio(path):
+    """True for a file without a single frame. An empty FLAC is zero bytes and cannot be opened."""
+    try:
+        return os.path.getsize(path) == 0 or sf.info(path).frames == 0
+    except Exception:
+        return False
+
+
+def transcode(src_path, dst_path, profile, blocksize=65536):
+    """Re-encodes an audio file into ``profile``'s format, downmixing and resampling as needed."""
+    info = sf.info(src_path)
+    resampler = LinearResampler(info.samplerate, profile.samplerate) if info.samplerate != profile.samplerate else None
+    with profile.open_file(dst_path) as out:
+        for block in sf.blocks(src_path, blocksize=blocksize, dtype='float32', always_2d=True):
+            if profile.channels == 1 and block.shape[1] > 1:
+                block = block.mean(axis=1, keepdims=True)
+            if resampler is not None:
+                block = resampler.process(block)
+            out.write(block)
@@ -0,0 +1,163 @@
+import glob
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import datetime
+
+from src.utils import db
+from src.utils.audio import audio_duration
+from src.utils.cache import hash_file, hash_text
+from src.utils.scheduler import Job, run_stages
+
+AUDIO_EXTENSIONS = ('.flac', '.wav', '.ogg', '.opus', '.mp3', '.m4a', '.aac', '.webm')
+# Results are written to the database this many files at a time
+WRITE_BATCH = 25
+
+
+def find_audio_files(target, exclude_dirs=()):
+    """Audio files under a directory, or matching a glob pattern (``**`` recurses), sorted by path."""
+    if os.path.isdir(target):
+        paths = []
+        for root, _dirs, files in os.walk(target):
+            paths.extend(os.path.join(root, name) for name in files)
+    else:
+        paths = glob.glob(target, recursive=True)
+    excluded = [os.path.realpath(d) + os.sep for d in exclude_dirs]
+    return sorted(path for path in paths
+                  if path.lower().endswith(AUDIO_EXTENSIONS) and os.path.isfile(path)
+                  and not any(os.path.realpath(path).startswith(d) for d in excluded))
+
+
+def _format_duration(seconds):
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h {minutes:02d}m" if hours else f"{minutes}m {seconds:02d}s"
+
+
+class BatchRunner:
+    """Feeds existing audio files through the pipeline stages with bounded concurrency.
+
+    A file is identified by the hash of its contents plus ``version`` (the prompt and
+    model), and recorded with its result; files already recorded are skipped, so an
+    interrupted run picks up where it stopped while a prompt change reprocesses
+    everything. The stages must leave the text in ``job.data['cleaned_text']``; results
+    are written to the database in groups rather than one transaction per file.
+    """
+
+    def __init__(self, stages, version='', concurrency=4, max_attempts=3, backoff_seconds=2.0,
+                 write_batch=WRITE_BATCH):
+        self.stages = stages
+        self.version = version
+        self.concurrency = max(1, concurrency)
+        self.max_attempts = max(1, max_attempts)
+        self.backoff_seconds = backoff_seconds
+        self.write_batch = write_batch
+        self.processed = 0
+        self.no_speech = 0
+        self.failed = 0
+        self.skipped = 0
+        self.audio_seconds = 0.0
+        self._pending = []
+        self._stop = threading.Event()
+
+    def run(self, paths):
+        """Processes ``paths`` and returns the summary; Ctrl+C stops after the files in flight."""
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            keys = dict(zip(paths, pool.map(self._key, paths)))
+            done = db.fetch_batch_keys(keys.values())
+            todo = [path for path in paths if keys[path] not in done]
+            self.skipped = len(paths) - len(todo)
+            print(f"[MyScribe] Batch: {len(todo)} file(s) to process, {self.skipped} already done.")
+            futures = {pool.submit(self._process, path): path for path in todo}
+            remaining = set(futures)
+            try:
+                while remaining:
+                    finished, remaining = wait(remaining, timeout=1, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        self._collect(futures[future], keys[futures[future]], future.result(), len(todo), start)
+            except KeyboardInterrupt:
+                self._stop.set()
+                for future in remaining:
+                    future.cancel()
+                print("[MyScribe] Batch interrupted, finishing the files in flight. Run again to resume.")
+                for future in remaining:
+                    if not future.cancelled():
+                        self._collect(futures[future], keys[futures[future]], future.result(), len(todo), start)
+            finally:
+                self._flush()
+        return self.report(time.perf_counter() - start)
+
+    def report(self, elapsed):
+        handled = self.processed + self.no_speech
+        summary = {
+            'processed': self.processed,
+            'no_speech': self.no_speech,
+            'failed': self.failed,
+            'skipped': self.skipped,
+            'seconds': elapsed,
+            'files_per_minute': handled / elapsed * 60 if elapsed > 0 else 0.0,
+            'audio_minutes': self.audio_seconds / 60,
+        }
+        print(f"[MyScribe] Batch finished in {_format_duration(elapsed)}: {self.processed} transcribed, "
+              f"{self.no_speech} without speech, {self.failed} failed, {self.skipped} skipped.")
+        print(f"[MyScribe] {summary['files_per_minute']:.1f} files/min, "
+              f"{summary['audio_minutes']:.1f} audio minutes.")
+        return summary
+
+    def _key(self, path):
+        return hash_text(hash_file(path), self.version)
+
+    def _process(self, path):
+        """Returns the cleaned text, '' when there is no speech, or None when the file failed."""
+        job = Job(None, path)
+        for attempt in range(self.max_attempts):
+            if self._stop.is_set():
+                return None
+            job.attempts = attempt
+            try:
+                if not run_stages(self.stages, job):
+                    return ''
+                return job.data['cleaned_text']
+            except Exception as e:
+                if attempt + 1 == self.max_attempts:
+                    print(f"[MyScribe] Batch: giving up on {path}: {e}")
+                    return None
+                delay = self.backoff_seconds * 2 ** attempt
+                print(f"[MyScribe] Batch: {path} failed ({e}), retrying in {delay:.0f} s.")
+                self._stop.wait(delay)
+        return None
+
+    def _collect(self, path, key, text, total, start):
+        if text is None:
+            self.failed += 1
+        else:
+            if text:
+                self.processed += 1
+            else:
+                self.no_speech += 1
+            try:
+                self.audio_seconds += audio_duration(path)
+            except Exception:
+                pass
+            # Imported files keep their own date in the history
+            timestamp = datetime.fromtimestamp(os.path.getmtime(path)).isoformat()
+            self._pending.append((key, path, text or None, timestamp))
+            if len(self._pending) >= self.write_batch:
+                self._flush()
+        handled = self.processed + self.no_speech + self.failed
+        elapsed = time.perf_counter() - start
+        rate = handled / elapsed * 60 if elapsed > 0 else 0.0
+        eta = _format_duration((total - handled) / rate * 60) if rate else "?"
+        print(f"[MyScribe] Batch {handled}/{total} ({handled / total:.0%}), {self.failed} failed, "
+              f"{rate:.1f} files/min, ETA {eta}: {os.path.basename(path)}")
+
+    def _flush(self):
+        rows, self._pending = self._pending, []
+        if rows:
+            try:
+                db.store_batch_results(rows)
+            except Exception as e:
+                # Not recorded, so these files are processed again next run
+                print(f"[MyScribe] Could not save {len(rows)} batch result(s): {e}")
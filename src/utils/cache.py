@@ -0,0 +1,106 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from src.utils import db
+
+TRANSCRIPT = 'transcript'
+CLEANED = 'cleaned'
+
+
+def hash_file(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def hash_text(*parts):
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update((part or '').encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """Two-level cache of pipeline results: an in-memory LRU in front of SQLite.
+
+    Entries are grouped by kind (audio hash -> raw transcript, prompt/model/text
+    hash -> cleaned text). The SQLite level is trimmed by age and total size.
+    """
+
+    def __init__(self, memory_entries=256, max_bytes=50 * 1024 * 1024, max_age_days=90, evict_every=50):
+        self.memory_entries = memory_entries
+        self.max_bytes = max_bytes
+        self.max_age_seconds = max_age_days * 86400
+        self.evict_every = evict_every
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._puts = 0
+        self._counts = {}
+
+    def get(self, kind, key):
+        start = time.perf_counter()
+        with self._lock:
+            value = self._memory.get((kind, key))
+            if value is not None:
+                self._memory.move_to_end((kind, key))
+        level = 'memory'
+        if value is None:
+            try:
+                value = db.cache_get(kind, key, time.time())
+            except Exception as e:
+                print(f"[MyScribe] Cache read failed: {e}")
+            level = 'disk'
+            if value is not None:
+                self._remember(kind, key, value)
+        self._count(kind, 'hits' if value is not None else 'misses')
+        if value is not None:
+            print(f"[MyScribe] {kind.capitalize()} cache hit ({level}, {(time.perf_counter() - start) * 1000:.1f} ms).")
+        return value
+
+    def put(self, kind, key, value):
+        self._remember(kind, key, value)
+        try:
+            db.cache_put(kind, key, value, time.time())
+        except Exception as e:
+            print(f"[MyScribe] Cache write failed: {e}")
+            return
+        with self._lock:
+            self._puts += 1
+            evict = self._puts % self.evict_every == 0
+        if evict:
+            self.evict()
+
+    def evict(self):
+        try:
+            return db.cache_evict(self.max_bytes, time.time() - self.max_age_seconds)
+        except Exception as e:
+            print(f"[MyScribe] Cache eviction failed: {e}")
+            return 0
+
+    def hit_rates(self):
+        with self._lock:
+            return {kind: counts['hits'] / (counts['hits'] + counts['misses'])
+                    for kind, counts in self._counts.items() if counts['hits'] + counts['misses']}
+
+    def summary(self):
+        rates = self.hit_rates()
+        if not rates:
+            return "[MyScribe] No cache lookups yet."
+        return "[MyScribe] Cache hit rates: " + ", ".join(f"{kind} {rate:.0%}" for kind, rate in rates.items())
+
+    def _remember(self, kind, key, value):
+        with self._lock:
+            self._memory[(kind, key)] = value
+            self._memory.move_to_end((kind, key))
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def _count(self, kind, outcome):
+        with self._lock:
+            counts = self._counts.setdefault(kind, {'hits': 0, 'misses': 0})
+            counts[outcome] += 1
@@ -0,0 +1,122 @@
+import re
+from difflib import SequenceMatcher
+
+# A sentence ends at terminal punctuation (plus closing quotes/brackets) and whitespace,
+# or at a line break, so bullet lines count as sentences of their own
+SENTENCE_BOUNDARY = re.compile(r'[.!?]["\')\]]*\s+|\n+')
+BULLET = re.compile(r'^\s*(?:[-*•]|\d+[.)])\s+')
+# Seams match if the overlapping words are at least this similar after cleaning
+SEAM_SIMILARITY = 0.8
+
+
+def split_sentences(text):
+    """Splits text into sentences, each keeping its trailing whitespace."""
+    sentences = []
+    start = 0
+    for match in SENTENCE_BOUNDARY.finditer(text):
+        sentences.append(text[start:match.end()])
+        start = match.end()
+    if start < len(text):
+        sentences.append(text[start:])
+    return [s for s in sentences if s.strip()]
+
+
+def split_transcript(text, max_chars=3000, overlap_sentences=1):
+    """Splits a long transcript into chunks of whole sentences, preferring paragraph breaks.
+
+    Each chunk after the first starts with the last ``overlap_sentences`` sentences of
+    the previous one so the model sees the context at the seam; the duplicate is
+    removed again when the cleaned chunks are stitched. A chunk that ends a paragraph
+    keeps its trailing blank line, so the stitcher knows which seams are paragraph breaks.
+    """
+    if len(text) <= max_chars:
+        return [text]
+    chunks = []
+    current = []
+    fresh = 0  # sentences in the current chunk that are not overlap
+
+    def close():
+        nonlocal current, fresh
+        text = "".join(current).strip()
+        chunks.append(text + "\n\n" if current[-1].endswith("\n\n") else text)
+        current = current[-overlap_sentences:] if overlap_sentences else []
+        fresh = 0
+
+    for paragraph in re.split(r'\n\s*\n', text):
+        for sentence in split_sentences(paragraph.strip() + "\n\n"):
+            if fresh and sum(map(len, current)) + len(sentence) > max_chars:
+                close()
+            current.append(sentence)
+            fresh += 1
+        # Close the chunk early at a paragraph break once it is reasonably full
+        if fresh and sum(map(len, current)) > max_chars * 0.75:
+            close()
+    if fresh:
+        close()
+    return chunks
+
+
+def _words(text):
+    return re.findall(r"[\w']+", text.lower())
+
+
+def drop_overlap(previous, following, max_sentences=4):
+    """Removes the start of ``following`` that repeats the end of ``previous``."""
+    tail_words = _words(previous)[-200:]
+    if not tail_words:
+        return following
+    cuts = []
+    for match in SENTENCE_BOUNDARY.finditer(following):
+        cuts.append(match.end())
+        if len(cuts) >= max_sentences:
+            break
+    # Prefer the longest duplicated prefix
+    for cut in reversed(cuts):
+        head_words = _words(following[:cut])
+        if not head_words or len(head_words) > len(tail_words):
+            continue
+        ratio = SequenceMatcher(None, head_words, tail_words[-len(head_words):], autojunk=False).ratio()
+        if ratio >= SEAM_SIMILARITY:
+            return following[cut:]
+    return following
+
+
+def seam_separator(previous, following, paragraph_break=True):
+    """Joins text across a seam the way it was split.
+
+    A bullet list stays continuous, a seam at a paragraph break starts a new paragraph,
+    and one inside a paragraph is just the space between two sentences.
+    """
+    last_line = previous.rstrip().rsplit("\n", 1)[-1]
+    first_line = following.lstrip().split("\n", 1)[0]
+    if BULLET.match(last_line) and BULLET.match(first_line):
+        return "\n"
+    return "\n\n" if paragraph_break else " "
+
+
+class ChunkStitcher:
+    """Joins cleaned chunks in order, de-duplicating the overlap at each seam."""
+
+    def __init__(self, overlap_sentences=1):
+        self.max_sentences = max(1, overlap_sentences) * 2
+        self._text = ""
+        self._paragraph_break = False
+
+    def add(self, cleaned_chunk, source_chunk=None):
+        """Appends the next chunk and returns the text that was added.
+
+        ``source_chunk`` is the transcript chunk it was cleaned from; whether that ends
+        with a blank line decides if the next seam is a paragraph break.
+        """
+        piece = cleaned_chunk.strip()
+        if self._text and piece:
+            piece = drop_overlap(self._text, piece, self.max_sentences).strip()
+            if piece:
+                piece = seam_separator(self._text, piece, self._paragraph_break) + piece
+        self._paragraph_break = (cleaned_chunk if source_chunk is None else source_chunk).endswith("\n\n")
+        self._text += piece
+        return piece
+
+    @property
+    def text(self):
+        return self._text
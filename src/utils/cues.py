@@ -0,0 +1,108 @@
+import queue
+import threading
+
+from src.utils.startup import lazy_module
+
+pygame = lazy_module('pygame')
+
+# Small mixer buffer: cues start within ~10 ms instead of the default ~40 ms
+MIXER_FREQUENCY = 44100
+MIXER_BUFFER = 512
+# Queued by load() so the mixer is opened on the cue thread
+_LOAD = object()
+
+
+class CuePlayer:
+    """Plays short sound cues from buffers decoded once, on a mixer channel of their own.
+
+    ``play`` only queues the cue name, so the hotkey thread never waits on file I/O,
+    decoding or the mixer; a background thread opens the mixer on first use (or
+    when ``load`` is called during warm-up) and starts playback without blocking.
+    With ``idle_seconds`` set, the mixer and its audio thread are shut down once no
+    cue has played for that long; the decoded buffers are kept, so reopening is cheap.
+    """
+
+    def __init__(self, paths, idle_seconds=0):
+        self.paths = dict(paths)
+        self.idle_seconds = idle_seconds
+        self._buffers = {}  # name -> raw samples in the mixer's format
+        self._sounds = {}
+        self._channel = None
+        self._queue = queue.Queue()
+        self._thread = None
+        self._thread_lock = threading.Lock()
+
+    def load(self):
+        """Opens the mixer and decodes every cue in the background; safe to call more than once."""
+        self._ensure_thread()
+        self._queue.put(_LOAD)
+
+    def play(self, name):
+        """Queues a cue and returns immediately."""
+        self._ensure_thread()
+        self._queue.put(name)
+
+    def close(self):
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join(timeout=1)
+            self._thread = None
+
+    def _ensure_thread(self):
+        with self._thread_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="myscribe-cues", daemon=True)
+                self._thread.start()
+
+    def _open(self):
+        if self._channel is not None:
+            return
+        if not pygame.mixer.get_init():
+            pygame.mixer.pre_init(MIXER_FREQUENCY, -16, 2, MIXER_BUFFER)
+            pygame.mixer.init()
+        for name, path in self.paths.items():
+            try:
+                if name in self._buffers:
+                    self._sounds[name] = pygame.mixer.Sound(buffer=self._buffers[name])
+                else:
+                    self._sounds[name] = pygame.mixer.Sound(path)
+                    self._buffers[name] = self._sounds[name].get_raw()
+            except Exception as e:
+                print(f"[MyScribe] Could not load cue '{name}': {e}")
+        # Reserve channel 0 so other mixer users cannot cut a cue off
+        pygame.mixer.set_reserved(1)
+        self._channel = pygame.mixer.Channel(0)
+
+    def _release(self):
+        if self._channel is None:
+            return
+        self._sounds.clear()
+        self._channel = None
+        pygame.mixer.quit()
+
+    def _run(self):
+        try:
+            while True:
+                # Blocks without a timeout while the mixer is closed
+                timeout = self.idle_seconds if self.idle_seconds > 0 and self._channel is not None else None
+                try:
+                    name = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    self._release()
+                    continue
+                if name is None:
+                    return
+                try:
+                    self._open()
+                    sound = self._sounds.get(name)
+                    if sound is not None:
+                        # Replaces whatever cue is still playing on the channel
+                        self._channel.play(sound)
+                except Exception as e:
+                    what = "open the sound mixer" if name is _LOAD else f"play cue '{name}'"
+                    print(f"[MyScribe] Could not {what}: {e}")
+        finally:
+            try:
+                self._release()
+            except Exception:
+                pass
@@ -1,5 +1,11 @@
 import sqlite3
 import os
+import json
+import queue
+import re
+import threading
+import time
+from contextlib import contextmanager
 from datetime import datetime
 
 APP_NAME = "MyScribe"
@@ -8,34 +14,585 @@ APP_DATA_DIR = os.path.join(os.getenv('APPDATA'), APP_NAME)
 os.makedirs(APP_DATA_DIR, exist_ok=True)
 DB_PATH = os.path.join(APP_DATA_DIR, 'myscribe.db')
 
+POOL_SIZE = 4
+PRAGMAS = (
+    'PRAGMA journal_mode = WAL',
+    # WAL makes NORMAL safe against corruption; only the last commits can be lost on power failure
+    'PRAGMA synchronous = NORMAL',
+    'PRAGMA temp_store = MEMORY',
+    'PRAGMA cache_size = -16000',
+    'PRAGMA mmap_size = 67108864',
+    'PRAGMA busy_timeout = 5000',
+)
+
+
+class ConnectionPool:
+    """A fixed number of long-lived connections shared between threads.
+
+    Callers borrow a connection for the duration of one ``with`` block; SQLite
+    serialises writers itself, WAL lets readers run alongside them.
+    """
+
+    def __init__(self, path, size=POOL_SIZE):
+        self.path = path
+        self.size = size
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        for pragma in PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    def acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._created < self.size:
+                self._created += 1
+                return self._connect()
+        return self._idle.get()
+
+    def release(self, conn):
+        self._idle.put(conn)
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ConnectionPool(DB_PATH)
+        return _pool
+
+
+def configure(path):
+    """Points the module at a different database file (used by benchmarks)."""
+    global DB_PATH, _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+        DB_PATH = path
+
+
+def close():
+    configure(DB_PATH)
+
+
+@contextmanager
+def connection():
+    """Borrows a pooled connection; commits on success and rolls back on error."""
+    pool = _get_pool()
+    conn = pool.acquire()
+    try:
+        with conn:
+            yield conn
+    finally:
+        pool.release(conn)
+
+
+# --- Schema migrations ---
+# Each entry upgrades the schema by one version (tracked in PRAGMA user_version).
+# The first one uses IF NOT EXISTS so databases created before migrations existed upgrade cleanly.
+MIGRATIONS = [
+    '''
+    CREATE TABLE IF NOT EXISTS transcriptions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        audio_path TEXT NOT NULL,
+        timestamp TEXT NOT NULL,
+        cleaned_text TEXT NOT NULL
+    );
+    CREATE TABLE IF NOT EXISTS jobs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        audio_path TEXT NOT NULL,
+        status TEXT NOT NULL,
+        stage INTEGER NOT NULL DEFAULT 0,
+        attempts INTEGER NOT NULL DEFAULT 0,
+        data TEXT NOT NULL DEFAULT '{}',
+        error TEXT,
+        created_at TEXT NOT NULL,
+        updated_at TEXT NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, id);
+    CREATE TABLE IF NOT EXISTS cache (
+        kind TEXT NOT NULL,
+        key TEXT NOT NULL,
+        value TEXT NOT NULL,
+        size INTEGER NOT NULL,
+        created_at REAL NOT NULL,
+        last_used REAL NOT NULL,
+        PRIMARY KEY (kind, key)
+    );
+    CREATE INDEX IF NOT EXISTS idx_cache_last_used ON cache (last_used);
+    ''',
+    # ISO timestamps sort correctly as text; id breaks ties for keyset pagination
+    'CREATE INDEX idx_transcriptions_timestamp ON transcriptions (timestamp, id);',
+    # Full-text index over the history, kept in sync by triggers and backfilled by 'rebuild'
+    '''
+    CREATE VIRTUAL TABLE transcriptions_fts USING fts5(
+        cleaned_text,
+        content='transcriptions',
+        content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2',
+        prefix='2 3'
+    );
+    CREATE TRIGGER transcriptions_fts_insert AFTER INSERT ON transcriptions BEGIN
+        INSERT INTO transcriptions_fts (rowid, cleaned_text) VALUES (new.id, new.cleaned_text);
+    END;
+    CREATE TRIGGER transcriptions_fts_delete AFTER DELETE ON transcriptions BEGIN
+        INSERT INTO transcriptions_fts (transcriptions_fts, rowid, cleaned_text)
+        VALUES ('delete', old.id, old.cleaned_text);
+    END;
+    CREATE TRIGGER transcriptions_fts_update AFTER UPDATE OF cleaned_text ON transcriptions BEGIN
+        INSERT INTO transcriptions_fts (transcriptions_fts, rowid, cleaned_text)
+        VALUES ('delete', old.id, old.cleaned_text);
+        INSERT INTO transcriptions_fts (rowid, cleaned_text) VALUES (new.id, new.cleaned_text);
+    END;
+    INSERT INTO transcriptions_fts (transcriptions_fts) VALUES ('rebuild');
+    ''',
+    # Catalog of retained audio so retention works from indexed queries instead of directory scans
+    '''
+    CREATE TABLE audio_files (
+        path TEXT PRIMARY KEY,
+        size INTEGER NOT NULL,
+        duration REAL NOT NULL,
+        created_at REAL NOT NULL,
+        last_used REAL NOT NULL,
+        tier TEXT NOT NULL DEFAULT 'hot'
+    );
+    CREATE INDEX idx_audio_files_created ON audio_files (created_at);
+    CREATE INDEX idx_audio_files_tier_created ON audio_files (tier, created_at);
+    CREATE INDEX idx_audio_files_last_used ON audio_files (last_used);
+    CREATE INDEX idx_transcriptions_audio_path ON transcriptions (audio_path);
+    CREATE TABLE meta (
+        key TEXT PRIMARY KEY,
+        value TEXT NOT NULL
+    );
+    ''',
+    # Per-stage timing spans for --stats and the Prometheus export
+    '''
+    CREATE TABLE metrics (
+        id INTEGER PRIMARY KEY,
+        stage TEXT NOT NULL,
+        started_at REAL NOT NULL,
+        duration_ms REAL NOT NULL,
+        audio_seconds REAL,
+        bytes INTEGER,
+        job_id INTEGER,
+        ok INTEGER NOT NULL DEFAULT 1
+    );
+    CREATE INDEX idx_metrics_started ON metrics (started_at);
+    ''',
+    # Files handled by --batch, keyed by content and prompt, so interrupted runs resume
+    '''
+    CREATE TABLE batch_files (
+        key TEXT PRIMARY KEY,
+        path TEXT NOT NULL,
+        transcription_id INTEGER,
+        processed_at REAL NOT NULL
+    );
+    ''',
+]
+
+
+def schema_version():
+    with connection() as conn:
+        return conn.execute('PRAGMA user_version').fetchone()[0]
+
+
 def init_db():
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute('''
-        CREATE TABLE IF NOT EXISTS transcriptions (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            audio_path TEXT NOT NULL,
-            timestamp TEXT NOT NULL,
-            cleaned_text TEXT NOT NULL
-        )
-    ''')
-    conn.commit()
-    conn.close()
+    with connection() as conn:
+        version = conn.execute('PRAGMA user_version').fetchone()[0]
+    for target, script in enumerate(MIGRATIONS[version:], start=version + 1):
+        with connection() as conn:
+            # executescript commits first, so run it inside an explicit transaction
+            conn.executescript(f'BEGIN; {script} PRAGMA user_version = {target}; COMMIT;')
+        print(f"[MyScribe] Database migrated to schema version {target}.")
+
 
+# --- Transcriptions ---
 def insert_transcription(audio_path, cleaned_text):
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute('''
-        INSERT INTO transcriptions (audio_path, timestamp, cleaned_text)
-        VALUES (?, ?, ?)
-    ''', (audio_path, datetime.now().isoformat(), cleaned_text))
-    conn.commit()
-    conn.close()
+    with connection() as conn:
+        c = conn.execute('''
+            INSERT INTO transcriptions (audio_path, timestamp, cleaned_text)
+            VALUES (?, ?, ?)
+        ''', (audio_path, datetime.now().isoformat(), cleaned_text))
+        return c.lastrowid
+
+
+def insert_transcriptions(rows):
+    """Inserts many (audio_path, cleaned_text[, timestamp]) rows in one transaction."""
+    now = datetime.now().isoformat()
+    params = [(row[0], row[2] if len(row) > 2 else now, row[1]) for row in rows]
+    with connection() as conn:
+        conn.executemany('''
+            INSERT INTO transcriptions (audio_path, timestamp, cleaned_text)
+            VALUES (?, ?, ?)
+        ''', params)
+    return len(params)
+
+
+def fetch_recent(limit=50, before=None):
+    """Newest-first page of transcriptions.
+
+    ``before`` is the (timestamp, id) of the last row of the previous page; keyset
+    pagination keeps every page an index range scan however deep it is.
+    """
+    with connection() as conn:
+        if before is None:
+            c = conn.execute('''
+                SELECT id, audio_path, timestamp, cleaned_text FROM transcriptions
+                ORDER BY timestamp DESC, id DESC LIMIT ?
+            ''', (limit,))
+        else:
+            c = conn.execute('''
+                SELECT id, audio_path, timestamp, cleaned_text FROM transcriptions
+                WHERE (timestamp, id) < (?, ?)
+                ORDER BY timestamp DESC, id DESC LIMIT ?
+            ''', (before[0], before[1], limit))
+        return c.fetchall()
+
+
+def fetch_transcriptions_after(last_id):
+    """Rows inserted after ``last_id``, newest first."""
+    with connection() as conn:
+        c = conn.execute('''
+            SELECT id, audio_path, timestamp, cleaned_text FROM transcriptions
+            WHERE id > ? ORDER BY timestamp DESC, id DESC
+        ''', (last_id,))
+        return c.fetchall()
+
+
+def _transcription_filter(since=None, until=None, after_id=None):
+    """WHERE clause for timestamps in [since, until) and ids above ``after_id``."""
+    conditions, params = [], []
+    if since is not None:
+        conditions.append('timestamp >= ?')
+        params.append(since)
+    if until is not None:
+        conditions.append('timestamp < ?')
+        params.append(until)
+    if after_id is not None:
+        conditions.append('id > ?')
+        params.append(after_id)
+    return (f"WHERE {' AND '.join(conditions)}" if conditions else ''), params
+
+
+def iter_transcriptions(batch_size=500, newest_first=True, since=None, until=None, after_id=None):
+    """Streams transcriptions in fixed-size batches without loading them all.
+
+    ``since`` and ``until`` are ISO timestamps (until is exclusive); ``after_id``
+    skips rows up to and including that id.
+    """
+    order = 'DESC' if newest_first else 'ASC'
+    where, params = _transcription_filter(since, until, after_id)
+    pool = _get_pool()
+    conn = pool.acquire()
+    try:
+        c = conn.execute(f'''
+            SELECT id, audio_path, timestamp, cleaned_text FROM transcriptions {where}
+            ORDER BY timestamp {order}, id {order}
+        ''', params)
+        try:
+            while True:
+                rows = c.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield from rows
+        finally:
+            # Also reached when the caller stops early, ending the read snapshot
+            c.close()
+    finally:
+        pool.release(conn)
+
+
+# Markers around matched terms in search snippets; the UI turns them into highlighting
+HIGHLIGHT_START = '\x02'
+HIGHLIGHT_END = '\x03'
+
+
+def build_fts_query(text):
+    """Turns search-box input into an FTS5 query.
+
+    Quoted parts become phrase queries; every other word becomes a prefix query, so
+    results update while the last word is still being typed. Terms are ANDed.
+    """
+    terms = []
+    for phrase, word in re.findall(r'"([^"]*)"?|(\S+)', text):
+        if phrase.strip():
+            terms.append('"' + phrase.strip().replace('"', '""') + '"')
+        elif word:
+            for token in re.findall(r'\w+', word):
+                terms.append('"' + token + '"*')
+    return ' '.join(terms)
+
+
+def search_transcriptions(text, limit=200):
+    """Best-ranked matches as (id, audio_path, timestamp, cleaned_text, snippet)."""
+    query = build_fts_query(text)
+    if not query:
+        return []
+    with connection() as conn:
+        c = conn.execute('''
+            SELECT t.id, t.audio_path, t.timestamp, t.cleaned_text,
+                   snippet(transcriptions_fts, 0, ?, ?, '…', 16)
+            FROM transcriptions_fts
+            JOIN transcriptions t ON t.id = transcriptions_fts.rowid
+            WHERE transcriptions_fts MATCH ?
+            ORDER BY rank LIMIT ?
+        ''', (HIGHLIGHT_START, HIGHLIGHT_END, query, limit))
+        return c.fetchall()
+
+
+def count_transcriptions(since=None, until=None, after_id=None):
+    where, params = _transcription_filter(since, until, after_id)
+    with connection() as conn:
+        return conn.execute(f'SELECT COUNT(*) FROM transcriptions {where}', params).fetchone()[0]
+
 
 def fetch_all_transcriptions():
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute('SELECT id, audio_path, timestamp, cleaned_text FROM transcriptions ORDER BY timestamp DESC')
-    rows = c.fetchall()
-    conn.close()
-    return rows 
\ No newline at end of file
+    return list(iter_transcriptions())
+
+
+# --- Jobs ---
+def insert_job(audio_path, data=None):
+    now = datetime.now().isoformat()
+    with connection() as conn:
+        c = conn.execute('''
+            INSERT INTO jobs (audio_path, status, data, created_at, updated_at)
+            VALUES (?, 'queued', ?, ?, ?)
+        ''', (audio_path, json.dumps(data or {}), now, now))
+        return c.lastrowid
+
+
+def update_job(job_id, status, stage, attempts, data, error=None):
+    with connection() as conn:
+        conn.execute('''
+            UPDATE jobs SET status = ?, stage = ?, attempts = ?, data = ?, error = ?, updated_at = ?
+            WHERE id = ?
+        ''', (status, stage, attempts, json.dumps(data), error, datetime.now().isoformat(), job_id))
+
+
+def delete_job(job_id):
+    with connection() as conn:
+        conn.execute('DELETE FROM jobs WHERE id = ?', (job_id,))
+
+
+def fetch_failed_jobs():
+    """Jobs that ran out of attempts, as (id, audio_path, error, updated_at), oldest first."""
+    with connection() as conn:
+        return conn.execute('''
+            SELECT id, audio_path, error, updated_at FROM jobs WHERE status = 'failed' ORDER BY id
+        ''').fetchall()
+
+
+def prune_failed_jobs(before):
+    with connection() as conn:
+        return conn.execute("DELETE FROM jobs WHERE status = 'failed' AND updated_at < ?", (before,)).rowcount
+
+
+def fetch_unfinished_jobs():
+    """Jobs that were queued or in flight when the app last exited, oldest first."""
+    with connection() as conn:
+        c = conn.execute('''
+            SELECT id, audio_path, stage, attempts, data, created_at FROM jobs
+            WHERE status IN ('queued', 'running') ORDER BY id
+        ''')
+        return [(r[0], r[1], r[2], r[3], json.loads(r[4]), r[5]) for r in c.fetchall()]
+
+
+# --- Result cache ---
+def cache_get(kind, key, now):
+    with connection() as conn:
+        row = conn.execute('SELECT value FROM cache WHERE kind = ? AND key = ?', (kind, key)).fetchone()
+        if row is not None:
+            conn.execute('UPDATE cache SET last_used = ? WHERE kind = ? AND key = ?', (now, kind, key))
+    return row[0] if row else None
+
+
+def cache_put(kind, key, value, now):
+    with connection() as conn:
+        conn.execute('''
+            INSERT OR REPLACE INTO cache (kind, key, value, size, created_at, last_used)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', (kind, key, value, len(value.encode('utf-8')), now, now))
+
+
+def cache_evict(max_bytes, oldest_allowed):
+    """Drops entries unused since ``oldest_allowed``, then least recently used ones over ``max_bytes``."""
+    with connection() as conn:
+        removed = conn.execute('DELETE FROM cache WHERE last_used < ?', (oldest_allowed,)).rowcount
+        total = conn.execute('SELECT COALESCE(SUM(size), 0) FROM cache').fetchone()[0]
+        if total > max_bytes:
+            excess = total - max_bytes
+            victims = []
+            for rowid, size in conn.execute('SELECT rowid, size FROM cache ORDER BY last_used'):
+                victims.append((rowid,))
+                excess -= size
+                if excess <= 0:
+                    break
+            conn.executemany('DELETE FROM cache WHERE rowid = ?', victims)
+            removed += len(victims)
+    return removed
+
+
+# --- Audio catalog ---
+# Audio still referenced by a queued or running job is never archived or deleted
+_NOT_PENDING = "NOT EXISTS (SELECT 1 FROM jobs WHERE jobs.audio_path = audio_files.path AND status IN ('queued', 'running'))"
+
+
+def insert_audio_file(path, size, duration, created_at):
+    with connection() as conn:
+        conn.execute('''
+            INSERT OR REPLACE INTO audio_files (path, size, duration, created_at, last_used, tier)
+            VALUES (?, ?, ?, ?, ?, 'hot')
+        ''', (path, size, duration, created_at, created_at))
+
+
+def insert_audio_files(rows):
+    """Catalogs many (path, size, duration, created_at) rows, keeping existing entries."""
+    with connection() as conn:
+        conn.executemany('''
+            INSERT OR IGNORE INTO audio_files (path, size, duration, created_at, last_used)
+            VALUES (?, ?, ?, ?, ?)
+        ''', [(path, size, duration, created_at, created_at) for path, size, duration, created_at in rows])
+
+
+def touch_audio_file(path, now):
+    with connection() as conn:
+        conn.execute('UPDATE audio_files SET last_used = ? WHERE path = ?', (now, path))
+
+
+def fetch_audio_created_before(cutoff, tier=None, limit=100):
+    """Oldest (path, size, duration, created_at, tier) rows created before ``cutoff``."""
+    conditions = ['created_at < ?', _NOT_PENDING]
+    params = [cutoff]
+    if tier is not None:
+        conditions.insert(0, 'tier = ?')
+        params.insert(0, tier)
+    with connection() as conn:
+        return conn.execute(f'''
+            SELECT path, size, duration, created_at, tier FROM audio_files
+            WHERE {' AND '.join(conditions)} ORDER BY created_at LIMIT ?
+        ''', (*params, limit)).fetchall()
+
+
+def fetch_audio_least_recently_used(limit=100):
+    with connection() as conn:
+        return conn.execute(f'''
+            SELECT path, size, duration, created_at, tier FROM audio_files
+            WHERE {_NOT_PENDING} ORDER BY last_used LIMIT ?
+        ''', (limit,)).fetchall()
+
+
+def audio_total_bytes():
+    with connection() as conn:
+        return conn.execute('SELECT COALESCE(SUM(size), 0) FROM audio_files').fetchone()[0]
+
+
+def update_audio_file(path, new_path, size, tier):
+    """Records that ``path`` was replaced by ``new_path`` and repoints its transcriptions."""
+    with connection() as conn:
+        conn.execute('UPDATE audio_files SET path = ?, size = ?, tier = ? WHERE path = ?',
+                     (new_path, size, tier, path))
+        conn.execute('UPDATE transcriptions SET audio_path = ? WHERE audio_path = ?', (new_path, path))
+
+
+def delete_audio_file(path):
+    """Forgets deleted audio; its transcriptions keep their text with an empty audio path."""
+    with connection() as conn:
+        conn.execute('DELETE FROM audio_files WHERE path = ?', (path,))
+        conn.execute("UPDATE transcriptions SET audio_path = '' WHERE audio_path = ?", (path,))
+
+
+# --- Metrics ---
+def insert_metrics(rows):
+    """Inserts (stage, started_at, duration_ms, audio_seconds, bytes, job_id, ok) spans."""
+    with connection() as conn:
+        conn.executemany('''
+            INSERT INTO metrics (stage, started_at, duration_ms, audio_seconds, bytes, job_id, ok)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', rows)
+
+
+def fetch_metrics_since(since):
+    """(stage, duration_ms, audio_seconds, bytes, ok) for spans started at or after ``since``."""
+    with connection() as conn:
+        return conn.execute('''
+            SELECT stage, duration_ms, audio_seconds, bytes, ok FROM metrics WHERE started_at >= ?
+        ''', (since,)).fetchall()
+
+
+def prune_metrics(before):
+    with connection() as conn:
+        return conn.execute('DELETE FROM metrics WHERE started_at < ?', (before,)).rowcount
+
+
+# --- Batch imports ---
+def fetch_batch_keys(keys):
+    """The subset of ``keys`` already recorded by earlier batch runs."""
+    keys = list(keys)
+    found = set()
+    with connection() as conn:
+        # Stay under SQLite's limit on bound parameters
+        for i in range(0, len(keys), 500):
+            chunk = keys[i:i + 500]
+            found.update(row[0] for row in conn.execute(
+                f'SELECT key FROM batch_files WHERE key IN ({",".join("?" * len(chunk))})', chunk))
+    return found
+
+
+def store_batch_results(rows):
+    """Saves (key, audio_path, cleaned_text, timestamp) batch results in one transaction.
+
+    A file that already has a transcription (reprocessing after a prompt change) gets
+    its newest one replaced instead of a duplicate. Rows without text only mark the
+    file as done.
+    """
+    now = time.time()
+    with connection() as conn:
+        for key, audio_path, cleaned_text, timestamp in rows:
+            transcription_id = None
+            if cleaned_text:
+                transcription_id = conn.execute('SELECT MAX(id) FROM transcriptions WHERE audio_path = ?',
+                                                (audio_path,)).fetchone()[0]
+                if transcription_id is not None:
+                    conn.execute('UPDATE transcriptions SET cleaned_text = ? WHERE id = ?',
+                                 (cleaned_text, transcription_id))
+                else:
+                    transcription_id = conn.execute('''
+                        INSERT INTO transcriptions (audio_path, timestamp, cleaned_text)
+                        VALUES (?, ?, ?)
+                    ''', (audio_path, timestamp, cleaned_text)).lastrowid
+            conn.execute('''
+                INSERT OR REPLACE INTO batch_files (key, path, transcription_id, processed_at)
+                VALUES (?, ?, ?, ?)
+            ''', (key, audio_path, transcription_id, now))
+    return len(rows)
+
+
+# --- Key/value settings and markers ---
+def meta_get(key, default=None):
+    with connection() as conn:
+        row = conn.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+    return row[0] if row else default
+
+
+def meta_set(key, value):
+    with connection() as conn:
+        conn.execute('INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)', (key, str(value)))
@@ -0,0 +1,102 @@
+import csv
+import json
+import os
+from datetime import datetime
+
+from src.utils import db
+
+FORMATS = ('jsonl', 'md', 'csv')
+EXTENSIONS = {'.jsonl': 'jsonl', '.json': 'jsonl', '.md': 'md', '.markdown': 'md', '.csv': 'csv'}
+# Highest transcription id written by an export without a date range
+WATERMARK_KEY = 'export_last_id'
+BATCH_SIZE = 500
+
+
+class ExportCancelled(Exception):
+    pass
+
+
+def format_for_path(path):
+    """Export format implied by the file extension, or None."""
+    return EXTENSIONS.get(os.path.splitext(path)[1].lower())
+
+
+class JsonlWriter:
+    def __init__(self, f):
+        self.f = f
+
+    def write(self, row):
+        row_id, audio_path, timestamp, text = row
+        self.f.write(json.dumps({'id': row_id, 'timestamp': timestamp, 'audio_path': audio_path, 'text': text},
+                                ensure_ascii=False) + "\n")
+
+
+class MarkdownWriter:
+    def __init__(self, f):
+        self.f = f
+        f.write("# MyScribe history\n\n")
+
+    def write(self, row):
+        _row_id, _audio_path, timestamp, text = row
+        try:
+            heading = datetime.fromisoformat(timestamp).strftime('%Y-%m-%d %H:%M')
+        except ValueError:
+            heading = timestamp
+        self.f.write(f"## {heading}\n\n{text.strip()}\n\n")
+
+
+class CsvWriter:
+    def __init__(self, f):
+        self.writer = csv.writer(f)
+        self.writer.writerow(['id', 'timestamp', 'audio_path', 'text'])
+
+    def write(self, row):
+        row_id, audio_path, timestamp, text = row
+        self.writer.writerow([row_id, timestamp, audio_path, text])
+
+
+WRITERS = {'jsonl': JsonlWriter, 'md': MarkdownWriter, 'csv': CsvWriter}
+
+
+def export_history(path, fmt=None, since=None, until=None, incremental=False, batch_size=BATCH_SIZE,
+                   on_progress=None, is_cancelled=None):
+    """Streams transcriptions, oldest first, into ``path``; returns the number exported.
+
+    Rows are read from one cursor ``batch_size`` at a time and written as they
+    arrive, so memory use does not grow with the history. ``since``/``until`` are
+    ISO timestamps (until exclusive). ``incremental`` exports only rows added since
+    the last export without a date range, which is also what advances that marker.
+    The file is written under a temporary name and renamed when complete.
+    """
+    fmt = fmt or format_for_path(path) or 'jsonl'
+    if fmt not in WRITERS:
+        raise ValueError(f"Unknown export format: {fmt} (use {', '.join(FORMATS)})")
+    watermark = int(db.meta_get(WATERMARK_KEY, 0))
+    after_id = watermark if incremental else None
+    total = db.count_transcriptions(since, until, after_id)
+    count = 0
+    last_id = watermark
+    tmp_path = f"{path}.part"
+    try:
+        with open(tmp_path, 'w', encoding='utf-8', newline='') as f:
+            writer = WRITERS[fmt](f)
+            for row in db.iter_transcriptions(batch_size, newest_first=False, since=since, until=until,
+                                              after_id=after_id):
+                writer.write(row)
+                count += 1
+                last_id = max(last_id, row[0])
+                if count % batch_size == 0:
+                    if is_cancelled is not None and is_cancelled():
+                        raise ExportCancelled()
+                    if on_progress is not None:
+                        on_progress(count, total)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    if since is None and until is None:
+        db.meta_set(WATERMARK_KEY, last_id)
+    if on_progress is not None:
+        on_progress(count, total)
+    return count
@@ -0,0 +1,187 @@
+import os
+import threading
+import time
+
+from src.utils import db
+
+# Pipeline stages in the order they happen; reports list these first
+STAGES = ('record', 'stop_ready', 'finalize', 'upload', 'transcribe', 'clean', 'clean_first_text', 'db_insert', 'deliver', 'paste', 'type')
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(ordered, pct):
+    """Percentile of an already sorted list (floor index, like LatencyTracker)."""
+    if not ordered:
+        return None
+    return ordered[int(pct / 100 * (len(ordered) - 1))]
+
+
+class Span:
+    """Times one stage. Attributes may be filled in before the ``with`` block ends."""
+
+    def __init__(self, metrics, stage, audio_seconds=None, num_bytes=None, job_id=None):
+        self.metrics = metrics
+        self.stage = stage
+        self.audio_seconds = audio_seconds
+        self.bytes = num_bytes
+        self.job_id = job_id
+
+    def __enter__(self):
+        self.started_at = time.time()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.metrics.record(self.stage, time.perf_counter() - self._start, self.audio_seconds, self.bytes,
+                            self.job_id, ok=exc_type is None, started_at=self.started_at)
+        return False
+
+
+class Metrics:
+    """Collects timing spans per pipeline stage.
+
+    Recording a span only appends to an in-memory buffer; a background thread writes
+    the buffer to the metrics table ``flush_seconds`` after the first new span and,
+    when ``export_path`` is set, rewrites a Prometheus text-format file there.
+    """
+
+    def __init__(self, flush_seconds=5.0, retention_days=30):
+        self.flush_seconds = flush_seconds
+        self.retention_days = retention_days
+        self.export_path = None
+        self._buffer = []
+        self._totals = {}  # stage -> [count, seconds, audio seconds, bytes, errors]
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def span(self, stage, audio_seconds=None, num_bytes=None, job_id=None):
+        return Span(self, stage, audio_seconds, num_bytes, job_id)
+
+    def record(self, stage, seconds, audio_seconds=None, num_bytes=None, job_id=None, ok=True, started_at=None):
+        """Records a span measured elsewhere (e.g. a recording's length)."""
+        if started_at is None:
+            started_at = time.time() - seconds
+        with self._lock:
+            self._buffer.append((stage, started_at, seconds * 1000, audio_seconds, num_bytes, job_id, int(ok)))
+            totals = self._totals.setdefault(stage, [0, 0.0, 0.0, 0, 0])
+            totals[0] += 1
+            totals[1] += seconds
+            totals[2] += audio_seconds or 0.0
+            totals[3] += num_bytes or 0
+            totals[4] += 0 if ok else 1
+            start_thread = self._thread is None
+            if start_thread:
+                self._thread = threading.Thread(target=self._run, name="myscribe-metrics", daemon=True)
+        if start_thread:
+            self._thread.start()
+        self._wake.set()
+
+    def flush(self):
+        if self._write_buffer() and self.export_path:
+            try:
+                self.write_prometheus(self.export_path)
+            except Exception as e:
+                print(f"[MyScribe] Could not export metrics: {e}")
+
+    def _write_buffer(self):
+        with self._lock:
+            rows, self._buffer = self._buffer, []
+        if rows:
+            try:
+                db.insert_metrics(rows)
+            except Exception as e:
+                print(f"[MyScribe] Could not write metrics: {e}")
+        return len(rows)
+
+    def close(self):
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self.flush()
+
+    def _run(self):
+        try:
+            db.prune_metrics(time.time() - self.retention_days * 86400)
+        except Exception as e:
+            print(f"[MyScribe] Could not prune metrics: {e}")
+        # Sleeps until a span arrives, then batches everything recorded in the next few seconds
+        while True:
+            self._wake.wait()
+            if self._stop.wait(self.flush_seconds):
+                return
+            self._wake.clear()
+            self.flush()
+
+    # --- Reporting ---
+    def summarize(self, since):
+        """Per-stage count, percentiles (ms), audio seconds and bytes for spans since ``since``."""
+        self._write_buffer()
+        by_stage = {}
+        for stage, duration_ms, audio_seconds, num_bytes, ok in db.fetch_metrics_since(since):
+            entry = by_stage.setdefault(stage, {'durations': [], 'audio_seconds': 0.0, 'bytes': 0, 'errors': 0})
+            entry['durations'].append(duration_ms)
+            entry['audio_seconds'] += audio_seconds or 0.0
+            entry['bytes'] += num_bytes or 0
+            entry['errors'] += 0 if ok else 1
+        summary = {}
+        for stage in sorted(by_stage, key=lambda s: (STAGES.index(s) if s in STAGES else len(STAGES), s)):
+            entry = by_stage[stage]
+            ordered = sorted(entry.pop('durations'))
+            entry['count'] = len(ordered)
+            for pct in PERCENTILES:
+                entry[f'p{pct}_ms'] = percentile(ordered, pct)
+            summary[stage] = entry
+        return summary
+
+    def report(self, window_hours=24):
+        summary = self.summarize(time.time() - window_hours * 3600)
+        if not summary:
+            print(f"[MyScribe] No pipeline metrics recorded in the last {window_hours:g} h.")
+            return summary
+        print(f"[MyScribe] Pipeline latency over the last {window_hours:g} h:")
+        print(f"  {'stage':<18}{'count':>7}{'errors':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+              f"{'audio min':>11}{'MB':>9}")
+        for stage, entry in summary.items():
+            print(f"  {stage:<18}{entry['count']:>7}{entry['errors']:>8}{entry['p50_ms']:>10.0f}"
+                  f"{entry['p95_ms']:>10.0f}{entry['p99_ms']:>10.0f}{entry['audio_seconds'] / 60:>11.1f}"
+                  f"{entry['bytes'] / 1024 / 1024:>9.2f}")
+        return summary
+
+    def write_prometheus(self, path, window_hours=1):
+        """Writes counters since startup and latency quantiles over the last ``window_hours``."""
+        summary = self.summarize(time.time() - window_hours * 3600)
+        with self._lock:
+            totals = {stage: list(values) for stage, values in self._totals.items()}
+        lines = [
+            f"# HELP myscribe_stage_latency_seconds Stage latency quantiles over the last {window_hours:g} h.",
+            "# TYPE myscribe_stage_latency_seconds gauge",
+        ]
+        for stage, entry in summary.items():
+            for pct in PERCENTILES:
+                lines.append(f'myscribe_stage_latency_seconds{{stage="{stage}",quantile="{pct / 100:g}"}} '
+                             f'{entry[f"p{pct}_ms"] / 1000:.6f}')
+        counters = (
+            ('spans_total', 'Spans recorded since startup.', 0),
+            ('seconds_total', 'Time spent in the stage since startup.', 1),
+            ('audio_seconds_total', 'Audio duration handled by the stage since startup.', 2),
+            ('bytes_total', 'Bytes handled by the stage since startup.', 3),
+            ('errors_total', 'Spans that ended with an error since startup.', 4),
+        )
+        for name, help_text, index in counters:
+            lines.append(f"# HELP myscribe_stage_{name} {help_text}")
+            lines.append(f"# TYPE myscribe_stage_{name} counter")
+            for stage, values in totals.items():
+                value = values[index]
+                lines.append(f'myscribe_stage_{name}{{stage="{stage}"}} '
+                             f'{value if isinstance(value, int) else f"{value:.6f}"}')
+        # Write then rename so a scraper never reads a half-written file
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(tmp_path, path)
+
+
+metrics = Metrics()
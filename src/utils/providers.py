@@ -0,0 +1,355 @@
+import asyncio
+import os
+import random
+import threading
+import time
+from collections import deque
+
+from src.utils.audio import audio_duration, upload_stats
+from src.utils.metrics import metrics
+
+
+class STTProvider:
+    """Speech-to-text backend. Clients are created once and reused for every call."""
+
+    name = 'stt'
+    model_name = None
+
+    async def warm_up(self):
+        """Creates clients and opens connections so the first dictation does not pay for it."""
+
+    async def transcribe(self, audio_path):
+        raise NotImplementedError
+
+
+class LLMProvider:
+    """Text generation backend used to clean transcripts."""
+
+    name = 'llm'
+    model_name = None
+
+    async def warm_up(self):
+        """Creates clients and opens connections so the first dictation does not pay for it."""
+
+    async def generate(self, prompt):
+        raise NotImplementedError
+
+    async def stream(self, prompt):
+        """Yields the response in chunks as it is generated. Falls back to one chunk."""
+        yield await self.generate(prompt)
+
+
+class AssemblyAIProvider(STTProvider):
+    name = 'assemblyai'
+    model_name = 'best'  # an aai.SpeechModel member
+
+    def __init__(self, api_key, poll_interval=0.5):
+        self.api_key = api_key
+        self.poll_interval = poll_interval
+        self._aai = None
+        self._transcriber = None
+        self._client_lock = threading.Lock()
+
+    def _client(self):
+        # The SDK is imported on first use so it stays off the startup path
+        with self._client_lock:
+            if self._transcriber is None:
+                import assemblyai as aai
+                aai.settings.api_key = self.api_key
+                self._aai = aai
+                speech_model = getattr(aai.SpeechModel, self.model_name)
+                self._transcriber = aai.Transcriber(config=aai.TranscriptionConfig(speech_model=speech_model))
+            return self._transcriber
+
+    async def _get_transcriber(self):
+        return self._transcriber or await asyncio.to_thread(self._client)
+
+    async def warm_up(self):
+        # A cheap authenticated request opens the pooled keep-alive connection
+        transcriber = await self._get_transcriber()
+        params = self._aai.ListTranscriptParameters(limit=1)
+        await asyncio.to_thread(transcriber.list_transcripts, params)
+
+    async def transcribe(self, audio_path):
+        transcriber = await self._get_transcriber()
+        # Upload separately so upload cost per minute of speech can be measured
+        size, duration = os.path.getsize(audio_path), audio_duration(audio_path)
+        upload_start = time.perf_counter()
+        upload_url = await asyncio.to_thread(transcriber.upload_file, audio_path)
+        upload_seconds = time.perf_counter() - upload_start
+        upload_stats.record(size, upload_seconds, duration)
+        metrics.record('upload', upload_seconds, duration, size)
+        transcript = await asyncio.to_thread(transcriber.submit, upload_url)
+        # Poll here rather than in the SDK's blocking wait so the deadline can cancel it
+        while transcript.status not in ("completed", "error"):
+            await asyncio.sleep(self.poll_interval)
+            transcript = await asyncio.to_thread(self._aai.Transcript.get_by_id, transcript.id)
+        if transcript.status == "error":
+            raise RuntimeError(f"AssemblyAI transcription failed: {transcript.error}")
+        return transcript.text
+
+
+class GeminiProvider(LLMProvider):
+    name = 'gemini'
+
+    def __init__(self, api_key, model_name="models/gemini-2.5-flash"):
+        self.api_key = api_key
+        self.model_name = model_name
+        self._model = None
+        self._client_lock = threading.Lock()
+
+    def _client(self):
+        # The SDK is imported on first use so it stays off the startup path
+        with self._client_lock:
+            if self._model is None:
+                import google.generativeai as genai
+                genai.configure(api_key=self.api_key)
+                self._model = genai.GenerativeModel(self.model_name)
+            return self._model
+
+    async def _get_model(self):
+        return self._model or await asyncio.to_thread(self._client)
+
+    async def warm_up(self):
+        model = await self._get_model()
+        await model.count_tokens_async("warm up")
+
+    async def generate(self, prompt):
+        model = await self._get_model()
+        response = await model.generate_content_async(prompt)
+        return response.text.strip()
+
+    async def stream(self, prompt):
+        model = await self._get_model()
+        response = await model.generate_content_async(prompt, stream=True)
+        async for chunk in response:
+            if chunk.text:
+                yield chunk.text
+
+
+class FakeSTTProvider(STTProvider):
+    """Offline stand-in for tests and benchmarks, with configurable latency and jitter."""
+
+    name = 'fake-stt'
+
+    def __init__(self, latency=0.5, jitter=0.0, text=None, failure_rate=0.0, seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.text = text
+        self.failure_rate = failure_rate
+        self.calls = 0
+        self._random = random.Random(seed)
+
+    async def transcribe(self, audio_path):
+        self.calls += 1
+        await asyncio.sleep(max(0.0, self.latency + self._random.uniform(-self.jitter, self.jitter)))
+        if self._random.random() < self.failure_rate:
+            raise RuntimeError("Fake STT failure")
+        if self.text is not None:
+            return self.text
+        return f"Transcript of {os.path.basename(audio_path)}"
+
+
+class FakeLLMProvider(LLMProvider):
+    """Offline stand-in that echoes the transcript after the prompt."""
+
+    name = 'fake-llm'
+    model_name = 'fake'
+
+    def __init__(self, latency=0.5, jitter=0.0, failure_rate=0.0, seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.calls = 0
+        self._random = random.Random(seed)
+
+    async def generate(self, prompt):
+        self.calls += 1
+        await asyncio.sleep(max(0.0, self.latency + self._random.uniform(-self.jitter, self.jitter)))
+        if self._random.random() < self.failure_rate:
+            raise RuntimeError("Fake LLM failure")
+        return prompt.rsplit("\n\n", 1)[-1].strip()
+
+    async def stream(self, prompt, chunk_words=4):
+        # Spread the latency over the chunks, the first arriving after a tenth of it
+        words = prompt.rsplit("\n\n", 1)[-1].strip().split(" ")
+        chunks = [" ".join(words[i:i + chunk_words]) + " " for i in range(0, len(words), chunk_words)]
+        self.calls += 1
+        delay = max(0.0, self.latency + self._random.uniform(-self.jitter, self.jitter))
+        await asyncio.sleep(delay / 10)
+        if self._random.random() < self.failure_rate:
+            raise RuntimeError("Fake LLM failure")
+        for chunk in chunks:
+            yield chunk
+            await asyncio.sleep(delay * 0.9 / len(chunks))
+
+
+class LatencyTracker:
+    def __init__(self, window=100):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def __len__(self):
+        return len(self._samples)
+
+    def percentile(self, pct):
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        index = int(pct / 100 * (len(samples) - 1))
+        return samples[index]
+
+
+class HedgedProvider(STTProvider, LLMProvider):
+    """Fires a backup request when the first one is slower than a latency percentile.
+
+    Latency is tracked per unit of input (1k prompt characters, or a second of audio)
+    and the hedge delay scaled by the size of each call, so a long cleanup is not
+    measured against the short ones and doubled as a matter of course. The backup goes
+    to ``fallback`` if given, otherwise it repeats the call on the primary. Whichever
+    answers first wins and the other request is cancelled. Hedging only starts once
+    ``min_samples`` latencies have been observed.
+    """
+
+    def __init__(self, primary, fallback=None, percentile=95, min_samples=10):
+        self.primary = primary
+        self.fallback = fallback
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.name = f"{primary.name}+hedge"
+        self.model_name = getattr(primary, 'model_name', None)
+        self.latency = LatencyTracker()
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    async def warm_up(self):
+        providers = [self.primary] + ([self.fallback] if self.fallback else [])
+        await asyncio.gather(*(p.warm_up() for p in providers))
+
+    async def transcribe(self, audio_path):
+        return await self._hedged('transcribe', audio_path)
+
+    async def generate(self, prompt):
+        return await self._hedged('generate', prompt)
+
+    async def stream(self, prompt):
+        # Partial output cannot be taken back, so streams are never hedged
+        async for chunk in self.primary.stream(prompt):
+            yield chunk
+
+    @staticmethod
+    def _size(method, arg):
+        # Units of input the latency scales with; at least one, so tiny inputs share a floor
+        try:
+            size = len(arg) / 1000 if method == 'generate' else audio_duration(arg)
+        except Exception:
+            size = 1.0
+        return max(1.0, size)
+
+    async def _hedged(self, method, *args):
+        start = time.perf_counter()
+        size = self._size(method, args[0])
+        delay = None
+        if len(self.latency) >= self.min_samples:
+            delay = self.latency.percentile(self.percentile) * size
+        first = asyncio.ensure_future(getattr(self.primary, method)(*args))
+        tasks = {first}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done:
+                self.hedges += 1
+                tasks.add(asyncio.ensure_future(getattr(self.fallback or self.primary, method)(*args)))
+            while True:
+                done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    tasks.discard(task)
+                    if task.exception() is None or not tasks:
+                        if task is not first:
+                            self.hedge_wins += 1
+                        result = task.result()
+                        self.latency.record((time.perf_counter() - start) / size)
+                        return result
+        finally:
+            for task in tasks:
+                task.cancel()
+
+
+class ProviderRuntime:
+    """Runs provider coroutines on one long-lived event loop thread.
+
+    Sync callers (job workers) block on ``run`` with a hard deadline; on timeout the
+    coroutine is cancelled so a stalled request cannot hold a worker forever.
+    """
+
+    def __init__(self):
+        self._loop = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def _ensure_loop(self):
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever, name="myscribe-providers",
+                                                daemon=True)
+                self._thread.start()
+            return self._loop
+
+    def submit(self, coro, timeout=None):
+        """Schedules a coroutine and returns a concurrent.futures.Future for it."""
+        if timeout is not None:
+            coro = asyncio.wait_for(coro, timeout)
+        return asyncio.run_coroutine_threadsafe(coro, self._ensure_loop())
+
+    def run(self, coro, timeout=None):
+        """Runs a coroutine to completion; raises TimeoutError once ``timeout`` seconds pass."""
+        return self.submit(coro, timeout).result()
+
+    def warm_up(self, *providers):
+        """Pre-warms providers in the background; failures are logged, not raised.
+
+        Returns the futures, for callers that want to wait until warm-up is done.
+        """
+        async def _warm(provider):
+            try:
+                await provider.warm_up()
+            except Exception as e:
+                print(f"[MyScribe] Could not pre-warm {provider.name}: {e}")
+        return [self.submit(_warm(provider)) for provider in providers]
+
+    def stop(self):
+        with self._lock:
+            if self._loop is not None:
+                self._loop.call_soon_threadsafe(self._loop.stop)
+                self._loop = None
+
+
+def create_stt_provider(name, api_key, hedge=False, hedge_percentile=95):
+    name = name.lower()
+    if name == 'assemblyai':
+        provider = AssemblyAIProvider(api_key)
+    elif name == 'fake':
+        provider = FakeSTTProvider(latency=float(os.getenv('FAKE_STT_LATENCY', 0.5)),
+                                   jitter=float(os.getenv('FAKE_STT_JITTER', 0.0)))
+    else:
+        raise ValueError(f"Unknown STT provider: {name}")
+    return HedgedProvider(provider, percentile=hedge_percentile) if hedge else provider
+
+
+def create_llm_provider(name, api_key, model_name, hedge=False, fallback_model=None, hedge_percentile=95):
+    name = name.lower()
+    if name == 'gemini':
+        provider = GeminiProvider(api_key, model_name)
+        fallback = GeminiProvider(api_key, fallback_model) if fallback_model else None
+    elif name == 'fake':
+        provider = FakeLLMProvider(latency=float(os.getenv('FAKE_LLM_LATENCY', 0.5)),
+                                   jitter=float(os.getenv('FAKE_LLM_JITTER', 0.0)))
+        fallback = None
+    else:
+        raise ValueError(f"Unknown LLM provider: {name}")
+    return HedgedProvider(provider, fallback, percentile=hedge_percentile) if hedge else provider
@@ -0,0 +1,339 @@
+import threading
+import time
+from collections import deque
+
+from src.utils.audio import LinearResampler, peak_level
+from src.utils.startup import lazy_module
+
+# Imported when the input stream is first opened
+np = lazy_module('numpy')
+sd = lazy_module('sounddevice')
+
+
+class SegmentWriter:
+    """Cuts a capture into segment files and hands each closed one to ``on_segment``.
+
+    A segment is closed on the first quiet block after ``min_seconds`` so words are
+    not split, or unconditionally at ``max_seconds``.
+    """
+
+    def __init__(self, base_path, profile, on_segment, min_seconds=30, max_seconds=45, silence_level=0.02):
+        self.base_path = base_path
+        self.profile = profile
+        self.on_segment = on_segment
+        self.min_frames = int(min_seconds * profile.samplerate)
+        self.max_frames = int(max_seconds * profile.samplerate)
+        self.silence_level = silence_level
+        self._file = None
+        self._frames = 0
+        self._index = 0
+
+    def write(self, data):
+        if self._file is None:
+            self._file = self.profile.open_file(f"{self.base_path}_part{self._index:03d}.{self.profile.extension}")
+        self._file.write(data)
+        self._frames += len(data)
+        if self._frames >= self.max_frames or (
+                self._frames >= self.min_frames and peak_level(data) < self.silence_level):
+            self.close()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self.on_segment(self._file.name)
+            self._file = None
+            self._frames = 0
+            self._index += 1
+
+
+class Capture:
+    """One recording: a writer thread draining the recorder's ring buffer to disk."""
+
+    def __init__(self, recorder, filename, start_pos, requested_at, segments=None, on_finished=None):
+        self.recorder = recorder
+        self.filename = filename
+        self.requested_at = requested_at
+        self.segments = segments
+        self.on_finished = on_finished
+        self.preroll_frames = 0
+        self.frames_written = 0
+        self.dropped_frames = 0
+        self.first_sample_latency = None
+        self.stopped_at = None  # perf_counter time stop() was called
+        self.error = None  # set if the file could not be written
+        self._read_pos = start_pos
+        self._end_pos = None
+        self._resampler = None
+        if recorder.stream_rate != recorder.profile.samplerate:
+            self._resampler = LinearResampler(recorder.stream_rate, recorder.profile.samplerate)
+        self._thread = threading.Thread(target=self._run, name="myscribe-writer", daemon=True)
+
+    def stop(self):
+        """Marks the end of the capture; the writer finishes draining in the background."""
+        self.stopped_at = time.perf_counter()
+        self.recorder._stop_capture(self)
+
+    def wait(self, timeout=None):
+        self._thread.join(timeout)
+        return not self._thread.is_alive()
+
+    @property
+    def finished(self):
+        return self._end_pos is not None and not self._thread.is_alive()
+
+    def _set_first_sample(self, callback_time):
+        if self.first_sample_latency is None:
+            self.first_sample_latency = max(0.0, callback_time - self.requested_at)
+
+    def _run(self):
+        try:
+            self._drain()
+        except Exception as e:
+            # Still reported through on_finished, so whatever waits on this capture moves on
+            self.error = e
+            print(f"[MyScribe] Could not write {self.filename}: {e}")
+        else:
+            print(f"Recording saved: {self.filename}")
+        if self.on_finished is not None:
+            self.on_finished(self)
+
+    def _drain(self):
+        recorder = self.recorder
+        with recorder.profile.open_file(self.filename) as file:
+            while True:
+                with recorder._cond:
+                    while self._read_pos >= recorder._write_pos and self._end_pos is None:
+                        recorder._cond.wait()
+                    end = recorder._write_pos if self._end_pos is None else min(self._end_pos, recorder._write_pos)
+                    done = self._end_pos is not None and self._read_pos >= end
+                if done:
+                    break
+                data = recorder._read(self, self._read_pos, end)
+                self._read_pos = end
+                if data is None:
+                    continue
+                if self._resampler is not None:
+                    data = self._resampler.process(data)
+                file.write(data)
+                self.frames_written += len(data)
+                if self.segments is not None:
+                    self.segments.write(data)
+        if self.segments is not None:
+            self.segments.close()
+
+
+class Recorder:
+    """Callback-mode recorder feeding a preallocated ring buffer.
+
+    The input stream is kept open ("warm") between recordings so a capture can start
+    from audio that was already buffered: each capture begins ``preroll_ms`` before
+    the hotkey was pressed, but never before the end of the previous capture, so
+    back-to-back dictations do not repeat each other's last words. Positions are absolute frame counts since the recorder
+    was created, so several captures can drain the same ring independently.
+
+    With ``idle_seconds`` set, the stream (and the audio thread calling back into it)
+    is released once no capture has run for that long. The next ``start`` returns
+    straight away and reopens the stream on a background thread; that capture has no
+    pre-roll and begins with the first block from the reopened device.
+    """
+
+    def __init__(self, profile, preroll_ms=500, ring_seconds=30, blocksize=512, stream_factory=None,
+                 idle_seconds=0):
+        self.profile = profile
+        self.preroll_ms = preroll_ms
+        self.ring_seconds = ring_seconds
+        self.blocksize = blocksize
+        # Called like sd.InputStream; benchmarks pass a synthetic stream to run without a device
+        self.stream_factory = stream_factory
+        self.idle_seconds = idle_seconds
+        self.stream_rate = profile.samplerate
+        self.overflows = 0
+        self.dropped_frames = 0
+        self._stream = None
+        self._ring = None
+        self._write_pos = 0
+        self._stream_start_pos = 0
+        self._last_end_pos = 0  # where the most recently stopped capture ended
+        self._blocks = deque(maxlen=256)  # (callback time, write position after the block)
+        self._waiting = []
+        self._cond = threading.Condition()
+        self._open_lock = threading.Lock()
+        self._active = 0  # captures started and not yet stopped
+        self._idle_timer = None
+
+    @property
+    def is_open(self):
+        return self._stream is not None
+
+    def open(self):
+        with self._open_lock:
+            if self._stream is not None:
+                return
+            dtype = self.profile.dtype
+            input_stream = self.stream_factory or sd.InputStream
+            try:
+                stream = input_stream(samplerate=self.profile.samplerate, channels=self.profile.channels,
+                                      dtype=dtype, blocksize=self.blocksize, callback=self._callback)
+                self.stream_rate = self.profile.samplerate
+            except sd.PortAudioError:
+                device_rate = int(sd.query_devices(kind='input')['default_samplerate'])
+                print(f"[MyScribe] Input device does not support {self.profile.samplerate} Hz, "
+                      f"resampling from {device_rate} Hz.")
+                dtype = 'float32'
+                stream = input_stream(samplerate=device_rate, channels=self.profile.channels,
+                                      dtype=dtype, blocksize=self.blocksize, callback=self._callback)
+                self.stream_rate = device_rate
+            ring_frames = int(self.ring_seconds * self.stream_rate)
+            if self._ring is None or self._ring.shape[0] != ring_frames or self._ring.dtype != np.dtype(dtype):
+                self._ring = np.zeros((ring_frames, self.profile.channels), dtype=dtype)
+            with self._cond:
+                self._stream_start_pos = self._write_pos
+                self._blocks.clear()
+            self._stream = stream
+            stream.start()
+            if not self._active:
+                self._arm_idle_timer()
+
+    def close(self):
+        with self._open_lock:
+            self._cancel_idle_timer()
+            self._close_stream()
+
+    def _close_stream(self):
+        if self._stream is None:
+            return
+        self._stream.stop()
+        self._stream.close()
+        self._stream = None
+
+    def _arm_idle_timer(self):
+        # Called with _open_lock held
+        self._cancel_idle_timer()
+        if self.idle_seconds > 0 and self._stream is not None:
+            timer = threading.Timer(self.idle_seconds, lambda: self._release_idle(timer))
+            self._idle_timer = timer
+            timer.daemon = True
+            timer.start()
+
+    def _cancel_idle_timer(self):
+        if self._idle_timer is not None:
+            self._idle_timer.cancel()
+            self._idle_timer = None
+
+    def _release_idle(self, timer):
+        with self._open_lock:
+            # A timer cancelled just as it fired is no longer the current one
+            if self._active or self._stream is None or self._idle_timer is not timer:
+                return
+            self._idle_timer = None
+            self._close_stream()
+        print(f"[MyScribe] Microphone released after {self.idle_seconds:g} s without recording.")
+
+    def start(self, filename, requested_at=None, segments=None, on_finished=None):
+        """Starts a capture including pre-roll from before ``requested_at`` (a perf_counter time)."""
+        if requested_at is None:
+            requested_at = time.perf_counter()
+        with self._open_lock:
+            self._active += 1
+            self._cancel_idle_timer()
+            # Released while idle: reopened in the background instead of on the hotkey thread
+            reopen = self._stream is None and self._ring is not None
+        if self._ring is None:
+            # Never opened: the ring and stream rate come from the device, so open it here
+            try:
+                self.open()
+            except Exception:
+                with self._open_lock:
+                    self._active -= 1
+                raise
+        with self._cond:
+            hotkey_pos = self._position_at(requested_at)
+            oldest = max(self._stream_start_pos, self._write_pos - self._ring.shape[0] + self.blocksize)
+            if reopen:
+                # The ring only holds audio from before the release
+                oldest = self._write_pos
+            preroll_pos = hotkey_pos - int(self.preroll_ms / 1000 * self.stream_rate)
+            start_pos = max(oldest, self._last_end_pos, preroll_pos)
+            capture = Capture(self, filename, start_pos, requested_at, segments, on_finished)
+            capture.preroll_frames = max(0, hotkey_pos - start_pos)
+            first_block = next((t for t, _ in self._blocks if t >= requested_at), None)
+            if first_block is not None:
+                capture._set_first_sample(first_block)
+            else:
+                self._waiting.append(capture)
+        capture._thread.start()
+        if reopen:
+            threading.Thread(target=self._reopen, name="myscribe-mic-open", daemon=True).start()
+        return capture
+
+    def _reopen(self):
+        try:
+            self.open()
+        except Exception as e:
+            # The capture stays empty until it is stopped
+            print(f"[MyScribe] Could not reopen microphone: {e}")
+
+    def _position_at(self, t):
+        # Frames captured by time t: the write position after the last block delivered before t
+        pos = self._stream_start_pos
+        for callback_time, end_pos in self._blocks:
+            if callback_time > t:
+                break
+            pos = end_pos
+        return pos
+
+    def _stop_capture(self, capture):
+        with self._cond:
+            stopping = capture._end_pos is None
+            if stopping:
+                capture._end_pos = self._write_pos
+                self._last_end_pos = max(self._last_end_pos, capture._end_pos)
+                if capture in self._waiting:
+                    self._waiting.remove(capture)
+            self._cond.notify_all()
+        if stopping:
+            with self._open_lock:
+                self._active -= 1
+                if not self._active:
+                    self._arm_idle_timer()
+
+    def _read(self, capture, start, end):
+        """Copies frames [start, end) out of the ring, or None if they were overwritten."""
+        size = self._ring.shape[0]
+        if self._write_pos - start > size:
+            lost = end - start
+            capture.dropped_frames += lost
+            self.dropped_frames += lost
+            return None
+        i, j = start % size, end % size
+        if i < j or end - start == 0:
+            data = self._ring[i:j].copy()
+        else:
+            data = np.concatenate((self._ring[i:], self._ring[:j]))
+        # The callback may have lapped the reader while we were copying
+        if self._write_pos - start > size:
+            lost = end - start
+            capture.dropped_frames += lost
+            self.dropped_frames += lost
+            return None
+        return data
+
+    def _callback(self, indata, frames, time_info, status):
+        now = time.perf_counter()
+        if status.input_overflow:
+            self.overflows += 1
+        ring = self._ring
+        size = ring.shape[0]
+        i = self._write_pos % size
+        first = min(frames, size - i)
+        ring[i:i + first] = indata[:first]
+        if first < frames:
+            ring[:frames - first] = indata[first:]
+        with self._cond:
+            self._write_pos += frames
+            self._blocks.append((now, self._write_pos))
+            if self._waiting:
+                for capture in self._waiting:
+                    capture._set_first_sample(now)
+                self._waiting.clear()
+            self._cond.notify_all()
@@ -0,0 +1,193 @@
+import glob
+import os
+import threading
+import time
+
+from src.utils import db
+from src.utils.audio import AUDIO_EXTENSIONS, CAPTURE_PROFILES, audio_duration, opus_available, sf, transcode
+
+HOT = 'hot'
+ARCHIVED = 'archived'
+ARCHIVE_DIR_NAME = 'archive'
+# Rows handled per catalog query
+BATCH_SIZE = 100
+BACKFILL_KEY = 'audio_catalog_backfilled'
+
+
+def archive_profile():
+    """Opus is about a tenth of the size of FLAC for speech; FLAC when libsndfile lacks Opus."""
+    return CAPTURE_PROFILES['opus' if opus_available() else 'speech']
+
+
+def catalog_audio(path, duration=None, created_at=None):
+    """Records a finished recording in the audio catalog and returns its size in bytes."""
+    try:
+        size = os.path.getsize(path)
+    except OSError as e:
+        print(f"[MyScribe] Could not catalog {path}: {e}")
+        return None
+    if duration is None:
+        duration = audio_duration(path)
+    try:
+        db.insert_audio_file(path, size, duration, created_at or time.time())
+    except Exception as e:
+        print(f"[MyScribe] Could not catalog {path}: {e}")
+    return size
+
+
+def touch_audio(path):
+    """Marks audio as used so the storage budget evicts it last."""
+    try:
+        db.touch_audio_file(path, time.time())
+    except Exception as e:
+        print(f"[MyScribe] Could not update audio catalog: {e}")
+
+
+class RetentionSweeper:
+    """Background thread that expires, archives and evicts recordings using the audio catalog.
+
+    Every pass works from indexed range queries on the catalog, so its cost depends on
+    how many files need work rather than how many are kept. Files written before the
+    catalog existed are picked up by a one-off directory scan on the first pass.
+    """
+
+    def __init__(self, audio_dir, retention_days=30, archive_after_days=0, max_bytes=0,
+                 interval_seconds=3600, initial_delay=30):
+        self.audio_dir = audio_dir
+        self.archive_dir = os.path.join(audio_dir, ARCHIVE_DIR_NAME)
+        self.retention_days = retention_days
+        self.archive_after_days = archive_after_days
+        self.max_bytes = max_bytes
+        self.interval_seconds = interval_seconds
+        self.initial_delay = initial_delay
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="myscribe-retention", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=5):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self):
+        if self._stop.wait(self.initial_delay):
+            return
+        while True:
+            try:
+                self.sweep()
+            except Exception as e:
+                print(f"[MyScribe] Audio retention sweep failed: {e}")
+            if self._stop.wait(self.interval_seconds):
+                return
+
+    def sweep(self, now=None):
+        """Runs one pass; returns counts of expired, archived and evicted files."""
+        now = now or time.time()
+        if db.meta_get(BACKFILL_KEY) is None:
+            self._backfill()
+        # Expire first so files about to be deleted are not transcoded
+        counts = {
+            'expired': self._expire(now) if self.retention_days > 0 else 0,
+            'archived': self._archive(now) if self.archive_after_days > 0 else 0,
+            'evicted': self._enforce_budget() if self.max_bytes > 0 else 0,
+        }
+        if any(counts.values()):
+            print(f"[MyScribe] Audio retention: {counts['expired']} expired, {counts['archived']} archived, "
+                  f"{counts['evicted']} evicted over the storage budget.")
+        return counts
+
+    def _backfill(self):
+        rows = []
+        for directory in (self.audio_dir, self.archive_dir):
+            for ext in AUDIO_EXTENSIONS:
+                for path in glob.glob(os.path.join(directory, f'*.{ext}')):
+                    try:
+                        rows.append((path, os.path.getsize(path), audio_duration(path), os.path.getmtime(path)))
+                    except OSError:
+                        continue
+        db.insert_audio_files(rows)
+        db.meta_set(BACKFILL_KEY, int(time.time()))
+        print(f"[MyScribe] Cataloged {len(rows)} existing audio files.")
+
+    def _process(self, fetch, handle):
+        """Handles catalog rows batch by batch until none are left or a batch makes no progress."""
+        done = 0
+        while not self._stop.is_set():
+            rows = fetch()
+            progress = sum(1 for row in rows if handle(row))
+            done += progress
+            if len(rows) < BATCH_SIZE or not progress:
+                break
+        return done
+
+    def _archive(self, now):
+        cutoff = now - self.archive_after_days * 86400
+        profile = archive_profile()
+        return self._process(lambda: db.fetch_audio_created_before(cutoff, HOT, BATCH_SIZE),
+                             lambda row: self._archive_file(row[0], row[1], profile))
+
+    def _archive_file(self, path, size, profile):
+        if not os.path.exists(path):
+            db.delete_audio_file(path)
+            return True
+        try:
+            info = sf.info(path)
+            if info.format == profile.format and info.subtype == profile.subtype:
+                db.update_audio_file(path, path, size, ARCHIVED)
+                return True
+            os.makedirs(self.archive_dir, exist_ok=True)
+            base = os.path.splitext(os.path.basename(path))[0]
+            archived_path = os.path.join(self.archive_dir, f"{base}.{profile.extension}")
+            transcode(path, archived_path, profile)
+            archived_size = os.path.getsize(archived_path)
+            if archived_size >= size:
+                # Not worth it (already compact); keep the original as the archived copy
+                os.remove(archived_path)
+                db.update_audio_file(path, path, size, ARCHIVED)
+                return True
+            db.update_audio_file(path, archived_path, archived_size, ARCHIVED)
+            os.remove(path)
+            return True
+        except Exception as e:
+            print(f"[MyScribe] Could not archive {path}: {e}")
+            return False
+
+    def _expire(self, now):
+        cutoff = now - self.retention_days * 86400
+        return self._process(lambda: db.fetch_audio_created_before(cutoff, limit=BATCH_SIZE),
+                             lambda row: self._remove(row[0]))
+
+    def _enforce_budget(self):
+        total = db.audio_total_bytes()
+        evicted = 0
+        while total > self.max_bytes and not self._stop.is_set():
+            rows = db.fetch_audio_least_recently_used(BATCH_SIZE)
+            progress = False
+            for path, size, *_ in rows:
+                if self._remove(path):
+                    total -= size
+                    evicted += 1
+                    progress = True
+                    if total <= self.max_bytes:
+                        break
+            if not progress:
+                break
+        return evicted
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            print(f"[MyScribe] Could not delete {path}: {e}")
+            return False
+        db.delete_audio_file(path)
+        return True
@@ -0,0 +1,249 @@
+import queue
+import threading
+import time
+from datetime import datetime, timedelta
+
+from src.utils import db
+
+
+class Job:
+    """A recording moving through the pipeline stages.
+
+    ``data`` is persisted with the job after every stage so a restart resumes at the
+    stage that was running; ``context`` holds in-memory extras (such as a streaming
+    transcription) that are lost on restart.
+    """
+
+    def __init__(self, job_id, audio_path, stage=0, attempts=0, data=None, context=None):
+        self.id = job_id
+        self.audio_path = audio_path
+        self.stage = stage
+        self.attempts = attempts
+        self.data = data or {}
+        self.context = context or {}
+        self.error = None
+        self.enqueued_at = time.monotonic()
+        self.started_at = None
+        self.finished_at = None
+
+    @property
+    def wait_seconds(self):
+        if self.started_at is None:
+            return time.monotonic() - self.enqueued_at
+        return self.started_at - self.enqueued_at
+
+
+def run_stages(stages, job, on_stage_done=None):
+    """Runs the remaining stages of a job in order.
+
+    A stage returning False ends the pipeline early (e.g. no speech); exceptions
+    propagate so the caller can decide whether to retry. Returns True when every
+    stage ran.
+    """
+    while job.stage < len(stages):
+        _name, fn = stages[job.stage]
+        if fn(job) is False:
+            return False
+        job.stage += 1
+        if on_stage_done is not None:
+            on_stage_done(job)
+    return True
+
+
+class JobScheduler:
+    """Bounded worker pool over a job table that survives restarts.
+
+    Failed stages are retried with exponential backoff without redoing the stages
+    that already succeeded, and results are handed to ``on_result`` in submission
+    order even when later jobs finish first. Jobs resumed from an earlier run have
+    ``context['resumed']`` set. Jobs that ran out of attempts are listed at start
+    and dropped from the table after ``failed_retention_days``.
+    """
+
+    def __init__(self, stages, workers=2, max_attempts=4, backoff_seconds=2.0, backoff_max=60.0,
+                 failed_retention_days=7):
+        self.stages = stages
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+        self.backoff_max = backoff_max
+        self.failed_retention_days = failed_retention_days
+        self.on_result = None
+        self.on_job_started = None
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._deliver_lock = threading.Lock()
+        self._pending = []  # job ids awaiting delivery, in submission order
+        self._completed = {}
+        self._running = 0
+        self._threads = []
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._started_jobs = 0
+        self._delivered = 0
+
+    def start(self, on_result=None, on_job_started=None):
+        self.on_result = on_result
+        self.on_job_started = on_job_started
+        self._report_failed()
+        resumed = db.fetch_unfinished_jobs()
+        for job_id, audio_path, stage, attempts, data, _created_at in resumed:
+            # The user has moved on since, so the result must not be typed into whatever has focus
+            self._enqueue(Job(job_id, audio_path, stage, attempts, data, context={'resumed': True}))
+        if resumed:
+            print(f"[MyScribe] Resuming {len(resumed)} unfinished job(s) from the last session.")
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f"myscribe-job-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _report_failed(self):
+        failed = db.fetch_failed_jobs()
+        if failed:
+            print(f"[MyScribe] {len(failed)} recording(s) failed to process in earlier sessions "
+                  f"(re-run them with --batch):")
+            for _job_id, audio_path, error, updated_at in failed:
+                print(f"[MyScribe]   {audio_path} ({updated_at[:16]}): {error}")
+        before = (datetime.now() - timedelta(days=self.failed_retention_days)).isoformat()
+        pruned = db.prune_failed_jobs(before)
+        if pruned:
+            print(f"[MyScribe] Dropped {pruned} failed job(s) older than {self.failed_retention_days:g} days.")
+
+    def reserve(self):
+        """Holds a place in the delivery order for a job that is submitted later.
+
+        Pass the slot to ``submit`` (or to ``release`` if the job never comes), so a
+        recording is delivered in the order it was stopped, not the order its file
+        happened to finish.
+        """
+        slot = object()
+        with self._lock:
+            self._pending.append(slot)
+        return slot
+
+    def release(self, slot):
+        """Gives up a reserved slot, letting the jobs behind it be delivered."""
+        with self._lock:
+            if slot in self._pending:
+                self._pending.remove(slot)
+        self._deliver_ready()
+
+    def submit(self, audio_path, context=None, slot=None):
+        job = Job(db.insert_job(audio_path), audio_path, context=context)
+        self._enqueue(job, slot)
+        return job.id
+
+    def shutdown(self):
+        """Stops the workers. Jobs still queued or in flight stay in the table for next launch."""
+        for _ in self._threads:
+            self._queue.put(None)
+
+    def is_next_to_deliver(self, job_id):
+        with self._lock:
+            return bool(self._pending) and self._pending[0] == job_id
+
+    def stats(self):
+        with self._lock:
+            started = self._started_jobs
+            return {
+                'queue_depth': self._queue.qsize(),
+                'running': self._running,
+                'awaiting_delivery': len(self._pending),
+                'delivered': self._delivered,
+                'mean_wait_seconds': self._wait_total / started if started else 0.0,
+                'max_wait_seconds': self._wait_max,
+            }
+
+    def _enqueue(self, job, slot=None):
+        with self._lock:
+            if slot is not None and slot in self._pending:
+                self._pending[self._pending.index(slot)] = job.id
+            else:
+                self._pending.append(job.id)
+        self._queue.put(job)
+
+    def _worker(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            if job.started_at is None:
+                job.started_at = time.monotonic()
+                with self._lock:
+                    self._started_jobs += 1
+                    self._wait_total += job.wait_seconds
+                    self._wait_max = max(self._wait_max, job.wait_seconds)
+                print(f"[MyScribe] Job {job.id} started after {job.wait_seconds:.2f} s wait "
+                      f"(queue depth {self._queue.qsize()}).")
+                if self.on_job_started is not None:
+                    try:
+                        self.on_job_started(job)
+                    except Exception as e:
+                        print(f"[MyScribe] Job {job.id} start notification failed: {e}")
+            with self._lock:
+                self._running += 1
+            try:
+                self._run(job)
+            finally:
+                with self._lock:
+                    self._running -= 1
+
+    def _run(self, job):
+        # Everything here, database bookkeeping included, ends in a retry or in _complete;
+        # a job that escaped both would hold its delivery slot and every result behind it
+        try:
+            db.update_job(job.id, 'running', job.stage, job.attempts, job.data)
+            run_stages(self.stages, job, self._persist)
+            db.delete_job(job.id)
+        except Exception as e:
+            self._retry_or_fail(job, e)
+            return
+        self._complete(job)
+
+    def _retry_or_fail(self, job, e):
+        job.attempts += 1
+        # A failure after the last stage is the job table write that follows it
+        stage_name = self.stages[job.stage][0] if job.stage < len(self.stages) else 'bookkeeping'
+        if job.attempts < self.max_attempts:
+            delay = min(self.backoff_seconds * 2 ** (job.attempts - 1), self.backoff_max)
+            print(f"[MyScribe] Job {job.id} {stage_name} failed ({e}); retry {job.attempts} in {delay:.1f} s.")
+            self._update_quietly(job, 'queued', str(e))
+            timer = threading.Timer(delay, self._queue.put, args=(job,))
+            timer.daemon = True
+            timer.start()
+            return
+        print(f"[MyScribe] Job {job.id} {stage_name} failed after {job.attempts} attempts: {e}")
+        job.error = str(e)
+        self._update_quietly(job, 'failed', job.error)
+        self._complete(job)
+
+    def _update_quietly(self, job, status, error):
+        # The in-memory job still goes on; at worst a restart resumes it from an older row
+        try:
+            db.update_job(job.id, status, job.stage, job.attempts, job.data, error)
+        except Exception as e:
+            print(f"[MyScribe] Could not record job {job.id} as {status}: {e}")
+
+    def _persist(self, job):
+        db.update_job(job.id, 'running', job.stage, job.attempts, job.data)
+
+    def _complete(self, job):
+        job.finished_at = time.monotonic()
+        with self._lock:
+            self._completed[job.id] = job
+        self._deliver_ready()
+
+    def _deliver_ready(self):
+        # Serialised so results leave in order even when two workers finish together
+        with self._deliver_lock:
+            while True:
+                with self._lock:
+                    if not self._pending or self._pending[0] not in self._completed:
+                        return
+                    job = self._completed.pop(self._pending.pop(0))
+                    self._delivered += 1
+                if self.on_result is not None:
+                    try:
+                        self.on_result(job)
+                    except Exception as e:
+                        print(f"[MyScribe] Could not deliver job {job.id}: {e}")
@@ -0,0 +1,127 @@
+import itertools
+import threading
+import time
+
+from src.utils.metrics import metrics
+
+# Budget from a stop hotkey until the next recording can start; slower stops are logged
+STOP_READY_TARGET_MS = 50
+
+RECORDING = 'recording'
+FINALIZING = 'finalizing'
+FINISHED = 'finished'
+
+
+class Session:
+    """One dictation, from the hotkey press until its audio file is complete."""
+
+    def __init__(self, session_id, continuous, requested_at):
+        self.id = session_id
+        self.continuous = continuous
+        self.requested_at = requested_at
+        self.state = RECORDING
+        self.capture = None
+        self.context = {}  # extras owned by the caller, e.g. a streaming transcription
+        self.slot = None  # reserved by ``reserve`` when the session is stopped
+        self.stop_ready_ms = None
+
+
+class SessionManager:
+    """Thread-safe owner of the dictation being recorded.
+
+    Hotkey callbacks start and stop sessions under one lock, so a press and a release
+    arriving on different hook threads cannot both act on the same session. ``stop``
+    only marks the end of the capture and returns; the capture's writer thread
+    finishes the file and then calls ``on_finished``, so the next session can start
+    while earlier ones are still being finalised or processed.
+
+    ``start_capture(session, on_finished)`` opens the capture for a new session and
+    returns it; it must call ``on_finished(capture)`` once the file is complete, or
+    once it fails (with ``capture.error`` set), even if the session is still recording.
+    ``reserve()``, when given, is called as each session stops, under the lock, so
+    whatever it returns (``session.slot``) is taken in stop order. Hold ``lock`` to
+    combine a check of ``recording`` with a start or stop.
+    """
+
+    def __init__(self, start_capture, on_finished=None, reserve=None):
+        self.start_capture = start_capture
+        self.on_finished = on_finished
+        self.reserve = reserve
+        self.lock = threading.RLock()
+        self._ids = itertools.count(1)
+        self._current = None
+        self._finalizing = {}
+
+    @property
+    def recording(self):
+        return self._current is not None
+
+    @property
+    def current(self):
+        return self._current
+
+    def finalizing(self):
+        """Sessions stopped whose audio file is still being written."""
+        with self.lock:
+            return list(self._finalizing.values())
+
+    def start(self, continuous=False, requested_at=None):
+        """Starts a session unless one is already recording; returns it, or None."""
+        if requested_at is None:
+            requested_at = time.perf_counter()
+        with self.lock:
+            if self._current is not None:
+                return None
+            session = Session(next(self._ids), continuous, requested_at)
+            session.capture = self.start_capture(session, lambda capture: self._finished(session))
+            self._current = session
+        return session
+
+    def stop(self, continuous=None):
+        """Stops the current session and returns it without waiting for its file.
+
+        With ``continuous`` given, only a session of that kind is stopped (the
+        hold-to-record release must not end a continuous recording).
+        """
+        start = time.perf_counter()
+        with self.lock:
+            session = self._current
+            if session is None or (continuous is not None and session.continuous != continuous):
+                return None
+            if session.state == FINISHED or session.capture.error is not None:
+                # The writer already failed and reports the session itself; nothing will be delivered
+                self._current = None
+                session.capture.stop()
+                return None
+            if self.reserve is not None:
+                session.slot = self.reserve()
+            session.state = FINALIZING
+            self._finalizing[session.id] = session
+            self._current = None
+            session.capture.stop()
+        session.stop_ready_ms = (time.perf_counter() - start) * 1000
+        metrics.record('stop_ready', session.stop_ready_ms / 1000)
+        if session.stop_ready_ms > STOP_READY_TARGET_MS:
+            print(f"[MyScribe] Warning: session {session.id} took {session.stop_ready_ms:.0f} ms to stop "
+                  f"(target {STOP_READY_TARGET_MS} ms).")
+        return session
+
+    def wait_finalized(self, timeout=None):
+        """Waits for stopped sessions to finish writing; returns False if some are still going."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for session in self.finalizing():
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            session.capture.wait(remaining)
+        return not self.finalizing()
+
+    def _finished(self, session):
+        # Runs on the capture's writer thread once the file is complete, or as soon as it fails
+        with self.lock:
+            if self._current is session:
+                # Failed while recording: end the capture so the next press starts a new session
+                self._current = None
+                session.capture.stop()
+            self._finalizing.pop(session.id, None)
+            session.state = FINISHED
+        if self.on_finished is not None:
+            self.on_finished(session)
@@ -0,0 +1,123 @@
+import builtins
+import sys
+import threading
+import time
+
+
+class LazyModule:
+    """Stand-in for a module that is imported the first time one of its attributes is used.
+
+    Keeps heavy libraries (numpy, soundfile, sounddevice, pygame) off the startup path.
+    The import itself goes through the normal import lock, so first use from several
+    threads at once is safe.
+    """
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr):
+        module = self._module
+        if module is None:
+            __import__(self._name)
+            module = self._module = sys.modules[self._name]
+        return getattr(module, attr)
+
+    def __repr__(self):
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<lazy module '{self._name}' ({state})>"
+
+
+def lazy_module(name):
+    """Returns the module if it is already imported, otherwise a LazyModule for it."""
+    return sys.modules.get(name) or LazyModule(name)
+
+
+class StartupProfiler:
+    """Collects per-phase and per-import timings for ``--profile-startup``.
+
+    Times are measured from when the profiler is created, at the top of main.py. Only
+    outermost imports are recorded, so each entry includes everything it pulled in.
+    When disabled every method is a cheap no-op.
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.started = time.perf_counter()
+        self.phases = []  # (name, offset, seconds)
+        self.imports = []  # (name, offset, seconds)
+        self.milestones = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        if enabled:
+            self._hook_imports()
+
+    def _hook_imports(self):
+        original = builtins.__import__
+
+        def timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+            # "from package import module" loads the module even when the package is loaded
+            new = [item for item in fromlist or () if f"{name}.{item}" not in sys.modules]
+            if level or (name in sys.modules and not new):
+                return original(name, globals, locals, fromlist, level)
+            label = f"{name}.{','.join(new)}" if name in sys.modules else name
+            depth = getattr(self._local, 'depth', 0)
+            self._local.depth = depth + 1
+            start = time.perf_counter()
+            try:
+                return original(name, globals, locals, fromlist, level)
+            finally:
+                self._local.depth = depth
+                if depth == 0:
+                    with self._lock:
+                        self.imports.append((label, start - self.started, time.perf_counter() - start))
+
+        builtins.__import__ = timed_import
+
+    def phase(self, name):
+        return _Phase(self, name)
+
+    def mark(self, name):
+        """Records the first time a milestone (e.g. 'tray visible') is reached."""
+        if self.enabled:
+            with self._lock:
+                self.milestones.setdefault(name, time.perf_counter() - self.started)
+
+    def report(self, ready_after=()):
+        """Prints the timings; ``ready_after`` names the milestones that together mean "ready"."""
+        if not self.enabled:
+            return
+        with self._lock:
+            phases = list(self.phases)
+            imports = sorted(self.imports, key=lambda item: item[2], reverse=True)
+            milestones = sorted(self.milestones.items(), key=lambda item: item[1])
+        print("[MyScribe] Startup profile (ms since launch):")
+        print("  Phases:")
+        for name, offset, seconds in phases:
+            print(f"    {name:<36} {seconds * 1000:8.1f} ms  (at {offset * 1000:7.1f})")
+        print("  Imports (slowest first):")
+        for name, offset, seconds in imports[:25]:
+            print(f"    {name:<36} {seconds * 1000:8.1f} ms  (at {offset * 1000:7.1f})")
+        print("  Milestones:")
+        for name, offset in milestones:
+            print(f"    {name:<36} {offset * 1000:8.1f} ms")
+        reached = [self.milestones[name] for name in ready_after if name in self.milestones]
+        if ready_after and len(reached) == len(ready_after):
+            print(f"[MyScribe] Cold start to responsive hotkey: {max(reached) * 1000:.0f} ms")
+
+
+class _Phase:
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        if self.profiler.enabled:
+            end = time.perf_counter()
+            with self.profiler._lock:
+                self.profiler.phases.append((self.name, self.start - self.profiler.started, end - self.start))
+        return False
@@ -0,0 +1,117 @@
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from src.utils.chunking import split_sentences
+
+
+class StreamingTranscription:
+    """Transcribes recording segments in the background while recording continues.
+
+    Segments are submitted as soon as the recorder closes them, so by the time
+    recording stops only the tail segment should still be in flight. ``result``
+    stitches the partial transcripts back together in recording order.
+    """
+
+    def __init__(self, transcribe, max_workers=2, delete_segments=True):
+        self._transcribe = transcribe
+        self._delete_segments = delete_segments
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="myscribe-stt")
+        self._futures = []
+        self._lock = threading.Lock()
+
+    def add_segment(self, segment_path):
+        with self._lock:
+            self._futures.append(self._executor.submit(self._run, segment_path))
+
+    def _run(self, segment_path):
+        try:
+            return self._transcribe(segment_path)
+        finally:
+            if self._delete_segments:
+                try:
+                    os.remove(segment_path)
+                except OSError:
+                    pass
+
+    def result(self, timeout=None):
+        """Waits for every segment and returns the stitched transcript.
+
+        Returns None if any segment failed, so the caller can fall back to
+        transcribing the full recording. ``timeout`` bounds the whole wait, not
+        each segment.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._lock:
+            futures = list(self._futures)
+        try:
+            parts = []
+            for future in futures:
+                remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+                text = future.result(timeout=remaining)
+                if text is None:
+                    return None
+                text = text.strip()
+                if text:
+                    parts.append(text)
+            return " ".join(parts)
+        finally:
+            self._executor.shutdown(wait=False)
+
+
+class SentenceAssembler:
+    """Buffers streamed text and releases it in whole sentences, lines or paragraphs.
+
+    Released pieces are exact slices of the input, so joining them reproduces the
+    full response.
+    """
+
+    BOUNDARY = re.compile(r'[.!?]["\')\]]*[ \t]+|\n+')
+
+    def __init__(self):
+        self._buffer = ""
+        self._parts = []
+
+    def feed(self, text):
+        self._buffer += text
+        last = None
+        for last in self.BOUNDARY.finditer(self._buffer):
+            pass
+        if last is None:
+            return []
+        piece, self._buffer = self._buffer[:last.end()], self._buffer[last.end():]
+        return self._release(piece)
+
+    def flush(self):
+        piece, self._buffer = self._buffer.rstrip(), ""
+        return self._release(piece)
+
+    @property
+    def text(self):
+        return "".join(self._parts).strip()
+
+    def _release(self, piece):
+        if not self._parts:
+            piece = piece.lstrip()
+        if not piece:
+            return []
+        self._parts.append(piece)
+        return [piece]
+
+
+def undelivered_text(cleaned_text, delivered):
+    """The part of ``cleaned_text`` that comes after text an earlier attempt already streamed.
+
+    A retry cleans the transcript again and may word it differently; when the new
+    text no longer starts with what was delivered, as many sentences are skipped.
+    """
+    if not delivered:
+        return cleaned_text
+    prefix = delivered.rstrip()
+    if cleaned_text.startswith(prefix):
+        rest = cleaned_text[len(prefix):]
+        # Whitespace after the delivered text went out with it
+        return rest.lstrip() if prefix != delivered else rest
+    return "".join(split_sentences(cleaned_text)[len(split_sentences(delivered)):])
@@ -0,0 +1,125 @@
+import os
+import time
+from dataclasses import dataclass
+
+from src.utils.startup import lazy_module
+
+np = lazy_module('numpy')
+sf = lazy_module('soundfile')
+
+FRAME_MS = 30
+# Frames this far above the estimated noise floor count as voiced speech
+ENERGY_MARGIN_DB = 10.0
+# Never treat anything quieter than this as speech, however quiet the room is
+ENERGY_FLOOR_DB = -50.0
+# ...and always treat anything louder than this as speech, so a clip with no pauses
+# (whose "noise floor" is really speech) is not discarded
+ENERGY_CEILING_DB = -35.0
+# Quieter frames still count as speech if they look like fricatives (high zero-crossing rate)
+FRICATIVE_MARGIN_DB = 6.0
+FRICATIVE_ZCR = 0.25
+# Silence kept around speech so words are not clipped
+PAD_MS = 150
+# Pauses longer than this are shortened to this length
+MAX_SILENCE_MS = 600
+MIN_SPEECH_MS = 250
+# Below this saving the original file is used as is
+MIN_SAVING_SECONDS = 0.5
+
+
+@dataclass
+class VadResult:
+    path: str
+    has_speech: bool
+    duration: float
+    kept_seconds: float
+    elapsed: float
+    trimmed: bool = False
+
+    @property
+    def removed_seconds(self):
+        return self.duration - self.kept_seconds
+
+    def describe(self):
+        pct = self.removed_seconds / self.duration * 100 if self.duration else 0
+        return (f"[MyScribe] VAD removed {self.removed_seconds:.1f} s of {self.duration:.1f} s "
+                f"({pct:.0f}%) in {self.elapsed * 1000:.0f} ms.")
+
+
+def frame_features(samples, samplerate, frame_ms=FRAME_MS):
+    """Per-frame energy (dBFS) and zero-crossing rate for mono float samples."""
+    frame_len = max(1, int(samplerate * frame_ms / 1000))
+    n_frames = len(samples) // frame_len
+    frames = samples[:n_frames * frame_len].reshape(n_frames, frame_len)
+    rms = np.sqrt(np.einsum('ij,ij->i', frames, frames) / frame_len)
+    energy_db = 20 * np.log10(rms + 1e-10)
+    signs = np.signbit(frames)
+    zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / frame_len
+    return energy_db, zcr, frame_len
+
+
+def speech_frames(energy_db, zcr):
+    """Boolean mask of frames that contain speech, with an adaptive noise floor."""
+    if len(energy_db) == 0:
+        return np.zeros(0, dtype=bool)
+    noise_floor = np.percentile(energy_db, 10)
+    threshold = min(max(noise_floor + ENERGY_MARGIN_DB, ENERGY_FLOOR_DB), ENERGY_CEILING_DB)
+    voiced = energy_db > threshold
+    fricative = (energy_db > threshold - FRICATIVE_MARGIN_DB) & (zcr > FRICATIVE_ZCR)
+    return voiced | fricative
+
+
+def keep_frames(speech, frame_ms=FRAME_MS, pad_ms=PAD_MS, max_silence_ms=MAX_SILENCE_MS):
+    """Frames to keep: speech plus padding, with long pauses shortened and edges dropped."""
+    n = len(speech)
+    if n == 0 or not speech.any():
+        return np.zeros(n, dtype=bool)
+    pad = int(pad_ms / frame_ms)
+    # 'full' then slice: 'same' returns max(n, kernel) values, too many for very short clips
+    padded = np.convolve(speech, np.ones(2 * pad + 1, dtype=int))[pad:pad + n] > 0
+    # Label runs of silence and shorten those in the middle that are too long
+    edges = np.flatnonzero(np.diff(padded.astype(np.int8))) + 1
+    run_starts = np.concatenate(([0], edges))
+    run_lengths = np.diff(np.concatenate((run_starts, [n])))
+    run_ids = np.repeat(np.arange(len(run_starts)), run_lengths)
+    pos_in_run = np.arange(n) - run_starts[run_ids]
+    run_len = run_lengths[run_ids]
+    half = int(max_silence_ms / frame_ms) // 2
+    shortened = (pos_in_run < half) | (run_len - pos_in_run <= half)
+    keep = padded | shortened
+    # Leading and trailing silence is dropped entirely
+    first, last = np.flatnonzero(padded)[[0, -1]]
+    keep[:first] = False
+    keep[last + 1:] = False
+    return keep
+
+
+def trim_silence(audio_path, out_path=None):
+    """Removes leading/trailing silence and long pauses from an audio file.
+
+    Returns a VadResult whose ``path`` is the file to upload: a trimmed copy when it
+    saves enough audio to be worth it, otherwise the original.
+    """
+    start = time.perf_counter()
+    info = sf.info(audio_path)
+    data, samplerate = sf.read(audio_path, dtype='float32', always_2d=True)
+    samples = data.mean(axis=1) if data.shape[1] > 1 else data[:, 0]
+    duration = len(samples) / samplerate if samplerate else 0.0
+
+    energy_db, zcr, frame_len = frame_features(samples, samplerate)
+    speech = speech_frames(energy_db, zcr)
+    has_speech = np.count_nonzero(speech) * FRAME_MS >= MIN_SPEECH_MS
+    keep = keep_frames(speech) if has_speech else np.zeros(len(speech), dtype=bool)
+    kept_seconds = float(np.count_nonzero(keep) * frame_len / samplerate) if samplerate else 0.0
+
+    result = VadResult(audio_path, bool(has_speech), duration, kept_seconds, 0.0)
+    if has_speech and duration - kept_seconds >= MIN_SAVING_SECONDS:
+        mask = np.repeat(keep, frame_len)
+        if out_path is None:
+            base, ext = os.path.splitext(audio_path)
+            out_path = f"{base}_vad{ext}"
+        sf.write(out_path, data[:len(mask)][mask], samplerate, format=info.format, subtype=info.subtype)
+        result.path = out_path
+        result.trimmed = True
+    result.elapsed = time.perf_counter() - start
+    return result
@@ -0,0 +1,18 @@
+import os
+import tempfile
+
+import pytest
+
+# src.utils.db creates its data directory under APPDATA on import
+os.environ.setdefault('APPDATA', tempfile.mkdtemp(prefix='myscribe-tests-'))
+
+from src.utils import db  # noqa: E402
+
+
+@pytest.fixture
+def temp_db(tmp_path):
+    """A migrated database of its own for one test."""
+    db.configure(str(tmp_path / 'myscribe.db'))
+    db.init_db()
+    yield db
+    db.close()
@@ -0,0 +1,23 @@
+import numpy as np
+import soundfile as sf
+
+from src.utils.audio import CAPTURE_PROFILES, is_empty_audio
+
+
+def test_zero_frame_recordings_are_empty(tmp_path):
+    for name in ('speech', 'wav16'):
+        profile = CAPTURE_PROFILES[name]
+        path = tmp_path / f"empty.{profile.extension}"
+        with profile.open_file(str(path)):
+            pass
+        assert is_empty_audio(str(path)), name
+
+
+def test_recording_with_audio_is_not_empty(tmp_path):
+    path = tmp_path / 'short.flac'
+    sf.write(path, np.zeros(160, dtype=np.float32), 16000)
+    assert not is_empty_audio(str(path))
+
+
+def test_missing_file_is_left_to_the_upload_to_report(tmp_path):
+    assert not is_empty_audio(str(tmp_path / 'missing.flac'))
@@ -0,0 +1,63 @@
+from src.utils.chunking import ChunkStitcher, drop_overlap, seam_separator, split_sentences, split_transcript
+
+
+def sentences(count, start=0):
+    return [f"Sentence number {i} is about topic {i}." for i in range(start, start + count)]
+
+
+def stitch(chunks, overlap=1):
+    # An identity "clean": the model returns each chunk unchanged
+    stitcher = ChunkStitcher(overlap)
+    for chunk in chunks:
+        stitcher.add(chunk, chunk)
+    return stitcher.text
+
+
+def test_split_sentences_keeps_trailing_whitespace():
+    assert split_sentences("One. Two!\nThree") == ["One. ", "Two!\n", "Three"]
+
+
+def test_short_transcript_is_one_chunk():
+    assert split_transcript("Short text.", max_chars=100) == ["Short text."]
+
+
+def test_chunks_overlap_by_one_sentence_and_respect_the_limit():
+    text = " ".join(sentences(40))
+    chunks = split_transcript(text, max_chars=300, overlap_sentences=1)
+    assert len(chunks) > 1
+    for previous, following in zip(chunks, chunks[1:]):
+        assert following.startswith(split_sentences(previous)[-1].strip())
+    assert all(len(chunk) <= 300 for chunk in chunks)
+
+
+def test_split_paragraph_is_stitched_back_into_one_paragraph():
+    text = " ".join(sentences(40))
+    chunks = split_transcript(text, max_chars=300)
+    assert stitch(chunks) == text
+
+
+def test_paragraph_breaks_survive_split_and_stitch():
+    paragraphs = [" ".join(sentences(8, start)) for start in (0, 100, 200)]
+    text = "\n\n".join(paragraphs)
+    chunks = split_transcript(text, max_chars=400)
+    assert len(chunks) > 1
+    assert stitch(chunks) == text
+
+
+def test_seam_separator_rules():
+    assert seam_separator("- one\n- two", "- three") == "\n"
+    assert seam_separator("End of a thought.", "Next one.", paragraph_break=True) == "\n\n"
+    assert seam_separator("Middle of a paragraph.", "It goes on.", paragraph_break=False) == " "
+
+
+def test_drop_overlap_removes_reworded_repeat():
+    previous = "We met on Monday. The budget was approved."
+    following = "The budget was approved! Next we discussed hiring."
+    assert drop_overlap(previous, following) == "Next we discussed hiring."
+
+
+def test_stitcher_returns_added_pieces():
+    stitcher = ChunkStitcher()
+    first = stitcher.add("Alpha one. Beta two.", "Alpha one. Beta two. ")
+    second = stitcher.add("Beta two. Gamma three.", "Beta two. Gamma three.")
+    assert first + second == stitcher.text == "Alpha one. Beta two. Gamma three."
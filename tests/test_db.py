@@ -0,0 +1,54 @@
+import sqlite3
+
+from src.utils import db
+
+
+def test_migrations_upgrade_a_legacy_database(tmp_path):
+    path = str(tmp_path / 'legacy.db')
+    # Schema from before migrations existed: no user_version, no indexes or FTS
+    conn = sqlite3.connect(path)
+    conn.execute('''
+        CREATE TABLE transcriptions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            audio_path TEXT NOT NULL,
+            timestamp TEXT NOT NULL,
+            cleaned_text TEXT NOT NULL
+        )
+    ''')
+    conn.execute("INSERT INTO transcriptions (audio_path, timestamp, cleaned_text) "
+                 "VALUES ('old.wav', '2024-05-01T09:00:00', 'Quarterly planning notes')")
+    conn.commit()
+    conn.close()
+
+    db.configure(path)
+    try:
+        assert db.schema_version() == 0
+        db.init_db()
+        assert db.schema_version() == len(db.MIGRATIONS)
+        # Running again is a no-op
+        db.init_db()
+        assert db.schema_version() == len(db.MIGRATIONS)
+        # Existing rows were backfilled into the full-text index
+        assert [row[1] for row in db.search_transcriptions('planning')] == ['old.wav']
+        with db.connection() as c:
+            tables = {row[0] for row in c.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        assert {'jobs', 'cache', 'audio_files', 'meta', 'metrics', 'batch_files'} <= tables
+    finally:
+        db.close()
+
+
+def test_build_fts_query():
+    assert db.build_fts_query('') == ''
+    assert db.build_fts_query('budget meet') == '"budget"* "meet"*'
+    assert db.build_fts_query('"next week" plan') == '"next week" "plan"*'
+    # Punctuation and FTS syntax in words cannot break the query
+    assert db.build_fts_query('e-mail OR') == '"e"* "mail"* "OR"*'
+    assert db.build_fts_query('"unterminated phrase') == '"unterminated phrase"'
+
+
+def test_search_matches_prefixes_and_new_rows(temp_db):
+    temp_db.insert_transcription('a.flac', 'Remember to email the budget spreadsheet')
+    temp_db.insert_transcription('b.flac', 'Groceries: milk and bread')
+    assert [row[1] for row in temp_db.search_transcriptions('budg spread')] == ['a.flac']
+    assert temp_db.search_transcriptions('"bread milk"') == []
+    assert temp_db.search_transcriptions('   ') == []
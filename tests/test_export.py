@@ -0,0 +1,72 @@
+import csv
+import json
+
+import pytest
+
+from src.utils.export import WATERMARK_KEY, ExportCancelled, export_history, format_for_path
+
+
+def test_csv_columns_match_header(temp_db, tmp_path):
+    temp_db.insert_transcriptions([('audio/a.flac', 'First note.', '2026-01-02T10:00:00')])
+    path = tmp_path / 'history.csv'
+
+    assert export_history(str(path)) == 1
+
+    with open(path, newline='', encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))
+    assert rows == [{'id': '1', 'timestamp': '2026-01-02T10:00:00', 'audio_path': 'audio/a.flac',
+                     'text': 'First note.'}]
+
+
+def seed(temp_db):
+    temp_db.insert_transcriptions([
+        ('audio/a.flac', 'First note.', '2026-01-02T10:00:00'),
+        ('audio/b.flac', 'Second note.\nWith two lines.', '2026-01-03T11:30:00'),
+        ('audio/c.flac', 'Third note.', '2026-01-04T08:15:00'),
+    ])
+
+
+def test_jsonl_export(temp_db, tmp_path):
+    seed(temp_db)
+    path = tmp_path / 'history.jsonl'
+    assert export_history(str(path)) == 3
+    rows = [json.loads(line) for line in path.read_text(encoding='utf-8').splitlines()]
+    assert [row['text'] for row in rows] == ['First note.', 'Second note.\nWith two lines.', 'Third note.']
+    assert set(rows[0]) == {'id', 'timestamp', 'audio_path', 'text'}
+
+
+def test_markdown_export_with_date_range(temp_db, tmp_path):
+    seed(temp_db)
+    path = tmp_path / 'history.md'
+    assert export_history(str(path), since='2026-01-03', until='2026-01-04') == 1
+    assert path.read_text(encoding='utf-8') == (
+        "# MyScribe history\n\n## 2026-01-03 11:30\n\nSecond note.\nWith two lines.\n\n")
+
+
+def test_incremental_export_uses_the_watermark(temp_db, tmp_path):
+    seed(temp_db)
+    assert export_history(str(tmp_path / 'all.jsonl')) == 3
+    assert temp_db.meta_get(WATERMARK_KEY) == '3'
+    # A date-range export does not move the watermark
+    export_history(str(tmp_path / 'range.jsonl'), since='2026-01-01')
+    assert temp_db.meta_get(WATERMARK_KEY) == '3'
+
+    temp_db.insert_transcription('audio/d.flac', 'Fourth note.')
+    path = tmp_path / 'new.jsonl'
+    assert export_history(str(path), incremental=True) == 1
+    assert json.loads(path.read_text(encoding='utf-8'))['text'] == 'Fourth note.'
+    assert export_history(str(tmp_path / 'none.jsonl'), incremental=True) == 0
+
+
+def test_cancelled_export_leaves_no_file(temp_db, tmp_path):
+    seed(temp_db)
+    path = tmp_path / 'history.csv'
+    with pytest.raises(ExportCancelled):
+        export_history(str(path), batch_size=1, is_cancelled=lambda: True)
+    assert not path.exists() and not (tmp_path / 'history.csv.part').exists()
+
+
+def test_format_comes_from_the_extension():
+    assert format_for_path('notes.MD') == 'md'
+    assert format_for_path('notes.json') == 'jsonl'
+    assert format_for_path('notes.txt') is None
@@ -0,0 +1,42 @@
+import pytest
+
+pytest.importorskip('PySide6')
+
+from src.ui.history_model import TranscriptionTableModel  # noqa: E402
+
+
+def timestamps(model):
+    return [model.index(i, 0).data() for i in range(model.rowCount())]
+
+
+def test_refresh_latest_puts_new_dictations_on_top(temp_db):
+    temp_db.insert_transcriptions([('a.flac', 'A', '2026-01-01T10:00:00')])
+    model = TranscriptionTableModel()
+    model.reset()
+    temp_db.insert_transcriptions([('b.flac', 'B', '2026-01-02T10:00:00')])
+    assert model.refresh_latest() == 1
+    assert timestamps(model) == ['2026-01-02T10:00:00', '2026-01-01T10:00:00']
+
+
+def test_refresh_latest_merges_older_imports_by_timestamp(temp_db):
+    temp_db.insert_transcriptions([('a.flac', 'A', '2026-01-01T10:00:00'),
+                                   ('c.flac', 'C', '2026-01-03T10:00:00')])
+    model = TranscriptionTableModel()
+    model.reset()
+    # A --batch import keeps the file's older date
+    temp_db.insert_transcriptions([('b.flac', 'B', '2026-01-02T10:00:00')])
+    assert model.refresh_latest() == 1
+    assert timestamps(model) == ['2026-01-03T10:00:00', '2026-01-02T10:00:00', '2026-01-01T10:00:00']
+
+
+def test_rows_older_than_the_loaded_pages_are_paged_in_later(temp_db):
+    temp_db.insert_transcriptions([(f'{day}.flac', str(day), f'2026-01-{day:02d}T10:00:00')
+                                   for day in range(10, 14)])
+    model = TranscriptionTableModel(page_size=2)
+    model.reset()
+    temp_db.insert_transcriptions([('old.flac', 'Old', '2025-06-01T10:00:00')])
+    assert model.refresh_latest() == 0
+    while model.canFetchMore():
+        model.fetchMore()
+    assert timestamps(model)[-1] == '2025-06-01T10:00:00'
+    assert timestamps(model) == sorted(timestamps(model), reverse=True)
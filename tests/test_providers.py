@@ -0,0 +1,51 @@
+import asyncio
+
+from src.utils.providers import FakeLLMProvider, HedgedProvider
+
+
+class SizedLLM(FakeLLMProvider):
+    """Takes 5 ms plus 10 ms per 1k prompt characters, like a model that is slower on longer input."""
+
+    async def generate(self, prompt):
+        self.latency = 0.005 + len(prompt) / 1000 * 0.01
+        return await super().generate(prompt)
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_no_hedging_before_min_samples():
+    primary = FakeLLMProvider(latency=0.01)
+    hedged = HedgedProvider(primary, min_samples=3)
+    assert run(hedged.generate("prompt\n\ntext")) == "text"
+    assert hedged.hedges == 0 and primary.calls == 1
+
+
+def test_slow_call_is_hedged_to_fallback():
+    primary = FakeLLMProvider(latency=0.01)
+    fallback = FakeLLMProvider(latency=0.0)
+    hedged = HedgedProvider(primary, fallback, min_samples=3)
+    for _ in range(3):
+        run(hedged.generate("warm\n\nup"))
+    primary.latency = 0.5
+    assert run(hedged.generate("prompt\n\nslow")) == "slow"
+    assert hedged.hedges == 1 and hedged.hedge_wins == 1 and fallback.calls == 1
+
+
+def test_long_prompt_is_not_hedged_against_short_prompt_latency():
+    primary = SizedLLM()
+    hedged = HedgedProvider(primary, min_samples=3)
+    for _ in range(5):
+        run(hedged.generate("x" * 2000))
+    # Twenty times longer and twenty times slower, but no slower per character
+    run(hedged.generate("x" * 40000))
+    assert hedged.hedges == 0 and primary.calls == 6
+
+
+def test_failed_primary_falls_back_to_backup_result():
+    primary = FakeLLMProvider(latency=0.01, failure_rate=1.0)
+    fallback = FakeLLMProvider(latency=0.0)
+    hedged = HedgedProvider(primary, fallback, min_samples=0)
+    hedged.latency.record(0.0)
+    assert run(hedged.generate("prompt\n\nrescued")) == "rescued"
@@ -0,0 +1,112 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import soundfile as sf
+
+from src.utils.audio import CAPTURE_PROFILES
+from src.utils.recorder import Recorder
+
+STATUS_OK = SimpleNamespace(input_overflow=False)
+
+
+class FakeInputStream:
+    """Stands in for sounddevice.InputStream; the test calls ``feed`` itself."""
+
+    def __init__(self, samplerate, channels, dtype, blocksize, callback):
+        self.blocksize = blocksize
+        self.callback = callback
+        self.next_sample = 0
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+    def close(self):
+        pass
+
+    def feed(self, blocks):
+        # Each sample holds its own frame index, so the files show exactly which frames they got
+        for _ in range(blocks):
+            block = np.arange(self.next_sample, self.next_sample + self.blocksize, dtype=np.int16)[:, None]
+            self.next_sample += self.blocksize
+            self.callback(block, self.blocksize, None, STATUS_OK)
+
+
+def make_recorder(idle_seconds=0, streams=None):
+    streams = [] if streams is None else streams
+
+    def factory(**kwargs):
+        streams.append(FakeInputStream(**kwargs))
+        streams[-1].opened_on = threading.current_thread()
+        return streams[-1]
+
+    recorder = Recorder(CAPTURE_PROFILES['wav16'], preroll_ms=500, stream_factory=factory,
+                        idle_seconds=idle_seconds)
+    recorder.open()
+    return recorder, streams[0]
+
+
+def read_frames(path):
+    data, _ = sf.read(path, dtype='int16')
+    return data
+
+
+def test_capture_includes_preroll(tmp_path):
+    recorder, stream = make_recorder()
+    stream.feed(20)
+    capture = recorder.start(str(tmp_path / 'one.wav'))
+    stream.feed(2)
+    capture.stop()
+    assert capture.wait(5)
+    recorder.close()
+
+    frames = read_frames(capture.filename)
+    assert capture.preroll_frames == 8000  # 500 ms at 16 kHz
+    assert frames[0] == 20 * 512 - 8000
+    assert frames[-1] == 22 * 512 - 1
+
+
+def test_back_to_back_capture_does_not_repeat_previous_audio(tmp_path):
+    recorder, stream = make_recorder()
+    stream.feed(20)
+    first = recorder.start(str(tmp_path / 'first.wav'))
+    stream.feed(4)
+    first.stop()
+    # The next dictation starts well within the pre-roll window of the previous stop
+    second = recorder.start(str(tmp_path / 'second.wav'))
+    stream.feed(4)
+    second.stop()
+    assert first.wait(5) and second.wait(5)
+    recorder.close()
+
+    first_frames, second_frames = read_frames(first.filename), read_frames(second.filename)
+    assert second_frames[0] == first_frames[-1] + 1
+    assert second.preroll_frames == 0
+
+
+def test_start_after_idle_release_reopens_in_background_without_stale_audio(tmp_path):
+    streams = []
+    recorder, stream = make_recorder(idle_seconds=0.05, streams=streams)
+    stream.feed(20)
+    deadline = time.monotonic() + 5
+    while recorder.is_open and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert not recorder.is_open
+
+    capture = recorder.start(str(tmp_path / 'after-idle.wav'))
+    while not recorder.is_open and time.monotonic() < deadline:
+        time.sleep(0.01)
+    reopened = streams[-1]
+    assert reopened is not stream and reopened.opened_on is not threading.current_thread()
+    reopened.feed(2)
+    capture.stop()
+    assert capture.wait(5)
+    recorder.close()
+
+    assert capture.preroll_frames == 0
+    assert list(read_frames(capture.filename)[:3]) == [0, 1, 2]
+    assert capture.frames_written == 2 * 512
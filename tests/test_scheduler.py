@@ -0,0 +1,176 @@
+import sqlite3
+import threading
+import time
+
+from src.utils.scheduler import JobScheduler
+
+
+def make_scheduler(stage, **kwargs):
+    delivered = []
+    done = threading.Event()
+    expected = kwargs.pop('expected', 1)
+
+    def on_result(job):
+        delivered.append(job)
+        if len(delivered) == expected:
+            done.set()
+
+    scheduler = JobScheduler([('work', stage)], backoff_seconds=0.01, **kwargs)
+    scheduler.start(on_result=on_result)
+    return scheduler, delivered, done
+
+
+def test_reserved_slots_deliver_in_reservation_order(temp_db):
+    scheduler, delivered, done = make_scheduler(lambda job: None, workers=2, expected=2)
+    first, second = scheduler.reserve(), scheduler.reserve()
+    # The second recording's file is finished (and processed) first
+    scheduler.submit('second.flac', slot=second)
+    scheduler.submit('first.flac', slot=first)
+    assert done.wait(5)
+    scheduler.shutdown()
+    assert [job.audio_path for job in delivered] == ['first.flac', 'second.flac']
+
+
+def test_released_slot_does_not_hold_back_later_jobs(temp_db):
+    scheduler, delivered, done = make_scheduler(lambda job: None)
+    slot = scheduler.reserve()
+    scheduler.submit('later.flac')
+    scheduler.release(slot)
+    assert done.wait(5)
+    scheduler.shutdown()
+    assert [job.audio_path for job in delivered] == ['later.flac']
+    assert scheduler.stats()['awaiting_delivery'] == 0
+
+
+def test_results_are_delivered_in_submission_order(temp_db):
+    release_first = threading.Event()
+
+    def stage(job):
+        if job.audio_path == 'first.flac':
+            release_first.wait(5)
+        job.data['text'] = job.audio_path
+
+    scheduler, delivered, done = make_scheduler(stage, workers=2, expected=2)
+    scheduler.submit('first.flac')
+    scheduler.submit('second.flac')
+    # The second job finishes while the first is still running, but waits for it
+    time.sleep(0.2)
+    assert delivered == []
+    release_first.set()
+    assert done.wait(5)
+    scheduler.shutdown()
+    assert [job.audio_path for job in delivered] == ['first.flac', 'second.flac']
+
+
+def test_failed_stage_is_retried_without_rerunning_earlier_stages(temp_db):
+    calls = {'transcribe': 0, 'clean': 0}
+
+    def transcribe(job):
+        calls['transcribe'] += 1
+        job.data['raw_text'] = 'raw'
+
+    def clean(job):
+        calls['clean'] += 1
+        if calls['clean'] == 1:
+            raise RuntimeError('flaky')
+        job.data['cleaned_text'] = job.data['raw_text'].upper()
+
+    delivered = []
+    done = threading.Event()
+    scheduler = JobScheduler([('transcribe', transcribe), ('clean', clean)], backoff_seconds=0.01)
+    scheduler.start(on_result=lambda job: (delivered.append(job), done.set()))
+    scheduler.submit('a.flac')
+    assert done.wait(5)
+    scheduler.shutdown()
+
+    job = delivered[0]
+    assert calls == {'transcribe': 1, 'clean': 2}
+    assert job.attempts == 1 and job.error is None and job.data['cleaned_text'] == 'RAW'
+    assert temp_db.fetch_unfinished_jobs() == []
+
+
+def test_job_fails_after_max_attempts(temp_db):
+    def stage(job):
+        raise RuntimeError('down')
+
+    scheduler, delivered, done = make_scheduler(stage, max_attempts=2)
+    scheduler.submit('a.flac')
+    assert done.wait(5)
+    scheduler.shutdown()
+    assert delivered[0].error == 'down' and delivered[0].attempts == 2
+
+
+def test_unfinished_jobs_resume_at_their_stage(temp_db):
+    job_id = temp_db.insert_job('resumed.flac')
+    temp_db.update_job(job_id, 'running', 1, 0, {'raw_text': 'saved'})
+    ran = []
+
+    def first(job):
+        ran.append('first')
+
+    def second(job):
+        ran.append('second')
+        job.data['cleaned_text'] = job.data['raw_text']
+
+    delivered = []
+    done = threading.Event()
+    scheduler = JobScheduler([('first', first), ('second', second)])
+    scheduler.start(on_result=lambda job: (delivered.append(job), done.set()))
+    assert done.wait(5)
+    scheduler.shutdown()
+    assert ran == ['second'] and delivered[0].data['cleaned_text'] == 'saved'
+    assert delivered[0].context['resumed']
+
+
+def test_new_jobs_are_not_marked_resumed(temp_db):
+    scheduler, delivered, done = make_scheduler(lambda job: None)
+    scheduler.submit('a.flac')
+    assert done.wait(5)
+    scheduler.shutdown()
+    assert not delivered[0].context.get('resumed')
+
+
+def test_old_failed_jobs_are_listed_then_pruned(temp_db, capsys):
+    recent, old = temp_db.insert_job('recent.flac'), temp_db.insert_job('old.flac')
+    temp_db.update_job(recent, 'failed', 0, 4, {}, 'timeout')
+    temp_db.update_job(old, 'failed', 0, 4, {}, 'timeout')
+    with temp_db.connection() as conn:
+        conn.execute("UPDATE jobs SET updated_at = '2020-01-01T00:00:00' WHERE id = ?", (old,))
+
+    scheduler = JobScheduler([('work', lambda job: None)], failed_retention_days=7)
+    scheduler.start()
+    scheduler.shutdown()
+    out = capsys.readouterr().out
+    assert 'recent.flac' in out and 'old.flac' in out
+    assert [row[1] for row in temp_db.fetch_failed_jobs()] == ['recent.flac']
+
+
+def test_job_table_errors_are_retried_instead_of_killing_the_worker(temp_db, monkeypatch):
+    real_update, real_delete = temp_db.update_job, temp_db.delete_job
+    failures = {'update': 1, 'delete': 1}
+
+    def flaky_update(*args, **kwargs):
+        if failures['update']:
+            failures['update'] -= 1
+            raise sqlite3.OperationalError('database is locked')
+        return real_update(*args, **kwargs)
+
+    def flaky_delete(job_id):
+        # Fails after the last stage has run
+        if failures['delete']:
+            failures['delete'] -= 1
+            raise sqlite3.OperationalError('database is locked')
+        return real_delete(job_id)
+
+    monkeypatch.setattr(temp_db, 'update_job', flaky_update)
+    monkeypatch.setattr(temp_db, 'delete_job', flaky_delete)
+    runs = []
+    scheduler, delivered, done = make_scheduler(lambda job: runs.append(job.audio_path), workers=1, expected=2)
+    scheduler.submit('a.flac')
+    scheduler.submit('b.flac')
+    assert done.wait(5)
+    scheduler.shutdown()
+    assert [job.audio_path for job in delivered] == ['a.flac', 'b.flac']
+    assert all(job.error is None for job in delivered)
+    assert sorted(runs) == ['a.flac', 'b.flac']  # a bookkeeping retry does not rerun the stage
+    assert temp_db.fetch_unfinished_jobs() == []
@@ -0,0 +1,102 @@
+import threading
+
+from src.utils.scheduler import JobScheduler
+from src.utils.sessions import FINALIZING, FINISHED, SessionManager
+
+
+class FakeCapture:
+    def __init__(self, on_finished):
+        self.on_finished = on_finished
+        self.stopped = False
+        self.error = None
+
+    def stop(self):
+        self.stopped = True
+
+    def wait(self, timeout=None):
+        return True
+
+    def finish(self):
+        self.on_finished(self)
+
+    def fail(self, error):
+        self.error = error
+        self.on_finished(self)
+
+
+def make_manager():
+    finished, slots = [], iter(range(1, 100))
+    manager = SessionManager(lambda session, on_finished: FakeCapture(on_finished), finished.append,
+                             reserve=lambda: next(slots))
+    return manager, finished
+
+
+def test_next_session_starts_while_previous_is_finalizing():
+    manager, finished = make_manager()
+    first = manager.start()
+    assert manager.start() is None  # already recording
+    assert manager.stop() is first
+    assert first.capture.stopped and first.state == FINALIZING
+    second = manager.start()
+    assert second is not None and second.id == first.id + 1
+    assert manager.finalizing() == [first]
+
+    first.capture.finish()
+    assert first.state == FINISHED and finished == [first]
+    assert manager.finalizing() == []
+
+
+def test_slots_are_reserved_in_stop_order():
+    manager, _finished = make_manager()
+    first = manager.start()
+    manager.stop()
+    second = manager.start()
+    manager.stop()
+    assert (first.slot, second.slot) == (1, 2)
+
+
+def test_hold_release_does_not_stop_continuous_session():
+    manager, _finished = make_manager()
+    session = manager.start(continuous=True)
+    assert manager.stop(continuous=False) is None
+    assert manager.recording
+    assert manager.stop(continuous=True) is session
+
+
+def test_capture_failing_while_recording_does_not_hold_back_later_results(temp_db):
+    delivered = []
+    done = threading.Event()
+    scheduler = JobScheduler([('work', lambda job: None)])
+    scheduler.start(on_result=lambda job: (delivered.append(job), done.set()))
+
+    def on_finished(session):
+        if session.capture.error is not None:
+            scheduler.release(session.slot)
+        else:
+            scheduler.submit(f'{session.id}.flac', slot=session.slot)
+
+    manager = SessionManager(lambda session, finished: FakeCapture(finished), on_finished,
+                             reserve=scheduler.reserve)
+    failed = manager.start()
+    failed.capture.fail(OSError('disk full'))
+    assert not manager.recording and failed.capture.stopped
+    # The user's release of the hotkey finds nothing left to stop
+    assert manager.stop() is None
+
+    good = manager.start()
+    manager.stop()
+    good.capture.finish()
+    assert done.wait(5)
+    scheduler.shutdown()
+    assert [job.audio_path for job in delivered] == [f'{good.id}.flac']
+    assert manager.finalizing() == [] and manager.wait_finalized(0)
+    assert scheduler.stats()['awaiting_delivery'] == 0
+
+
+def test_stop_after_writer_error_reserves_nothing():
+    manager, finished = make_manager()
+    session = manager.start()
+    # The writer has recorded its error but not yet reported the session
+    session.capture.error = OSError('disk full')
+    assert manager.stop() is None
+    assert session.slot is None and manager.finalizing() == [] and not manager.recording
@@ -0,0 +1,66 @@
+import time
+from concurrent.futures import TimeoutError
+
+import pytest
+
+from src.utils.streaming import SentenceAssembler, StreamingTranscription, undelivered_text
+
+
+def test_streaming_result_stitches_segments_in_order():
+    stream = StreamingTranscription(lambda path: f" {path} ", delete_segments=False)
+    for path in ("one", "two", "three"):
+        stream.add_segment(path)
+    assert stream.result(timeout=5) == "one two three"
+
+
+def test_streaming_result_timeout_covers_all_segments():
+    def slow(path):
+        time.sleep(0.3)
+        return path
+
+    stream = StreamingTranscription(slow, max_workers=1, delete_segments=False)
+    for path in ("a", "b", "c", "d"):
+        stream.add_segment(path)
+    start = time.monotonic()
+    with pytest.raises(TimeoutError):
+        stream.result(timeout=0.5)
+    # One deadline for the whole wait, not 0.5 s per segment
+    assert time.monotonic() - start < 0.8
+
+
+def test_undelivered_text_without_streaming_is_everything():
+    assert undelivered_text("One. Two.", "") == "One. Two."
+
+
+def test_undelivered_text_skips_delivered_prefix():
+    assert undelivered_text("One. Two. Three.", "One. ") == "Two. Three."
+    assert undelivered_text("One. Two. Three.", "One. Two.") == " Three."
+
+
+def test_undelivered_text_fully_streamed_is_empty():
+    assert undelivered_text("One. Two.", "One. Two. ") == ""
+
+
+def test_undelivered_text_reworded_retry_skips_as_many_sentences():
+    assert undelivered_text("First. Second. Third.", "Uno. Dos. ") == "Third."
+
+
+def feed_all(chunks):
+    assembler = SentenceAssembler()
+    released = []
+    for chunk in chunks:
+        released.append(assembler.feed(chunk))
+    released.append(assembler.flush())
+    return assembler, released
+
+
+def test_sentence_assembler_releases_whole_sentences():
+    _assembler, released = feed_all(["Hello wor", "ld. How are", " you? Fine", "\n- item one", "\nlast"])
+    assert released == [[], ["Hello world. "], ["How are you? "], ["Fine\n"], ["- item one\n"], ["last"]]
+
+
+def test_sentence_assembler_pieces_join_to_the_text():
+    chunks = ["  Leading space. ", "Decimal 3.5 stays", " together. ", "End"]
+    assembler, released = feed_all(chunks)
+    pieces = [piece for batch in released for piece in batch]
+    assert "".join(pieces) == assembler.text == "Leading space. Decimal 3.5 stays together. End"
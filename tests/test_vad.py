@@ -0,0 +1,58 @@
+import numpy as np
+import soundfile as sf
+
+from src.utils.vad import FRAME_MS, MAX_SILENCE_MS, PAD_MS, keep_frames, trim_silence
+
+
+def mask(pattern):
+    return np.array([c == '#' for c in pattern])
+
+
+def test_no_speech_keeps_nothing():
+    assert not keep_frames(mask('')).any()
+    assert not keep_frames(mask('....')).any()
+
+
+def test_clip_shorter_than_pad_window_keeps_its_length():
+    keep = keep_frames(mask('.#.'))
+    assert len(keep) == 3 and keep.all()
+
+
+def test_leading_and_trailing_silence_is_dropped_beyond_padding():
+    pad = PAD_MS // FRAME_MS
+    speech = mask('.' * 20 + '#' * 10 + '.' * 20)
+    keep = keep_frames(speech)
+    assert np.flatnonzero(keep)[0] == 20 - pad
+    assert np.flatnonzero(keep)[-1] == 29 + pad
+
+
+def test_long_pause_is_shortened():
+    speech = mask('#' * 10 + '.' * 200 + '#' * 10)
+    keep = keep_frames(speech)
+    pad = PAD_MS // FRAME_MS
+    kept_pause = np.count_nonzero(keep[10:210])
+    assert kept_pause <= 2 * pad + MAX_SILENCE_MS // FRAME_MS
+    assert keep[:10].all() and keep[210:].all()
+
+
+def test_trim_silence_cuts_quiet_edges(tmp_path):
+    rate = 16000
+    t = np.arange(rate) / rate
+    tone = 0.3 * np.sin(2 * np.pi * 220 * t)
+    silence = np.zeros(2 * rate)
+    path = tmp_path / 'clip.wav'
+    sf.write(path, np.concatenate((silence, tone, silence)).astype(np.float32), rate)
+
+    result = trim_silence(str(path))
+
+    assert result.has_speech and result.trimmed
+    assert result.duration == 5.0
+    assert 1.0 <= result.kept_seconds < 1.5
+    assert sf.info(result.path).duration == result.kept_seconds
+
+
+def test_trim_silence_reports_no_speech_for_silence(tmp_path):
+    path = tmp_path / 'silence.wav'
+    sf.write(path, np.zeros(16000, dtype=np.float32), 16000)
+    result = trim_silence(str(path))
+    assert not result.has_speech and not result.trimmed and result.path == str(path)